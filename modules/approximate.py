@@ -0,0 +1,390 @@
+import heapq
+import math
+import numpy as np
+import zlib
+from collections import Counter
+from collections.abc import Mapping
+
+# global constants
+DEFAULT_MEMORY = 64 * 1024 * 1024  # bytes of counters and sketches together
+DEFAULT_DEPTH = 4                  # rows of each Count-Min sketch
+ENTRY_BYTES = 200                  # rough size of a counter in a dictionary
+PAIR_SEPARATOR = ' '               # joins a word pair into one sketch key
+
+
+class HeavyHitters:
+    """ Counts of the most frequent items of a stream in at most capacity
+    counters, with the Misra-Gries algorithm
+
+    Counts are added a chunk at a time. Whenever more than capacity items
+    are counted, the count of the (capacity + 1)-th most frequent one is
+    taken from every count and items left with none are dropped. Each
+    count is then at most decrement below the true count, and decrement is
+    at most total / (capacity + 1), so every item more frequent than that
+    is kept.
+    """
+
+    def __init__(self, capacity):
+        """ Creates an empty summary
+
+        Parameters
+        ----------
+        capacity: int
+            most items counted at once
+        """
+
+        self.capacity = capacity
+        self.counts = {}
+        self.total = 0
+        self.decrement = 0
+
+    def update(self, counts):
+        """ Adds the counts of a chunk of the stream
+
+        Parameters
+        ----------
+        counts: dictionary (object: int)
+            number of times each item occurs in the chunk
+
+        Returns
+        -------
+        None
+        """
+
+        summary = self.counts
+        for item, count in counts.items():
+            summary[item] = summary.get(item, 0) + count
+        self.total += sum(counts.values())
+
+        if len(summary) > self.capacity:
+            cut = heapq.nlargest(self.capacity + 1, summary.values())[-1]
+            self.decrement += cut
+            self.counts = {item: count - cut for item, count in
+                            summary.items() if count > cut}
+
+
+class CountMinSketch:
+    """ Approximate counts of any number of string keys in a fixed table
+
+    Each key is counted in one cell of every row, picked by hashing it, and
+    its estimate is the smallest of those cells. Estimates are never below
+    the true count, and with probability 1 - delta at most epsilon * total
+    above it, where epsilon = e / width and delta = exp(-depth).
+    """
+
+    def __init__(self, width, depth=DEFAULT_DEPTH):
+        """ Creates an empty sketch
+
+        Parameters
+        ----------
+        width: int
+            cells per row
+        depth: int, default : DEFAULT_DEPTH
+            number of rows
+        """
+
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @property
+    def epsilon(self):
+        """ Largest overcount as a share of the total, see delta """
+
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        """ Chance of an estimate being over by more than epsilon * total """
+
+        return math.exp(-self.depth)
+
+    def update(self, counts):
+        """ Adds counts of keys
+
+        Parameters
+        ----------
+        counts: dictionary (string: int)
+            number of times each key occurs
+
+        Returns
+        -------
+        None
+        """
+
+        if not counts:
+            return
+        cells = self._cells(counts)
+        values = np.fromiter(counts.values(), dtype=np.int64,
+                                count=len(counts))
+        for row in range(self.depth):
+            np.add.at(self.table[row], cells[row], values)
+        self.total += int(values.sum())
+
+    def estimates(self, keys):
+        """ Gets the estimated counts of keys
+
+        Parameters
+        ----------
+        keys: list of strings
+            keys to look up
+
+        Returns
+        -------
+        estimates: list of ints
+            estimated count of each key, never below its true count
+        """
+
+        if not keys:
+            return []
+        cells = self._cells(keys)
+        rows = np.arange(self.depth)[:, None]
+        return self.table[rows, cells].min(axis=0).tolist()
+
+    def _cells(self, keys):
+        # column of each key in every row, from two CRC-32 hashes combined
+        # as h1 + row * h2, which spreads keys like independent hashes
+        encoded = [key.encode('utf-8') for key in keys]
+        first = np.fromiter(map(zlib.crc32, encoded), dtype=np.int64,
+                            count=len(encoded))
+        second = np.fromiter((zlib.crc32(key, 0x9e3779b9) | 1
+                                for key in encoded), dtype=np.int64,
+                                count=len(encoded))
+        rows = np.arange(self.depth, dtype=np.int64)[:, None]
+        return (first + rows * second) % self.width
+
+
+class ApproximateCounts:
+    """ Word and word pair counts of a text in a fixed memory budget
+
+    Heavy hitter summaries keep the most frequent words and word pairs and
+    Count-Min sketches estimate the count of any word or pair. A word's
+    estimate is the sketch estimate, capped at its summary count plus the
+    summary's decrement when it is in the summary, so it is never below
+    the true count and usually equal to it for frequent words. The total
+    number of words is exact.
+
+    word_distribution holds the estimates of the words in the summary and
+    word_map the next words of a word that are in either summary, so both
+    can be passed as the maps of the charts and sentence functions.
+    """
+
+    def __init__(self, memory=DEFAULT_MEMORY, depth=DEFAULT_DEPTH):
+        """ Creates empty counts that use about memory bytes
+
+        Parameters
+        ----------
+        memory: int, default : DEFAULT_MEMORY
+            bytes for the counters and sketches, a quarter of them for the
+            word and pair summaries and the rest for the sketches
+        depth: int, default : DEFAULT_DEPTH
+            rows of each sketch
+        """
+
+        capacity = max(memory // 8 // ENTRY_BYTES, 1)
+        width = max(memory * 3 // 8 // (depth * 8), 1)
+        self.memory = memory
+        self.words = HeavyHitters(capacity)
+        self.pairs = HeavyHitters(capacity)
+        self.word_sketch = CountMinSketch(width, depth)
+        self.pair_sketch = CountMinSketch(width, depth)
+        self.word_map = NextWordEstimates(self)
+        self._prev_word = None
+
+    @classmethod
+    def from_token_chunks(cls, token_chunks, memory=DEFAULT_MEMORY,
+                            depth=DEFAULT_DEPTH, words=None):
+        """ Counts consecutive lists of tokens
+
+        Parameters
+        ----------
+        token_chunks: iterable of lists
+            consecutive tokens of a text, as produced by
+            tokenizer.iter_token_chunks or FileReader.token_chunks
+        memory: int, default : DEFAULT_MEMORY
+            bytes for the counters and sketches
+        depth: int, default : DEFAULT_DEPTH
+            rows of each sketch
+        words: dictionary, default : None
+            word of each token if the tokens are raw tokens, such as
+            FileReader.words, tokens are words if None
+
+        Returns
+        -------
+        counts: ApproximateCounts
+            counts of the tokens
+        """
+
+        counts = cls(memory, depth)
+        for tokens in token_chunks:
+            if words is not None:
+                tokens = [words[token] for token in tokens]
+            counts.add_tokens(tokens)
+        return counts
+
+    @property
+    def total(self):
+        """ Number of words counted """
+
+        return self.words.total
+
+    def add_tokens(self, tokens):
+        """ Counts the next chunk of words of a text
+
+        Parameters
+        ----------
+        tokens: list of strings
+            consecutive words of the text
+
+        Returns
+        -------
+        None
+        """
+
+        if not tokens:
+            return
+
+        word_counts = Counter(tokens)
+        self.words.update(word_counts)
+        self.word_sketch.update(word_counts)
+
+        # pairs include the one that crosses from the previous chunk
+        if self._prev_word is not None:
+            tokens = [self._prev_word] + tokens
+        pair_counts = Counter(zip(tokens, tokens[1:]))
+        self.pairs.update(pair_counts)
+        self.pair_sketch.update({_pair_key(pair): count
+                                    for pair, count in pair_counts.items()})
+        self._prev_word = tokens[-1]
+
+    @property
+    def word_distribution(self):
+        """ Estimated frequency of each word in the summary """
+
+        return self.word_estimates(list(self.words.counts))
+
+    def word_estimates(self, words):
+        """ Gets estimated word frequencies
+
+        Parameters
+        ----------
+        words: list of strings
+            words to look up
+
+        Returns
+        -------
+        estimates: dictionary (string: int)
+            estimated frequency of each word, never below the true count
+        """
+
+        return _capped(words, self.word_sketch.estimates(words),
+                        self.words)
+
+    def pair_estimates(self, pairs):
+        """ Gets estimated word pair frequencies
+
+        Parameters
+        ----------
+        pairs: list of tuples (string, string)
+            word pairs to look up
+
+        Returns
+        -------
+        estimates: dictionary (tuple: int)
+            estimated number of times the second word of each pair follows
+            the first, never below the true count
+        """
+
+        estimates = self.pair_sketch.estimates([_pair_key(pair)
+                                                for pair in pairs])
+        return _capped(pairs, estimates, self.pairs)
+
+    def error_bounds(self):
+        """ Gets how far the estimates can be from the true counts
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        bounds: dictionary
+            for words and for pairs: the largest overcount of a sketch
+            estimate with probability 1 - delta, the largest undercount of
+            a summary count, and the smallest count sure to be in the
+            summary
+        """
+
+        bounds = {'delta': self.word_sketch.delta}
+        for name, summary, sketch in [('words', self.words, self.word_sketch),
+                                        ('pairs', self.pairs,
+                                            self.pair_sketch)]:
+            bounds[name] = {'max_overcount': sketch.epsilon * sketch.total,
+                            'max_undercount': summary.decrement,
+                            'min_kept_count': summary.decrement + 1}
+        return bounds
+
+    def stats(self, words=()):
+        """ Gets the word count with error bounds, and word estimates
+
+        Parameters
+        ----------
+        words: iterable of strings, default : ()
+            words to estimate the frequency of
+
+        Returns
+        -------
+        stats: dictionary
+            exact word count, memory budget, error bounds and the estimated
+            frequency of each word asked for
+        """
+
+        return {'word_count': self.total, 'memory_bytes': self.memory,
+                'error_bounds': self.error_bounds(),
+                'estimates': self.word_estimates(list(words))}
+
+
+class NextWordEstimates(Mapping):
+    """ Read-only dictionary of estimated next word frequencies for each
+    word, taken from the pairs in the summary
+
+    Only pairs kept by the summary are candidates: the sketch gives nearly
+    every pair a count once the text is large, so estimating pairs it does
+    not hold would add next words that never follow the word.
+    """
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    def __getitem__(self, word):
+        candidates = [pair for pair in self.counts.pairs.counts
+                        if pair[0] == word]
+        if not candidates:
+            raise KeyError(word)
+        estimates = self.counts.pair_estimates(candidates)
+        return {pair[1]: count for pair, count in estimates.items()}
+
+    def __iter__(self):
+        return iter(dict.fromkeys(pair[0] for pair in
+                                    self.counts.pairs.counts))
+
+    def __len__(self):
+        return len(dict.fromkeys(pair[0] for pair in
+                                    self.counts.pairs.counts))
+
+
+def _pair_key(pair):
+    # sketch key of a word pair, words never hold whitespace
+    return pair[0] + PAIR_SEPARATOR + pair[1]
+
+
+def _capped(items, estimates, summary):
+    # sketch estimates lowered to what the summary allows for its items
+    capped = {}
+    for item, estimate in zip(items, estimates):
+        count = summary.counts.get(item)
+        if count is not None:
+            estimate = min(estimate, count + summary.decrement)
+        capped[item] = estimate
+    return capped
@@ -0,0 +1,416 @@
+import asyncio
+import os
+import parallel
+import profiling
+import tokenizer
+from collections import Counter
+from pipeline import AtomicWriter
+
+# global constants
+MAX_READS = 16            # files read at the same time
+MAX_WRITES = 16           # output files written at the same time
+QUEUE_SIZE = 64           # chunks read ahead of the counting stage
+CHUNK_SIZE = 1024 * 1024  # number of characters read from a file at a time
+
+
+def gen_maps_from_files(filenames, max_reads=MAX_READS, queue_size=QUEUE_SIZE,
+                        chunk_size=CHUNK_SIZE, encoding=None,
+                        errors='strict'):
+    """ Generates word distribution and individual word hashmaps for many
+    files, reading several files at once in threads while the chunks
+    already read are counted
+
+    Reads are started with asyncio and run in the default thread pool, at
+    most max_reads at a time. Each chunk is cut at its last whitespace, the
+    rest carried over to the next chunk of its file, and queued for the
+    counting stage; once queue_size chunks wait there the reads pause until
+    it catches up. Each file is counted into its own maps, merged in the
+    order of filenames, so the maps are the same as when the files are
+    read one after another. A file is only started while fewer than
+    max_reads files are being read or wait for an earlier file to be
+    merged, so the maps held are bounded by max_reads files. Words at the
+    end of one file are not paired with words at the start of the next.
+
+    Parameters
+    ----------
+    filenames: list of strings
+        paths of the files to count
+    max_reads: int, default : MAX_READS
+        most files read at the same time
+    queue_size: int, default : QUEUE_SIZE
+        most chunks read ahead of counting
+    chunk_size: int, default : CHUNK_SIZE
+        number of characters read from a file at a time
+    encoding: string, default : None
+        encoding of the files, the locale encoding if None
+    errors: string, default : 'strict'
+        how undecodable bytes are handled, see open
+
+    Returns
+    -------
+    result: tuple
+        word distribution and word map, None for both if no words were
+        read, and the path and error message of each file that could not
+        be read
+    """
+
+    maps, read_errors = asyncio.run(_count_files(filenames, max_reads,
+                                                    queue_size, chunk_size,
+                                                    encoding, errors, False))
+    if not maps[0]:
+        maps = None, None
+    return maps, read_errors
+
+
+def count_files_words(filenames, max_reads=MAX_READS, queue_size=QUEUE_SIZE,
+                        chunk_size=CHUNK_SIZE, encoding=None,
+                        errors='strict'):
+    """ Gets number of words contained in many files, reading several files
+    at once in threads while the chunks already read are counted, see
+    gen_maps_from_files
+
+    Parameters
+    ----------
+    filenames: list of strings
+        paths of the files to count
+    max_reads: int, default : MAX_READS
+        most files read at the same time
+    queue_size: int, default : QUEUE_SIZE
+        most chunks read ahead of counting
+    chunk_size: int, default : CHUNK_SIZE
+        number of characters read from a file at a time
+    encoding: string, default : None
+        encoding of the files, the locale encoding if None
+    errors: string, default : 'strict'
+        how undecodable bytes are handled, see open
+
+    Returns
+    -------
+    result: tuple
+        number of words, and the path and error message of each file that
+        could not be read
+    """
+
+    return asyncio.run(_count_files(filenames, max_reads, queue_size,
+                                    chunk_size, encoding, errors, True))
+
+
+def transform_files(pairs, text_pipeline, max_reads=MAX_READS,
+                    max_writes=MAX_WRITES, queue_size=QUEUE_SIZE,
+                    encoding=None, errors='strict'):
+    """ Passes many files through a pipeline, reading and writing several
+    files at once in threads while the files already read are processed
+
+    Every file is read whole, so this suits many small files; single large
+    files are better streamed with Pipeline.run. Outputs are written with
+    an AtomicWriter, creating their directories as needed, and at most
+    max_writes of them are written at a time before processing waits.
+
+    Parameters
+    ----------
+    pairs: list of tuples (string, string)
+        path of each input file and of the output file to write
+    text_pipeline: Pipeline
+        stages to pass the text of every file through
+    max_reads: int, default : MAX_READS
+        most files read at the same time
+    max_writes: int, default : MAX_WRITES
+        most files written at the same time
+    queue_size: int, default : QUEUE_SIZE
+        most files read ahead of processing
+    encoding: string, default : None
+        encoding of the files, the locale encoding if None
+    errors: string, default : 'strict'
+        how undecodable bytes are handled, see open
+
+    Returns
+    -------
+    result: tuple
+        number of files written, and the path and error message of each
+        file that could not be read or written
+    """
+
+    return asyncio.run(_transform_files(pairs, text_pipeline, max_reads,
+                                        max_writes, queue_size, encoding,
+                                        errors))
+
+
+def corpus_outfiles(filenames, path, outdir):
+    """ Pairs the files of a corpus with output files at the same relative
+    paths in an output directory
+
+    Parameters
+    ----------
+    filenames: list of strings
+        paths of the corpus files, as found by parallel.find_corpus_files
+    path: string
+        directory or glob pattern the files were found with
+    outdir: string
+        directory to write the output files to
+
+    Returns
+    -------
+    pairs: list of tuples (string, string)
+        path of each corpus file and of its output file
+    """
+
+    # paths are kept relative to the directory, or to the deepest directory
+    # that holds all files matched by a pattern
+    base = path
+    if not os.path.isdir(path) and filenames:
+        base = os.path.commonpath([os.path.dirname(os.path.abspath(filename))
+                                    for filename in filenames])
+    return [(filename, os.path.join(outdir, os.path.relpath(
+                                    os.path.abspath(filename),
+                                    os.path.abspath(base))))
+            for filename in filenames]
+
+
+async def _count_files(filenames, max_reads, queue_size, chunk_size,
+                        encoding, errors, count_only):
+    # counts the chunks queued by the readers as they arrive; maps of files
+    # that end before an earlier file are held back until it ends
+    queue = asyncio.Queue(queue_size)
+    window = asyncio.Semaphore(max_reads)  # files started but not merged
+    reading = asyncio.create_task(_read_files(filenames, queue, window,
+                                                max_reads, chunk_size,
+                                                encoding, errors))
+
+    word_count = 0
+    word_distribution = {}
+    word_map = {}
+    read_errors = []
+    counting = {}   # count, distribution, map and last word of open files
+    finished = {}   # counts of ended files waiting to be merged in order
+    next_merge = 0  # index of the next file to merge
+
+    for _ in range(len(filenames)):
+        while True:
+            index, text = await _next_chunk(queue, reading)
+            state = counting.get(index)
+            if state is None:
+                state = counting[index] = [0, Counter(), {}, None]
+
+            # a file ends with None, or with the error that stopped it
+            if text is None or isinstance(text, Exception):
+                break
+
+            with profiling.stage('count') as run:
+                tokens = tokenizer.tokenize(text)
+                if count_only:
+                    state[0] += len(tokens)
+                else:
+                    state[3] = tokenizer.count_tokens(tokens, state[1],
+                                                        state[2], state[3])
+                run.tokens += len(tokens)
+
+            # let finished reads start their next read
+            await asyncio.sleep(0)
+
+        del counting[index]
+        if text is None:
+            finished[index] = state
+        else:
+            finished[index] = None
+            read_errors.append((filenames[index], str(text)))
+
+        while next_merge in finished:
+            state = finished.pop(next_merge)
+            next_merge += 1
+            window.release()
+            if state is None:
+                continue
+            word_count += state[0]
+            parallel.merge_maps(word_distribution, word_map, state[1],
+                                    state[2])
+
+    await reading
+    if count_only:
+        return word_count, read_errors
+    return (word_distribution, word_map), read_errors
+
+
+async def _next_chunk(queue, reading):
+    # next queued chunk, raising the error that stopped the readers instead
+    # of waiting for the ends of files they will never queue
+    getting = asyncio.ensure_future(queue.get())
+    await asyncio.wait([getting, reading],
+                        return_when=asyncio.FIRST_COMPLETED)
+    if not getting.done() and reading.exception() is not None:
+        getting.cancel()
+        raise reading.exception()
+    return await getting
+
+
+async def _read_files(filenames, queue, window, max_reads, chunk_size,
+                        encoding, errors):
+    # reads the files in order with at most max_reads readers, each taking
+    # the next file once the window has room for it, which is released as
+    # files are merged
+    indices = iter(range(len(filenames)))
+
+    async def reader():
+        while True:
+            await window.acquire()
+            index = next(indices, None)
+            if index is None:
+                window.release()
+                return
+            await _read_file(index, filenames[index], queue, chunk_size,
+                                encoding, errors)
+
+    await asyncio.gather(*[reader() for _ in
+                            range(min(max_reads, len(filenames)))])
+
+
+async def _read_file(index, filename, queue, chunk_size, encoding, errors):
+    # queues the chunks of a file cut at whitespace, then None, or the error
+    # that stopped the read
+    f = None
+    carry = []  # pieces of the unfinished last word
+    carry_size = 0
+    try:
+        f, chunk = await asyncio.to_thread(_open_file, filename, chunk_size,
+                                            encoding, errors)
+        while chunk:
+            cut = tokenizer.last_word_start(chunk)
+            if cut:
+                await queue.put((index, ''.join(carry) + chunk[:cut]))
+                carry = []
+                carry_size = 0
+            if cut < len(chunk):
+                carry.append(chunk[cut:])
+                carry_size += len(chunk) - cut
+
+            # a word too long to hold back is counted in pieces, split where
+            # tokenizer.iter_token_chunks splits it
+            if carry_size >= tokenizer.MAX_WORD_LENGTH:
+                words, rest = tokenizer.split_long_word(''.join(carry)
+                                    .translate(tokenizer.PUNCTUATION_TABLE))
+                if words:
+                    await queue.put((index, ' '.join(words)))
+                carry = [rest] if rest else []
+                carry_size = len(rest)
+
+            # a file shorter than a chunk was read whole when it was opened
+            chunk = ''
+            if f is not None:
+                chunk = await asyncio.to_thread(_read_chunk, f, chunk_size)
+    except (OSError, ValueError, LookupError) as err:
+        await queue.put((index, err))
+        return
+    finally:
+        if f is not None:
+            await asyncio.to_thread(f.close)
+
+    if carry:
+        await queue.put((index, ''.join(carry)))
+    await queue.put((index, None))
+
+
+async def _transform_files(pairs, text_pipeline, max_reads, max_writes,
+                            queue_size, encoding, errors):
+    # processes each file as it is read and hands its output to a writer,
+    # waiting for a free writer when max_writes are busy
+    queue = asyncio.Queue(queue_size)
+    reading = asyncio.create_task(_read_whole_files(
+                                    [infile for infile, _ in pairs], queue,
+                                    max_reads, encoding, errors))
+    writers = asyncio.Semaphore(max_writes)
+    writes = []
+    failed = []
+
+    for _ in range(len(pairs)):
+        index, text = await queue.get()
+        infile, outfile = pairs[index]
+        if isinstance(text, Exception):
+            failed.append((infile, str(text)))
+            continue
+
+        output = ''.join(text_pipeline.process([text]))
+        await writers.acquire()
+        writes.append((outfile, asyncio.create_task(
+                                    _write_file(outfile, output, writers))))
+
+        # let finished reads and writes go on
+        await asyncio.sleep(0)
+
+    await reading
+    written = 0
+    for outfile, write in writes:
+        try:
+            await write
+            written += 1
+        except OSError as err:
+            failed.append((outfile, str(err)))
+    return written, failed
+
+
+async def _read_whole_files(filenames, queue, max_reads, encoding, errors):
+    # queues the whole text of every file, or the error that stopped the
+    # read, with at most max_reads files read at once
+    indices = iter(range(len(filenames)))
+
+    async def reader():
+        for index in indices:
+            try:
+                text = await asyncio.to_thread(_read_text, filenames[index],
+                                                encoding, errors)
+            except (OSError, ValueError, LookupError) as err:
+                text = err
+            await queue.put((index, text))
+
+    await asyncio.gather(*[reader() for _ in
+                            range(min(max_reads, len(filenames)))])
+
+
+async def _write_file(outfile, text, writers):
+    # writes a file in a thread and frees its writer
+    try:
+        await asyncio.to_thread(_write_text, outfile, text)
+    finally:
+        writers.release()
+
+
+def _open_file(filename, chunk_size, encoding, errors):
+    # opens a file and reads its first chunk in one thread call, closing it
+    # again if that was all of it
+    f = open(filename, 'r', encoding=encoding, errors=errors)
+    try:
+        chunk = _read_chunk(f, chunk_size)
+    except BaseException:
+        f.close()
+        raise
+    if len(chunk) < chunk_size:
+        f.close()
+        f = None
+    return f, chunk
+
+
+def _read_chunk(f, chunk_size):
+    # next chunk of an open file, run in a thread
+    with profiling.stage('read') as run:
+        chunk = f.read(chunk_size)
+        run.bytes += len(chunk)
+    return chunk
+
+
+def _read_text(filename, encoding, errors):
+    # whole text of a file, run in a thread
+    with profiling.stage('read') as run:
+        with open(filename, 'r', encoding=encoding, errors=errors) as f:
+            text = f.read()
+        run.bytes += len(text)
+    return text
+
+
+def _write_text(outfile, text):
+    # writes text to a file in its directory, run in a thread
+    directory = os.path.dirname(outfile)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with profiling.stage('write') as run:
+        with AtomicWriter(outfile) as f:
+            f.write(text)
+        run.bytes += len(text)
+
@@ -0,0 +1,305 @@
+import codecs
+import locale
+import mmap
+import re
+import string
+import tokenizer
+
+# global constants
+BLOCK_SIZE = 16 * 1024 * 1024   # bytes counted at a time
+TOKEN_BLOCK_SIZE = 1024 * 1024  # bytes tokenized at a time, one list of tokens
+ASCII_SPACES = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'  # whitespace to str.split
+PUNCTUATION_BYTES = string.punctuation.encode('ascii')
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))  # non-first bytes of UTF-8
+
+# maps whitespace bytes to 0 and all other bytes (including every byte of a
+# non-ASCII character) to 1, used with punctuation bytes deleted
+WORD_TABLE = bytes(0 if byte in ASCII_SPACES else 1 for byte in range(256))
+
+# maps whitespace bytes to spaces and ASCII capitals to lowercase, used with
+# punctuation bytes deleted so bytes.split gives tokens that only need
+# decoding and lowercasing of their non-ASCII characters
+TOKEN_TABLE = bytes(ord(' ') if byte in ASCII_SPACES else byte
+                    for byte in bytes(range(256)).lower())
+
+# UTF-8 encodings of the non-ASCII characters str.split treats as
+# whitespace, each pattern guarded by a prefix that is cheap to look for
+UNICODE_SPACES = [
+    (b'\xc2', re.compile(rb'\xc2[\x85\xa0]')),                # U+0085, U+00A0
+    (b'\xe1\x9a\x80', re.compile(rb'\xe1\x9a\x80')),          # U+1680
+    (b'\xe2\x80', re.compile(rb'\xe2\x80[\x80-\x8a\xa8\xa9\xaf]')),
+    (b'\xe2\x81\x9f', re.compile(rb'\xe2\x81\x9f')),          # U+205F
+    (b'\xe3\x80\x80', re.compile(rb'\xe3\x80\x80')),          # U+3000
+]
+
+
+def count_words(filename, start=0, end=None, block_size=BLOCK_SIZE):
+    """ Counts the words of a UTF-8 file over its raw bytes, giving the same
+    count as tokenizer.tokenize on the decoded text without decoding it or
+    building any words
+
+    The file is memory-mapped and read in large blocks. Each block is
+    reduced to one byte per non-punctuation byte (0 for whitespace, 1
+    otherwise) with a single bytes.translate call, and NumPy counts the
+    changes from whitespace to word.
+
+    Parameters
+    ----------
+    filename: string
+        path to a UTF-8 (or ASCII) encoded file
+    start: int, default : 0
+        byte offset to start counting at, the start of a word or whitespace
+    end: int, default : None
+        byte offset to stop counting at, the end of the file if None
+    block_size: int, default : BLOCK_SIZE
+        bytes counted at a time
+
+    Returns
+    -------
+    word_count: int
+        number of words in the byte range
+    """
+
+    with open(filename, 'rb') as f:
+        size = f.seek(0, 2)
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return 0
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            word_count = 0
+            after_space = True  # whether the last non-punctuation was space
+            while start < end:
+                block_end = _block_end(buffer, start, block_size, end)
+                count, after_space = count_block(buffer[start:block_end],
+                                                    after_space)
+                word_count += count
+                start = block_end
+    return word_count
+
+
+def count_block(block, after_space=True):
+    """ Counts the words starting in a block of UTF-8 bytes
+
+    Parameters
+    ----------
+    block: bytes
+        consecutive bytes of a text, not splitting any character
+    after_space: bool, default : True
+        whether the last non-punctuation byte before the block was
+        whitespace (or the block starts the text)
+
+    Returns
+    -------
+    word_count: int
+        number of words starting in the block
+    after_space: bool
+        whether the last non-punctuation byte of the block is whitespace
+    """
+
+    # NumPy is only needed once a file is counted
+    import numpy as np
+
+    if not block.isascii():
+        block = replace_unicode_spaces(block)
+
+    # punctuation is deleted before splitting, so it neither starts nor ends
+    # a word
+    classes = block.translate(WORD_TABLE, PUNCTUATION_BYTES)
+    if not classes:
+        return 0, after_space
+
+    is_word = np.frombuffer(classes, dtype=np.bool_)
+    word_count = int(np.count_nonzero(is_word[1:] > is_word[:-1]))
+    word_count += bool(is_word[0]) and after_space
+    return word_count, not is_word[-1]
+
+
+def iter_token_chunks(filename, block_size=TOKEN_BLOCK_SIZE):
+    """ Tokenizes a UTF-8 file over its memory-mapped bytes in large blocks,
+    without decoding it
+
+    Tokens are split like tokenizer.iter_token_chunks splits the decoded
+    text, also where it splits words longer than tokenizer.MAX_WORD_LENGTH,
+    but are left as bytes with only their ASCII letters lowercased, so they
+    are meant to be looked up in DecodedWords. The file is opened when this
+    is called, so a missing file raises here rather than on the first
+    chunk.
+
+    Parameters
+    ----------
+    filename: string
+        path to a UTF-8 (or ASCII) encoded file
+    block_size: int, default : TOKEN_BLOCK_SIZE
+        bytes tokenized at a time
+
+    Returns
+    -------
+    token_chunks: generator of lists of bytes
+        raw tokens of the file, one list per block (lists may be empty)
+    """
+
+    return _iter_token_chunks(open(filename, 'rb'), block_size)
+
+
+def _iter_token_chunks(f, block_size):
+    # tokens of an opened file, closing it when done
+    with f:
+        size = f.seek(0, 2)
+        if not size:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            carry = []      # pieces of the unfinished last token
+            carry_size = 0  # characters in carry
+            start = 0
+            while start < size:
+                block_end = _block_end(buffer, start, block_size, size)
+                block = buffer[start:block_end]
+                if not block.isascii():
+                    block = replace_unicode_spaces(block)
+                text = block.translate(TOKEN_TABLE, PUNCTUATION_BYTES)
+
+                # hold back everything after the last space since the token
+                # may continue in the next block
+                cut = text.rfind(b' ') + 1
+                tokens = []
+                if cut:
+                    tokens = _split_tokens(b''.join(carry) + text[:cut])
+                    carry = []
+                    carry_size = 0
+                if cut < len(text):
+                    carry.append(text[cut:])
+                    carry_size += _char_count(text[cut:])
+
+                # a token too long to hold back is split like the text
+                # backend splits long words
+                if carry_size >= tokenizer.MAX_WORD_LENGTH:
+                    long_tokens, rest = _split_long_token(b''.join(carry))
+                    tokens.extend(long_tokens)
+                    carry = [rest] if rest else []
+                    carry_size -= len(long_tokens) * tokenizer.MAX_WORD_LENGTH
+
+                yield tokens
+                start = block_end
+
+    # the held back piece is the final token of the file
+    if carry:
+        yield [b''.join(carry)]
+
+
+class DecodedWords(dict):
+    """ Words of raw tokens, each distinct token decoded and lowercased the
+    first time it is looked up, so decoding follows the vocabulary size
+    rather than the number of words in a file
+    """
+
+    def __init__(self, encoding='utf-8', errors='strict'):
+        """ Creates an empty mapping of raw tokens to words
+
+        Parameters
+        ----------
+        encoding: string, default : 'utf-8'
+            encoding of the tokens
+        errors: string, default : 'strict'
+            decoding error handler, as for bytes.decode
+        """
+
+        super().__init__()
+        self.encoding = encoding
+        self.errors = errors
+
+    def __missing__(self, token):
+        word = self[token] = token.decode(self.encoding, self.errors).lower()
+        return word
+
+
+def replace_unicode_spaces(block):
+    """ Replaces the UTF-8 encodings of non-ASCII whitespace with spaces
+
+    Parameters
+    ----------
+    block: bytes
+        UTF-8 encoded text
+
+    Returns
+    -------
+    block: bytes
+        text with ASCII whitespace only
+    """
+
+    for prefix, pattern in UNICODE_SPACES:
+        if prefix in block:
+            block = pattern.sub(b' ', block)
+    return block
+
+
+def is_utf8(encoding=None):
+    """ Checks whether an encoding is UTF-8, so its files can be counted over
+    their raw bytes
+
+    Parameters
+    ----------
+    encoding: string, default : None
+        name of the encoding, the one open() uses if None
+
+    Returns
+    -------
+    utf8: bool
+        True if the encoding is UTF-8
+    """
+
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    return codecs.lookup(encoding).name == 'utf-8'
+
+
+def _split_tokens(data):
+    # tokens of bytes with whitespace as spaces, split like
+    # tokenizer.tokenize splits words longer than tokenizer.MAX_WORD_LENGTH
+    tokens = data.split()
+
+    # other tokens take at least two bytes each with their whitespace, so
+    # most blocks cannot hold a token of that many characters
+    if len(data) - 2 * len(tokens) + 2 > tokenizer.MAX_WORD_LENGTH:
+        tokens = []
+        for token in data.split():
+            pieces, rest = _split_long_token(token)
+            tokens.extend(piece for piece in pieces + [rest] if piece)
+    return tokens
+
+
+def _char_count(data):
+    # number of UTF-8 characters in bytes that do not split any character
+    if data.isascii():
+        return len(data)
+    return len(data.translate(None, CONTINUATION_BYTES))
+
+
+def _split_long_token(token):
+    # pieces of tokenizer.MAX_WORD_LENGTH UTF-8 characters split off the
+    # front of a token, and the bytes after them
+    import numpy as np
+
+    length = tokenizer.MAX_WORD_LENGTH
+    if token.isascii():
+        end = len(token) - len(token) % length
+        return [token[start:start + length] for start in
+                range(0, end, length)], token[end:]
+
+    # every piece starts on the first byte of a character
+    data = np.frombuffer(token, dtype=np.uint8)
+    char_starts = np.flatnonzero((data & 0xC0) != 0x80)
+    cuts = char_starts[::length].tolist() + [len(token)]
+    count = len(char_starts) // length
+    return [token[cuts[index]:cuts[index + 1]] for index in
+            range(count)], token[cuts[count]:]
+
+
+def _block_end(buffer, start, block_size, end):
+    # end of the block starting at start, moved on to the first byte of a
+    # character so multi-byte characters are never split between blocks
+    block_end = min(start + block_size, end)
+    while block_end < end and 0x80 <= buffer[block_end] < 0xC0:
+        block_end += 1
+    return block_end
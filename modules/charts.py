@@ -0,0 +1,311 @@
+import csv
+import json
+import os
+
+# global constants
+IMAGE_FORMATS = ('png', 'svg', 'pdf')  # chart files drawn with matplotlib
+DATA_FORMATS = ('json', 'csv')         # chart files holding only the data
+FIGURE_SIZE = (6.4, 4.8)               # chart size in inches
+DPI = 100                              # dots per inch of PNG charts
+
+
+class Chart:
+    """ Data of a bar chart: a label and a value per bar, axis labels and a
+    title
+    """
+
+    def __init__(self, keys, values, x_axis, y_axis, title):
+        """ Creates a chart from its bars and labels
+
+        Parameters
+        ----------
+        keys: list of strings
+            label of each bar
+        values: list of ints
+            height of each bar
+        x_axis: string
+            label of the x axis
+        y_axis: string
+            label of the y axis
+        title: string
+            title of the chart
+        """
+
+        self.keys = list(keys)
+        self.values = list(values)
+        self.x_axis = x_axis
+        self.y_axis = y_axis
+        self.title = title
+
+    def to_dict(self):
+        """ Gets the chart data as a dictionary for JSON
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        chart: dictionary
+            title, x_axis, y_axis and the bars as a list of key and value
+        """
+
+        return {'title': self.title, 'x_axis': self.x_axis,
+                'y_axis': self.y_axis,
+                'bars': [[key, value] for key, value in
+                            zip(self.keys, self.values)]}
+
+
+class ChartRenderer:
+    """ Draws charts into files with the Agg backend, without a display
+
+    One figure is created on the first chart and cleared for each chart
+    after it, instead of building new pyplot state every time. Charts saved
+    as JSON or CSV are written without importing matplotlib.
+    """
+
+    def __init__(self, figure_size=FIGURE_SIZE, dpi=DPI):
+        """ Creates a renderer, the figure is only made for the first image
+
+        Parameters
+        ----------
+        figure_size: tuple of floats, default : FIGURE_SIZE
+            width and height of charts in inches
+        dpi: int, default : DPI
+            dots per inch of PNG charts
+        """
+
+        self.figure_size = figure_size
+        self.dpi = dpi
+        self.figure = None
+
+    def render(self, chart, outfile):
+        """ Saves a chart to a file in the format of its extension
+
+        Parameters
+        ----------
+        chart: Chart
+            chart to save
+        outfile: string
+            path of the file, ending in one of IMAGE_FORMATS or DATA_FORMATS
+
+        Returns
+        -------
+        None
+        """
+
+        fmt = chart_format(outfile)
+        if fmt in DATA_FORMATS:
+            write_chart_data(chart, outfile)
+            return
+
+        if self.figure is None:
+            # matplotlib is slow to import and only needed for images
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self.figure = Figure(figsize=self.figure_size, dpi=self.dpi)
+            FigureCanvasAgg(self.figure)
+
+        # same bar chart as draw_distribution shows on screen
+        self.figure.clear()
+        axes = self.figure.add_subplot()
+        y_position = range(len(chart.keys))
+        axes.bar(y_position, chart.values, align='center', alpha=0.5)
+        axes.set_xticks(y_position)
+        axes.set_xticklabels(chart.keys, rotation=90)
+        axes.set_ylabel(chart.y_axis)
+        axes.set_xlabel(chart.x_axis)
+        axes.set_title(chart.title)
+        axes.tick_params(axis='x', which='major', labelsize=7)
+        self.figure.tight_layout()
+        self.figure.savefig(outfile, format=fmt)
+
+
+class ParallelRenderer:
+    """ Renders charts in worker processes, each drawing into its own
+    reused figure, while the caller goes on building more charts
+
+    Images are queued to the workers as they are rendered; JSON and CSV
+    files are written at once since they are cheap. Close the renderer, or
+    leave its with block, to wait for all images.
+    """
+
+    def __init__(self, workers=None):
+        """ Creates a renderer, worker processes start with the first image
+
+        Parameters
+        ----------
+        workers: int, default : None
+            number of worker processes, all CPUs if None
+        """
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.executor = None
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def render(self, chart, outfile):
+        """ Saves a chart to a file in the format of its extension, in a
+        worker process for images
+
+        Parameters
+        ----------
+        chart: Chart
+            chart to save
+        outfile: string
+            path of the file, ending in one of IMAGE_FORMATS or DATA_FORMATS
+
+        Returns
+        -------
+        None
+        """
+
+        if chart_format(outfile) in DATA_FORMATS:
+            write_chart_data(chart, outfile)
+            return
+
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending.append((outfile, self.executor.submit(render_chart,
+                                                            chart, outfile)))
+
+    def close(self):
+        """ Waits for all queued images and stops the workers
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        errors: dictionary (string: string)
+            message for each file that could not be rendered
+        """
+
+        errors = {}
+        for outfile, future in self.pending:
+            try:
+                future.result()
+            except Exception as err:
+                errors[outfile] = str(err)
+        self.pending = []
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        return errors
+
+
+# renderer of this process, made by the first render_chart call
+_renderer = None
+
+
+def render_chart(chart, outfile):
+    """ Saves a chart to a file with the renderer of this process, so every
+    chart a process renders reuses one figure
+
+    Parameters
+    ----------
+    chart: Chart
+        chart to save
+    outfile: string
+        path of the file, ending in one of IMAGE_FORMATS or DATA_FORMATS
+
+    Returns
+    -------
+    None
+    """
+
+    global _renderer
+    if _renderer is None:
+        _renderer = ChartRenderer()
+    _renderer.render(chart, outfile)
+
+
+def render_charts(charts, workers=None):
+    """ Saves many charts in parallel
+
+    Parameters
+    ----------
+    charts: iterable of tuples (Chart, string)
+        each chart with the path of the file to save it to
+    workers: int, default : None
+        number of worker processes, all CPUs if None
+
+    Returns
+    -------
+    errors: dictionary (string: string)
+        message for each file that could not be rendered
+    """
+
+    renderer = ParallelRenderer(workers)
+    try:
+        for chart, outfile in charts:
+            renderer.render(chart, outfile)
+    finally:
+        errors = renderer.close()
+    return errors
+
+
+def write_chart_data(chart, outfile):
+    """ Writes the data of a chart as JSON or CSV, as chosen by the file
+    extension
+
+    Parameters
+    ----------
+    chart: Chart
+        chart to write
+    outfile: string
+        path of the file, ending in .json or .csv
+
+    Returns
+    -------
+    None
+    """
+
+    fmt = chart_format(outfile)
+    if fmt not in DATA_FORMATS:
+        raise ValueError('chart data can only be written as ' +
+                            ', '.join(DATA_FORMATS))
+
+    with open(outfile, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'json':
+            json.dump(chart.to_dict(), f, indent=2)
+            return
+
+        # the axis labels head the columns
+        writer = csv.writer(f)
+        writer.writerow([chart.x_axis, chart.y_axis])
+        writer.writerows(zip(chart.keys, chart.values))
+
+
+def chart_format(outfile):
+    """ Gets the chart format of a file from its extension
+
+    Parameters
+    ----------
+    outfile: string
+        path of a chart file
+
+    Returns
+    -------
+    fmt: string
+        one of IMAGE_FORMATS or DATA_FORMATS
+    """
+
+    fmt = os.path.splitext(outfile)[1][1:].lower()
+    if fmt not in IMAGE_FORMATS + DATA_FORMATS:
+        raise ValueError('chart files must end in .' +
+                            ', .'.join(IMAGE_FORMATS + DATA_FORMATS))
+    return fmt
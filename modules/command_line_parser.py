@@ -19,7 +19,8 @@ def create_argument_parser():
 
     # all additional parameters required by some calls
     parser.add_option('-i', '--infile', action='store', type='string', 
-                        dest='infile', help='option for input file')
+                        dest='infile', help='option for input file, ' + 
+                            'directory or glob pattern of files')
     parser.add_option('-o', '--outfile', action='store', type='string', 
                         dest='outfile', help='option for file to write to')
     parser.add_option('-w', '--word', action='store', type='string', 
@@ -27,9 +28,125 @@ def create_argument_parser():
     parser.add_option('-r', '--replace', action='store', type='string', 
                         dest='word_to_replace', help='option for word to' + 
                             ' replace from file')
+    parser.add_option('--replace-map', action='store', type='string', 
+                        dest='replace_map', help='option for file of words ' + 
+                            'to replace, one word, a tab and its new word ' + 
+                            'per line')
+    parser.add_option('--whole-word', action='store_true', dest='whole_word', 
+                        default=False, help='only replaces words that are ' + 
+                            'not part of a longer word')
+    parser.add_option('--compact', action='store_true', dest='compact', 
+                        default=False, help='stores word maps in compact ' + 
+                            'arrays to reduce memory on large files')
+    parser.add_option('--compat', action='store_true', dest='compat', 
+                        default=False, help='counts words of the decoded ' + 
+                            'text instead of the raw bytes of large files')
+    parser.add_option('--backend', action='store', type='choice', 
+                        choices=['text', 'mmap'], default='text', 
+                        dest='backend', help='option for reading files as ' + 
+                            'decoded text or as memory-mapped UTF-8 bytes')
+    parser.add_option('--encoding', action='store', type='string', 
+                        dest='encoding', help='option for encoding of input ' + 
+                            'files, defaults to the locale encoding')
+    parser.add_option('--errors', action='store', type='string', 
+                        default='strict', dest='errors', help='option for ' + 
+                            'handling undecodable bytes, such as replace ' + 
+                            'or ignore')
+    parser.add_option('-k', '--top', action='store', type='int', default=100, 
+                        dest='top', help='option for number of most ' + 
+                            'frequent words to show in charts')
+    parser.add_option('--tie-break', action='store', type='choice', 
+                        choices=['last', 'first', 'alphabetical'], 
+                        default='last', dest='tie_break', help='option ' + 
+                            'for ordering words with equal frequencies')
+    parser.add_option('--chart-out', action='store', type='string', 
+                        dest='chart_out', help='option for file to save ' + 
+                            'charts to instead of showing them, as png, ' + 
+                            'svg, pdf, json or csv; {name} and {action} ' + 
+                            'are replaced by the infile name and action')
+    parser.add_option('--chart-workers', action='store', type='int', 
+                        dest='chart_workers', help='option for number of ' + 
+                            'processes saving the charts of jobs, defaults ' + 
+                            'to all CPUs')
+    parser.add_option('-j', '--workers', action='store', type='int', 
+                        dest='workers', help='option for number of worker ' + 
+                            'processes, defaults to all CPUs')
+    parser.add_option('--export', action='store', type='string', 
+                        dest='export', help='option for file to write the ' + 
+                            'word maps of the infile to in a compact ' + 
+                            'binary format')
+    parser.add_option('--maps', action='store', type='string', dest='maps', 
+                        help='option for word maps file written with ' + 
+                            '--export to use instead of counting the ' + 
+                            'infile, memory-mapped')
+    parser.add_option('--reads', action='store', type='int', 
+                        dest='max_reads', help='option for number of files ' + 
+                            'of a directory or glob pattern read at once ' + 
+                            'while the ones already read are counted or ' + 
+                            'processed, for many files on slow storage')
+    parser.add_option('--cache-dir', action='store', type='string', 
+                        dest='cache_dir', help='option for directory to ' + 
+                            'cache word maps in')
+    parser.add_option('--cache-size', action='store', type='int', 
+                        default=512, dest='cache_size', help='option for ' + 
+                            'cache size limit in megabytes')
+    parser.add_option('--no-cache', action='store_true', dest='no_cache', 
+                        default=False, help='always rebuilds word maps ' + 
+                            'instead of using cached ones')
+    parser.add_option('--sample', action='store_true', dest='sample', 
+                        default=False, help='draws generated sentence words ' + 
+                            'at random weighted by frequency')
+    parser.add_option('--seed', action='store', type='int', dest='seed', 
+                        default=None, help='seed for random sentence words ' + 
+                            'with --sample')
     parser.add_option('-l', '--length', action='store', type='int', default=10, 
                         dest='sentence_length', help='option for length ' + 
                             'of desired sentence')
+    parser.add_option('--order', action='store', type='int', default=2, 
+                        dest='order', help='option for number of words in ' + 
+                            'the n-grams sentences and next words follow, ' + 
+                            'the word after up to order - 1 words')
+    parser.add_option('--min-count', action='store', type='int', default=1, 
+                        dest='min_count', help='option for fewest times an ' + 
+                            'n-gram must occur to be kept with --order')
+    parser.add_option('--prune-top', action='store', type='int', 
+                        dest='prune_top', help='option for most next words ' + 
+                            'kept per context with --order')
+    parser.add_option('--approximate', action='store', type='int', 
+                        dest='approximate', help='option for megabytes of ' + 
+                            'memory to estimate word and next word ' + 
+                            'frequencies in, for counts, distributions ' + 
+                            'and next words of files too large to count ' + 
+                            'exactly; -c prints the estimate of -w with ' + 
+                            'error bounds')
+    parser.add_option('--profile', action='store_true', dest='profile', 
+                        default=False, help='prints the time, bytes and ' + 
+                            'tokens of each stage, peak memory and cache ' + 
+                            'hit rate to stderr after the run')
+    parser.add_option('--profile-format', action='store', type='choice', 
+                        choices=['table', 'json'], default='table', 
+                        dest='profile_format', help='option for printing ' + 
+                            'the profile as a table or as JSON')
+
+    parser.add_option('--jobs', action='store', type='string', dest='jobs', 
+                        help='option for JSON file of jobs, each a list of ' + 
+                            'actions on one or more infiles, results are ' + 
+                            'printed as JSON')
+
+    parser.add_option('--incremental', action='store_true', 
+                        dest='incremental', default=False, help='only reads ' + 
+                            'text appended to the infile since its word ' + 
+                            'maps were cached')
+    parser.add_option('--follow', action='store_true', dest='follow', 
+                        default=False, help='keeps printing the count or ' + 
+                            'sentence as text is appended to the infile')
+    parser.add_option('--interval', action='store', type='float', 
+                        default=1.0, dest='interval', help='option for ' + 
+                            'seconds between checks for appended text')
+
+    parser.add_option('--port', action='store', type='int', default=8765, 
+                        dest='port', help='option for localhost port of ' + 
+                            'the query server')
 
     # all flags to perform certain text parsing actions
     parser.add_option('-c', '--count', action='store_true', dest='count', 
@@ -63,6 +180,18 @@ def create_argument_parser():
     parser.add_option('-u', '--update_file', action='store_true', 
                         dest='replace', default=False, 
                         help='replaces instances of chosen word with new ' + 
-                            'word from file and writes to outfile')
+                            'word, or all words of a replace map, from ' + 
+                            'file and writes to outfile')
+    parser.add_option('--batch', action='store_true', dest='batch', 
+                        default=False, help='runs every chosen action on ' + 
+                            'the input file, building its word maps once')
+    parser.add_option('--serve', action='store_true', dest='serve', 
+                        default=False, help='keeps the word maps of the ' + 
+                            'input file and any further files given as ' + 
+                            'arguments in memory and answers queries')
+    parser.add_option('--query', action='store_true', dest='query', 
+                        default=False, help='asks the query server for the ' + 
+                            'count, distribution, sentence or next word ' + 
+                            'distribution of the input file')
 
     return parser
\ No newline at end of file
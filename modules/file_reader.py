@@ -0,0 +1,147 @@
+import byte_tokenizer
+import codecs
+import profiling
+import tokenizer
+
+# global constants
+BACKENDS = ('text', 'mmap')  # ways of reading the words of a file
+CHUNK_SIZE = 1024 * 1024     # number of characters read per chunk as text
+
+
+class FileReader:
+    """ Reads the words of input files with a chosen backend, encoding and
+    handling of decoding errors
+
+    The text backend decodes a file in chunks and tokenizes the text. The
+    mmap backend memory-maps a UTF-8 file and tokenizes its raw bytes, so
+    only the distinct tokens are decoded, once each, through words. Both
+    give the same words in the same order.
+    """
+
+    def __init__(self, backend='text', encoding=None, errors='strict',
+                    chunk_size=CHUNK_SIZE,
+                    block_size=byte_tokenizer.TOKEN_BLOCK_SIZE):
+        """ Creates a reader for the specified backend and encoding
+
+        Parameters
+        ----------
+        backend: string, default : 'text'
+            how files are read, one of BACKENDS
+        encoding: string, default : None
+            encoding of the files, the one open() uses if None, the mmap
+            backend only reads UTF-8
+        errors: string, default : 'strict'
+            decoding error handler, as for open()
+        chunk_size: int, default : CHUNK_SIZE
+            number of characters read at a time by the text backend
+        block_size: int, default : byte_tokenizer.TOKEN_BLOCK_SIZE
+            bytes tokenized at a time by the mmap backend
+        """
+
+        if backend not in BACKENDS:
+            raise ValueError('backend must be one of ' + ', '.join(BACKENDS))
+        if encoding is not None:
+            codecs.lookup(encoding)
+        codecs.lookup_error(errors)
+        if backend == 'mmap' and not byte_tokenizer.is_utf8(encoding):
+            raise ValueError('the mmap backend only reads UTF-8 files')
+
+        self.backend = backend
+        self.encoding = encoding
+        self.errors = errors
+        self.chunk_size = chunk_size
+        self.block_size = block_size
+
+        # words of the raw tokens read by the mmap backend, kept between
+        # files so words they share are decoded once
+        self.words = None
+        if backend == 'mmap':
+            self.words = byte_tokenizer.DecodedWords('utf-8', errors)
+
+    def chunks(self, filename):
+        """ Reads a file and yields its decoded text in chunks
+
+        Parameters
+        ----------
+        filename: string
+            path to file to read from
+
+        Returns
+        -------
+        chunks: generator of strings
+            consecutive pieces of text from entered file
+        """
+
+        # open file if it exists, only one chunk is held in memory at a time
+        try:
+            f = open(filename, 'r', encoding=self.encoding,
+                        errors=self.errors)
+        except FileNotFoundError as err:
+            print(err)
+            exit()
+
+        with f:
+            while True:
+                with profiling.stage('read') as run:
+                    chunk = f.read(self.chunk_size)
+                    run.bytes += len(chunk)
+                if not chunk:
+                    break
+                yield chunk
+
+    def token_chunks(self, filename):
+        """ Tokenizes a file in consecutive chunks
+
+        Parameters
+        ----------
+        filename: string
+            path to file to read from
+
+        Returns
+        -------
+        token_chunks: generator of lists
+            tokens of the file, one list per chunk read; words for the text
+            backend, raw tokens to look up in words for the mmap backend
+        """
+
+        if self.words is None:
+            return tokenizer.iter_token_chunks(self.chunks(filename))
+
+        try:
+            token_chunks = byte_tokenizer.iter_token_chunks(filename,
+                                                            self.block_size)
+        except FileNotFoundError as err:
+            print(err)
+            exit()
+        token_chunks = profiling.iter_stage('tokenize', token_chunks,
+                                            tokens=len)
+
+        # a token of undecodable bytes only is no word once they are ignored
+        if self.errors == 'ignore':
+            words = self.words
+            token_chunks = ([token for token in tokens if words[token]]
+                                for tokens in token_chunks)
+        return token_chunks
+
+    def cache_kind(self, kind):
+        """ Gets the cache entry kind of a value read with this reader, which
+        differs from kind only if the encoding or error handler can change
+        the words read
+
+        Parameters
+        ----------
+        kind: string
+            name of the value cached for a file, such as 'maps'
+
+        Returns
+        -------
+        kind: string
+            name of the value read with this reader
+        """
+
+        if self.encoding is None and self.errors == 'strict':
+            return kind
+        encoding = self.encoding
+        if encoding is not None:
+            encoding = codecs.lookup(encoding).name
+        return '{}-{}-{}'.format(kind, encoding, self.errors)
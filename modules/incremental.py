@@ -0,0 +1,283 @@
+import byte_tokenizer
+import codecs
+import locale
+import os
+import threading
+import tokenizer
+from collections import Counter
+
+# global constants
+READ_SIZE = 1024 * 1024  # bytes of appended text read at a time
+CHECK_SIZE = 4096        # last bytes compared to notice rewritten files
+FOLLOW_INTERVAL = 1.0    # seconds between checks for appended text
+STORE_INTERVAL = 60.0    # least seconds between stores of followed maps
+
+
+class IncrementalMaps:
+    """ Word maps of a file that only grows, updated from the bytes appended
+    since the last update instead of reading the whole file again
+
+    Text is counted for good up to the last whitespace read, remembered as
+    a byte offset together with the last word counted. The words after it
+    may still grow when more text is appended, so they are counted until
+    the next update, which takes them back out and reads on from the
+    offset. The maps are always the same as those gen_maps_from_file builds
+    from the whole file. If the file shrinks, is replaced or its last bytes
+    read change, the maps are built again from the start.
+    """
+
+    def __init__(self, filename, encoding=None, errors='strict'):
+        """ Creates empty maps for a file, filled by update
+
+        Parameters
+        ----------
+        filename: string
+            path to input file
+        encoding: string, default : None
+            encoding of the file, the one open() uses if None, must encode
+            whitespace as ASCII does
+        errors: string, default : 'strict'
+            decoding error handler, as for open()
+        """
+
+        if encoding is None:
+            encoding = locale.getpreferredencoding(False)
+        if ' \t\n'.encode(encoding, 'replace') != b' \t\n':
+            raise ValueError('appended text can only be read in ASCII ' +
+                                'compatible encodings, not ' + encoding)
+        codecs.lookup_error(errors)
+
+        # the file is opened again by later updates, possibly from another
+        # working directory once the maps were cached
+        self.filename = os.path.abspath(filename)
+        self.encoding = encoding
+        self.errors = errors
+        self.reset()
+
+    def reset(self):
+        """ Forgets all counted text, so the next update reads the whole file
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        self.word_distribution = Counter()
+        self.word_map = {}
+        self.offset = 0         # bytes counted for good, up to whitespace
+        self.last_word = None   # last word counted for good
+        self.tail_words = []    # words after offset, taken back next update
+        self.size = 0           # bytes read up to the last update
+        self.file_id = None     # device and inode of the file read
+        self.check = b''        # last bytes read, to notice rewritten files
+
+    @property
+    def maps(self):
+        """ Word distribution and word map of the file as new dictionaries,
+        so changing them leaves the counted state as it is, None for both if
+        the file has no words
+        """
+
+        if not self.word_distribution:
+            return None, None
+        return dict(self.word_distribution), \
+            {word: dict(next_words) for word, next_words in
+                self.word_map.items()}
+
+    def update(self):
+        """ Counts the text appended to the file since the last update
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        bytes_read: int
+            number of appended bytes read, 0 if the file did not grow
+        """
+
+        try:
+            f = open(self.filename, 'rb')
+        except FileNotFoundError as err:
+            print(err)
+            exit()
+
+        with f:
+            stat = os.fstat(f.fileno())
+            if not self._is_appended(f, stat):
+                self.reset()
+            if stat.st_size == self.size:
+                return 0
+
+            # the words after the old offset are read again with what was
+            # appended to them
+            self._take_back_tail()
+            f.seek(self.offset)
+            carry = []       # pieces of the bytes after the last whitespace
+            carry_size = 0
+            check_size = tokenizer.MAX_WORD_LENGTH  # carry size to split at
+            block = f.read(READ_SIZE)
+            while block:
+                cut = _after_last_space(block)
+                if cut:
+                    data = b''.join(carry) + block[:cut]
+                    self.last_word = self._count_words(self._words(data),
+                                                        self.last_word)
+                    self.offset += len(data)
+                    carry = []
+                    carry_size = 0
+                    check_size = tokenizer.MAX_WORD_LENGTH
+                if cut < len(block):
+                    carry.append(block[cut:])
+                    carry_size += len(block) - cut
+
+                # a word too long to hold back is counted in pieces, split
+                # where tokenizer.iter_token_chunks splits it; bytes left
+                # that are mostly punctuation are decoded again only once
+                # they doubled
+                if carry_size >= check_size:
+                    carry = [self._count_long_word(b''.join(carry))]
+                    carry_size = len(carry[0])
+                    check_size = max(2 * carry_size,
+                                        tokenizer.MAX_WORD_LENGTH)
+                block = f.read(READ_SIZE)
+
+            # the words after the last whitespace may still grow
+            carry = b''.join(carry)
+            self.tail_words = self._words(carry)
+            self._count_words(self.tail_words, self.last_word)
+
+            bytes_read = self.offset + len(carry) - self.size
+            self.size = self.offset + len(carry)
+            self.file_id = (stat.st_dev, stat.st_ino)
+            f.seek(max(self.size - CHECK_SIZE, 0))
+            self.check = f.read(min(self.size, CHECK_SIZE))
+
+        return bytes_read
+
+    def follow(self, callback, interval=FOLLOW_INTERVAL, stop=None):
+        """ Keeps the maps up to date while the file grows, checking for
+        appended text at a fixed interval
+
+        Parameters
+        ----------
+        callback: function (IncrementalMaps: None)
+            called with these maps after the first update and after every
+            later update that read text
+        interval: float, default : FOLLOW_INTERVAL
+            seconds between checks
+        stop: threading.Event, default : None
+            ends following once set, follows until interrupted if None
+
+        Returns
+        -------
+        None
+        """
+
+        if stop is None:
+            stop = threading.Event()
+
+        first = True
+        while not stop.is_set():
+            if self.update() or first:
+                callback(self)
+            first = False
+            stop.wait(interval)
+
+    def _is_appended(self, f, stat):
+        # whether the file is the one read before with text appended only
+        if self.file_id is None:
+            return not self.size
+        if (stat.st_dev, stat.st_ino) != self.file_id or \
+                stat.st_size < self.size:
+            return False
+        f.seek(self.size - len(self.check))
+        return f.read(len(self.check)) == self.check
+
+    def _words(self, data):
+        # words of bytes ending in whitespace or at the end of the file
+        return tokenizer.tokenize(data.decode(self.encoding, self.errors))
+
+    def _count_words(self, words, prev_word):
+        return tokenizer.count_tokens(words, self.word_distribution,
+                                        self.word_map, prev_word)
+
+    def _count_long_word(self, data):
+        # counts the MAX_WORD_LENGTH character pieces of a word that starts
+        # at offset, returning the bytes of the word after them
+        decoder = codecs.getincrementaldecoder(self.encoding)(self.errors)
+        text = decoder.decode(data)
+        words, rest = tokenizer.split_long_word(
+                                text.translate(tokenizer.PUNCTUATION_TABLE))
+        if not words:
+            return data
+
+        self.last_word = self._count_words([word.lower() for word in words],
+                                            self.last_word)
+        size = _encoded_size(data, text[:_rest_start(text, len(rest))],
+                                self.encoding, self.errors)
+        self.offset += size
+        return data[size:]
+
+    def _take_back_tail(self):
+        # removes the counts of the words after offset, keys they added are
+        # deleted so counting them again inserts them in the same order
+        prev_word = self.last_word
+        for word in self.tail_words:
+            self.word_distribution[word] -= 1
+            if not self.word_distribution[word]:
+                del self.word_distribution[word]
+            if prev_word is not None:
+                next_words = self.word_map[prev_word]
+                next_words[word] -= 1
+                if not next_words[word]:
+                    del next_words[word]
+                    if not next_words:
+                        del self.word_map[prev_word]
+            prev_word = word
+        self.tail_words = []
+
+
+def _rest_start(text, rest_length):
+    # index of text after which rest_length characters are not punctuation
+    start = len(text)
+    length = 0
+    while length < rest_length:
+        step = rest_length - length
+        start -= step
+        length += len(text[start:start + step]
+                        .translate(tokenizer.PUNCTUATION_TABLE))
+    return start
+
+
+def _encoded_size(data, text, encoding, errors):
+    # number of bytes at the start of data decoded to text
+    try:
+        encoded = text.encode(encoding)
+        if data.startswith(encoded):
+            return len(encoded)
+    except UnicodeEncodeError:
+        pass
+
+    # characters replacing undecodable bytes are not encoded back to them,
+    # so search for the fewest bytes decoded to the characters instead
+    low = 0
+    high = len(data)
+    while low < high:
+        middle = (low + high) // 2
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        if len(decoder.decode(data[:middle])) < len(text):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _after_last_space(data):
+    # offset after the last ASCII whitespace byte, 0 if there is none
+    return max(data.rfind(space) for space in byte_tokenizer.ASCII_SPACES) + 1
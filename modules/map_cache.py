@@ -0,0 +1,284 @@
+import glob
+import hashlib
+import os
+import pickle
+import profiling
+import tempfile
+
+# global constants
+CACHE_VERSION = 1                     # bump when the cached formats change
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024 # size limit of the cache directory
+HASH_BLOCK_SIZE = 1024 * 1024         # bytes read at a time for content hash
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                    'text_utilities')
+
+
+class MapCache:
+    """ On-disk cache of values computed from files, such as word maps and
+    word counts
+
+    Entries are keyed by the absolute path, size and modification time of
+    the file, or by a hash of its content when content_hash is set, so an
+    entry is never returned for a file that changed since it was stored.
+    Entries of a file that was modified are deleted when the new entry is
+    stored. Reading an entry marks it as recently used, and the least
+    recently used entries are deleted when the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES,
+                    content_hash=False):
+        """ Creates a cache in the specified directory
+
+        Parameters
+        ----------
+        cache_dir: string, default : None
+            directory to keep entries in, taken from the TEXT_UTILITIES_CACHE
+            environment variable or ~/.cache/text_utilities if None
+        max_bytes: int, default : DEFAULT_MAX_BYTES
+            size limit of all entries together
+        content_hash: bool, default : False
+            key entries by a SHA-256 of the file content instead of its
+            path, size and modification time
+        """
+
+        if cache_dir is None:
+            cache_dir = os.environ.get('TEXT_UTILITIES_CACHE',
+                                        DEFAULT_CACHE_DIR)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.content_hash = content_hash
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, filename, kind):
+        """ Gets the name of the entry for a file in its current state
+
+        Parameters
+        ----------
+        filename: string
+            path to input file
+        kind: string
+            name of the value cached for the file, such as 'maps'
+
+        Returns
+        -------
+        key: string
+            entry file name, None if the file cannot be read
+        """
+
+        try:
+            if self.content_hash:
+                content_hash = _digest(hash_file(filename), CACHE_VERSION)
+                return '{}-content-{}.pickle'.format(kind, content_hash)
+
+            # path part of the key finds stale entries of the same file
+            path = os.path.abspath(filename)
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        path_hash = _digest(path)
+        state_hash = _digest(path, stat.st_size, stat.st_mtime_ns,
+                                CACHE_VERSION)
+        return '{}-{}-{}.pickle'.format(kind, path_hash, state_hash)
+
+    def path_key(self, filename, kind):
+        """ Gets the name of the entry for a file whatever its state, for 
+        values that are brought up to date with the file rather than 
+        computed again when it changes
+
+        Parameters
+        ----------
+        filename: string
+            path to input file
+        kind: string
+            name of the value cached for the file, such as 'appendable'
+
+        Returns
+        -------
+        key: string
+            entry file name
+        """
+
+        path_hash = _digest(os.path.abspath(filename), CACHE_VERSION)
+        return '{}-{}-latest.pickle'.format(kind, path_hash)
+
+    def load(self, key):
+        """ Gets a cached value
+
+        Parameters
+        ----------
+        key: string
+            entry name from key()
+
+        Returns
+        -------
+        value: object
+            the cached value, None if there is no such entry
+        """
+
+        if key is None:
+            self.misses += 1
+            profiling.record_cache(False)
+            return None
+
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with profiling.stage('cache') as run:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                    run.bytes += f.tell()
+            # mark the entry as recently used for eviction
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            profiling.record_cache(False)
+            return None
+        except Exception:
+            # an entry that is corrupt or was written by another version of
+            # the code can raise almost anything when unpickled, it is
+            # removed so it is built again
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            profiling.record_cache(False)
+            return None
+
+        self.hits += 1
+        profiling.record_cache(True)
+        return value
+
+    def store(self, key, value):
+        """ Writes a value to the cache and evicts entries over the size
+        limit
+
+        Parameters
+        ----------
+        key: string
+            entry name from key(), taken before the value was computed so
+            a file changed in the meantime is never cached as unchanged
+        value: object
+            picklable value to cache, must not be None
+
+        Returns
+        -------
+        None
+        """
+
+        if key is None:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # write to a temporary file and rename it so readers never see a
+            # partially written entry
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                                suffix='.tmp')
+        except OSError:
+            return
+
+        try:
+            with profiling.stage('cache') as run, os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                run.bytes += f.tell()
+            os.replace(temp_path, os.path.join(self.cache_dir, key))
+        except (OSError, pickle.PicklingError):
+            _remove(temp_path)
+            return
+
+        # entries for older versions of the same file can never be hit again
+        if not self.content_hash:
+            stale_pattern = glob.escape(key[:key.rindex('-')]) + '-*.pickle'
+            for path in glob.glob(os.path.join(glob.escape(self.cache_dir),
+                                                stale_pattern)):
+                if os.path.basename(path) != key:
+                    _remove(path)
+
+        self.evict()
+
+    def evict(self):
+        """ Deletes least recently used entries until the cache fits in
+        max_bytes
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        entries = []
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir),
+                                            '*.pickle')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # oldest use first
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        """ Deletes all entries
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir),
+                                            '*.pickle')):
+            _remove(path)
+
+
+def hash_file(filename):
+    """ Computes the SHA-256 of a file's content
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+
+    Returns
+    -------
+    digest: string
+        hexadecimal digest of the file
+    """
+
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        block = f.read(HASH_BLOCK_SIZE)
+        while block:
+            sha.update(block)
+            block = f.read(HASH_BLOCK_SIZE)
+    return sha.hexdigest()
+
+
+def _digest(*parts):
+    # short stable hash of the string form of the parts
+    text = '\0'.join(str(part) for part in parts)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _remove(path):
+    # entries may be removed concurrently by another process
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,327 @@
+import random
+from collections import Counter
+from operator import itemgetter
+from sentence_generator import build_alias_table, draw
+from top_k import top_k_items
+
+# global constants
+DEFAULT_ORDER = 3      # words in the longest n-grams counted
+ID_BITS = 32           # bits of a packed context key per word ID
+
+
+class NGramModel:
+    """ Next word counts after contexts of up to order - 1 words
+
+    Words are interned to integer IDs in order of first appearance, and a
+    context of k words is stored as one integer with the ID of each word in
+    ID_BITS bits, the last word in the lowest bits. Contexts of every
+    length from 1 to order - 1 are kept in their own table, mapping a
+    context key to the counts of the word IDs that follow it, so a
+    context that was never seen, or was pruned, backs off to its shorter
+    endings. With order 2 the model holds the same counts as the word map
+    from gen_word_maps.
+
+    Pruning drops next words seen fewer than min_count times and keeps only
+    the top_n most frequent next words of each context. It runs when
+    counting ends and, if prune_every is set, every time that many tokens
+    were counted, which bounds memory on large corpora at the cost of
+    n-grams that were pruned early restarting their count from zero.
+    """
+
+    def __init__(self, order=DEFAULT_ORDER, min_count=1, top_n=None,
+                    prune_every=None):
+        """ Creates an empty model
+
+        Parameters
+        ----------
+        order: int, default : DEFAULT_ORDER
+            number of words in the longest n-grams, 2 for word pairs
+        min_count: int, default : 1
+            fewest times a next word must follow a context to be kept
+        top_n: int, default : None
+            most next words kept per context, all if None
+        prune_every: int, default : None
+            number of tokens counted between pruning passes, only pruned
+            once counting ends if None
+        """
+
+        if order < 2:
+            raise ValueError('order must be at least 2')
+
+        self.order = order
+        self.min_count = min_count
+        self.top_n = top_n
+        self.prune_every = prune_every
+
+        self.word_ids = {}              # ID of each word
+        self.word_counts = Counter()    # frequency of each word ID
+        # next word ID counts of each context key, by context length
+        self.tables = [None] + [{} for _ in range(order - 1)]
+
+        self._history = []      # IDs of the last words counted
+        self._unpruned = 0      # tokens counted since the last pruning
+        self._words = []        # words in ID order, extended as needed
+        self._choices = {}      # most frequent next word or alias table
+
+    @classmethod
+    def from_token_chunks(cls, token_chunks, order=DEFAULT_ORDER,
+                            min_count=1, top_n=None, prune_every=None,
+                            words=None):
+        """ Counts the n-grams of consecutive lists of tokens
+
+        Parameters
+        ----------
+        token_chunks: iterable of lists
+            consecutive tokens of a text, as produced by
+            tokenizer.iter_token_chunks or FileReader.token_chunks
+        order: int, default : DEFAULT_ORDER
+            number of words in the longest n-grams
+        min_count: int, default : 1
+            fewest times a next word must follow a context to be kept
+        top_n: int, default : None
+            most next words kept per context, all if None
+        prune_every: int, default : None
+            number of tokens counted between pruning passes
+        words: dictionary, default : None
+            word of each token if the tokens are raw tokens, such as
+            FileReader.words, tokens are words if None
+
+        Returns
+        -------
+        model: NGramModel
+            pruned model of the tokens
+        """
+
+        model = cls(order, min_count, top_n, prune_every)
+        for tokens in token_chunks:
+            model.add_tokens(tokens, words)
+        model.prune()
+        return model
+
+    def add_tokens(self, tokens, words=None):
+        """ Counts the next chunk of tokens of a text, continuing the
+        n-grams of the chunks counted before
+
+        Parameters
+        ----------
+        tokens: list
+            consecutive tokens of the text
+        words: dictionary, default : None
+            word of each token if the tokens are raw tokens, tokens are
+            words if None
+
+        Returns
+        -------
+        None
+        """
+
+        if not tokens:
+            return
+
+        word_ids = self.word_ids
+        if words is not None:
+            tokens = map(words.__getitem__, tokens)
+        ids = [word_ids.setdefault(word, len(word_ids)) for word in tokens]
+        self.word_counts.update(ids)
+        self._choices = {}
+
+        # context keys of each length for every position after the first,
+        # built from the keys one word shorter
+        sequence = self._history + ids
+        start = len(self._history)
+        keys = sequence[:-1]
+        for length in range(1, self.order):
+            if length > 1:
+                keys = [(key << ID_BITS) | word_id for key, word_id in
+                        zip(keys[:-1], sequence[length - 1:-1])]
+            first = max(start, length)
+            pairs = Counter(zip(keys[first - length:], sequence[first:]))
+            _add_pairs(self.tables[length], pairs)
+
+        self._history = sequence[-(self.order - 1):]
+        self._unpruned += len(ids)
+        if self.prune_every is not None and \
+                self._unpruned >= self.prune_every:
+            self.prune()
+
+    def prune(self, min_count=None, top_n=None):
+        """ Drops rare next words of every context, and contexts left with
+        no next words
+
+        Parameters
+        ----------
+        min_count: int, default : None
+            fewest times a next word must follow a context to be kept, the
+            model's min_count if None
+        top_n: int, default : None
+            most next words kept per context, the model's top_n if None
+
+        Returns
+        -------
+        removed: int
+            number of next word counts dropped
+        """
+
+        if min_count is None:
+            min_count = self.min_count
+        if top_n is None:
+            top_n = self.top_n
+        self._unpruned = 0
+        self._choices = {}
+
+        removed = 0
+        for table in self.tables[1:]:
+            for key, next_counts in list(table.items()):
+                kept = next_counts
+                if min_count > 1:
+                    kept = {word_id: count for word_id, count in
+                            kept.items() if count >= min_count}
+                if top_n is not None and len(kept) > top_n:
+                    # keep insertion order, which decides ties later on
+                    top = dict(top_k_items(kept, top_n))
+                    kept = {word_id: count for word_id, count in
+                            kept.items() if word_id in top}
+
+                removed += len(next_counts) - len(kept)
+                if not kept:
+                    del table[key]
+                elif kept is not next_counts:
+                    table[key] = kept
+        return removed
+
+    @property
+    def words(self):
+        """ Words in ID order """
+
+        if len(self._words) < len(self.word_ids):
+            self._words.extend(list(self.word_ids)[len(self._words):])
+        return self._words
+
+    @property
+    def word_distribution(self):
+        """ Frequency of each word, in order of first appearance """
+
+        words = self.words
+        return {words[word_id]: count
+                for word_id, count in self.word_counts.items()}
+
+    @property
+    def word_map(self):
+        """ Next word frequencies of each word, as built by gen_word_maps """
+
+        words = self.words
+        return {words[key]: {words[word_id]: count
+                             for word_id, count in next_counts.items()}
+                for key, next_counts in self.tables[1].items()}
+
+    def __len__(self):
+        # number of distinct context and next word pairs kept
+        return sum(len(next_counts) for table in self.tables[1:]
+                    for next_counts in table.values())
+
+    def next_words(self, context):
+        """ Gets the frequencies of the words that follow a context
+
+        Parameters
+        ----------
+        context: list of strings
+            one to order - 1 consecutive words
+
+        Returns
+        -------
+        next_words: dictionary (string: int)
+            frequency of each word after the context, in order of first
+            appearance, None if the context was never seen or pruned
+        """
+
+        if not 0 < len(context) < self.order:
+            raise ValueError('context must have 1 to {} words'.format(
+                                self.order - 1))
+        try:
+            key = _pack([self.word_ids[word] for word in context])
+        except KeyError:
+            return None
+
+        next_counts = self.tables[len(context)].get(key)
+        if next_counts is None:
+            return None
+        words = self.words
+        return {words[word_id]: count
+                for word_id, count in next_counts.items()}
+
+    def generate(self, sentence_length=10, sample=False, rng=None):
+        """ Generates a sentence, choosing each word after the longest
+        context of the words before it that has next words
+
+        Parameters
+        ----------
+        sentence_length: int, default : 10
+            maximum number of words in the sentence
+        sample: bool, default : False
+            draw words at random weighted by frequency instead of always
+            taking the most frequent one
+        rng: random.Random, default : None
+            source of random numbers for sampling, a new unseeded one if
+            None
+
+        Returns
+        -------
+        sentence: string
+            generated words separated by spaces and ending with a period,
+            the same as SentenceGenerator gives for order 2
+        """
+
+        if sentence_length < 1 or not self.word_counts:
+            return '.'
+        if rng is None:
+            rng = random.Random()
+
+        ids = [self._choose(0, None, self.word_counts, sample, rng)]
+        while len(ids) < sentence_length:
+            word_id = None
+            for length in range(min(len(ids), self.order - 1), 0, -1):
+                key = _pack(ids[-length:])
+                next_counts = self.tables[length].get(key)
+                if next_counts:
+                    word_id = self._choose(length, key, next_counts, sample,
+                                            rng)
+                    break
+
+            # stop at a word that nothing ever follows
+            if word_id is None:
+                break
+            ids.append(word_id)
+
+        words = self.words
+        return ' '.join(words[word_id] for word_id in ids) + '.'
+
+    def _choose(self, length, key, counts, sample, rng):
+        # most frequent ID of counts, ties going to the ID added last, or an
+        # ID drawn by frequency, with the choice or alias table kept
+        choice = self._choices.get((length, key, sample))
+        if choice is None:
+            if sample:
+                choice = build_alias_table(counts)
+            else:
+                choice = max(reversed(list(counts.items())),
+                                key=itemgetter(1))[0]
+            self._choices[(length, key, sample)] = choice
+        return draw(choice, rng) if sample else choice
+
+
+def _pack(ids):
+    # context key of consecutive word IDs, the last one in the lowest bits
+    key = 0
+    for word_id in ids:
+        key = (key << ID_BITS) | word_id
+    return key
+
+
+def _add_pairs(table, pairs):
+    # adds counts of (context key, next word ID) pairs to a context table
+    for (key, word_id), count in pairs.items():
+        next_counts = table.get(key)
+        if next_counts is None:
+            table[key] = {word_id: count}
+        else:
+            next_counts[word_id] = next_counts.get(word_id, 0) + count
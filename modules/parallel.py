@@ -0,0 +1,609 @@
+import byte_tokenizer
+import codecs
+import glob
+import locale
+import os
+import re
+import sys
+import tokenizer
+from collections import Counter
+
+# global constants
+CHUNK_SIZE = 1024 * 1024   # number of characters read per chunk
+BATCHES_PER_WORKER = 8     # batches per worker, for balancing uneven files
+MIN_SHARD_SIZE = 1024 * 1024  # smallest byte range worth a separate worker
+WHITESPACE_PATTERN = re.compile(rb'\s')  # ASCII whitespace shards split at
+
+
+def is_corpus_path(path):
+    """ Checks if a path names several files instead of one
+
+    Parameters
+    ----------
+    path: string
+        path entered by the user
+
+    Returns
+    -------
+    True if path is a directory or a glob pattern, False otherwise
+    """
+
+    return os.path.isdir(path) or any(char in path for char in '*?[')
+
+
+def find_corpus_files(path):
+    """ Lists the files of a corpus
+
+    Parameters
+    ----------
+    path: string
+        directory to search recursively, or glob pattern (** matches any
+        number of directories)
+
+    Returns
+    -------
+    filenames: list of strings
+        sorted paths of all regular files in the corpus
+    """
+
+    if os.path.isdir(path):
+        path = os.path.join(glob.escape(path), '**', '*')
+
+    return sorted(filename for filename in glob.glob(path, recursive=True)
+                    if os.path.isfile(filename))
+
+
+def merge_maps(word_distribution, word_map, partial_distribution,
+                partial_map):
+    """ Adds partial word maps into combined word maps
+
+    Parameters
+    ----------
+    word_distribution: dictionary (string: int)
+        combined word frequencies, updated in place
+    word_map: dictionary (string: dict(string: int))
+        combined next word frequencies, updated in place
+    partial_distribution: dictionary (string: int)
+        word frequencies to add
+    partial_map: dictionary (string: dict(string: int))
+        next word frequencies to add
+
+    Returns
+    -------
+    None
+    """
+
+    for word, count in partial_distribution.items():
+        word_distribution[word] = word_distribution.get(word, 0) + count
+    for word, partial_next_words in partial_map.items():
+        next_words = word_map.get(word)
+        if next_words is None:
+            word_map[word] = partial_next_words
+        else:
+            for next_word, count in partial_next_words.items():
+                next_words[next_word] = next_words.get(next_word, 0) + count
+
+
+def gen_maps_from_corpus(path, workers=None, chunk_size=CHUNK_SIZE,
+                            max_reads=None):
+    """ Generates word distribution and individual word hashmaps for all
+    files in a corpus, counting files in parallel worker processes and
+    merging their maps. Words at the end of one file are not paired with
+    words at the start of the next
+
+    Parameters
+    ----------
+    path: string
+        directory or glob pattern of the corpus files
+    workers: int, default : None
+        number of worker processes, all CPUs if None, 1 counts in this
+        process
+    chunk_size: int, default : CHUNK_SIZE
+        number of characters read from each file at a time
+    max_reads: int, default : None
+        number of files each process reads at once in threads while it
+        counts the ones already read, see async_ingest, one after another
+        if None
+
+    Returns
+    -------
+    wordDistribution: dictionary (string: int)
+        hashmap of each word and their frequency, None if no words were read
+    wordDistributions: dictionary (string: dict(string: int))
+        hashmap of hashmaps that contains the number of times each next word
+        occurs after each word in the hashmap, None if no words were read
+    """
+
+    word_distribution = {}
+    word_map = {}
+
+    # reduce step, merge maps as each batch of files finishes
+    for partial, errors in _map_batches(path, workers, chunk_size, False,
+                                        max_reads):
+        merge_maps(word_distribution, word_map, *partial)
+        _report(errors)
+
+    if not word_distribution:
+        return None, None
+
+    return word_distribution, word_map
+
+
+def count_corpus_words(path, workers=None, chunk_size=CHUNK_SIZE,
+                        max_reads=None):
+    """ Gets number of words contained in all files of a corpus, counting
+    files in parallel worker processes
+
+    Parameters
+    ----------
+    path: string
+        directory or glob pattern of the corpus files
+    workers: int, default : None
+        number of worker processes, all CPUs if None, 1 counts in this
+        process
+    chunk_size: int, default : CHUNK_SIZE
+        number of characters read from each file at a time
+    max_reads: int, default : None
+        number of files each process reads at once, see
+        gen_maps_from_corpus
+
+    Returns
+    -------
+    word_count: int
+        number of words in the corpus
+    """
+
+    word_count = 0
+    for partial, errors in _map_batches(path, workers, chunk_size, True,
+                                        max_reads):
+        word_count += partial
+        _report(errors)
+
+    return word_count
+
+
+def gen_maps_sharded(filename, workers=None, chunk_size=CHUNK_SIZE,
+                        min_shard_size=MIN_SHARD_SIZE, encoding=None,
+                        errors='strict'):
+    """ Generates word distribution and individual word hashmaps for one
+    file by splitting it into byte ranges that are counted in parallel
+    worker processes. The pair formed by the last word of each shard and
+    the first word of the next is added when merging, so the maps are the
+    same as when the file is read in one pass
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    workers: int, default : None
+        number of worker processes and shards, all CPUs if None
+    chunk_size: int, default : CHUNK_SIZE
+        number of bytes read from the file at a time
+    min_shard_size: int, default : MIN_SHARD_SIZE
+        smallest shard in bytes, fewer shards are used for small files
+    encoding: string, default : None
+        encoding of the file, the locale encoding if None, it must encode
+        ASCII as single bytes, see can_shard
+    errors: string, default : 'strict'
+        how undecodable bytes are handled, see open
+
+    Returns
+    -------
+    wordDistribution: dictionary (string: int)
+        hashmap of each word and their frequency, None if no words were read
+    wordDistributions: dictionary (string: dict(string: int))
+        hashmap of hashmaps that contains the number of times each next word
+        occurs after each word in the hashmap, None if no words were read
+    """
+
+    word_distribution = {}
+    word_map = {}
+    prev_word = None  # last word of the shards merged so far
+
+    for shard in _map_shards(filename, workers, chunk_size, min_shard_size,
+                                False, encoding=encoding, errors=errors):
+        first_word, last_word, partial_distribution, partial_map = shard
+        if first_word is None:
+            continue
+
+        # fix up the pair that crosses the boundary to the previous shard
+        if prev_word is not None:
+            merge_maps(word_distribution, word_map, {},
+                        {prev_word: {first_word: 1}})
+        merge_maps(word_distribution, word_map, partial_distribution,
+                    partial_map)
+        prev_word = last_word
+
+    if not word_distribution:
+        return None, None
+
+    return word_distribution, word_map
+
+
+def count_words_sharded(filename, workers=None, chunk_size=CHUNK_SIZE,
+                        min_shard_size=MIN_SHARD_SIZE, compat=False):
+    """ Gets number of words contained in one file by counting byte ranges
+    of it in parallel worker processes
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    workers: int, default : None
+        number of worker processes and shards, all CPUs if None
+    chunk_size: int, default : CHUNK_SIZE
+        number of bytes read from the file at a time
+    min_shard_size: int, default : MIN_SHARD_SIZE
+        smallest shard in bytes, fewer shards are used for small files
+    compat: bool, default : False
+        decode every shard instead of counting UTF-8 shards over their raw 
+        bytes
+
+    Returns
+    -------
+    word_count: int
+        number of words in the file
+    """
+
+    return sum(_map_shards(filename, workers, chunk_size, min_shard_size,
+                            True, compat))
+
+
+def can_shard(encoding=None):
+    """ Checks if files of an encoding can be split into shards at
+    whitespace bytes, which needs ASCII to be encoded as single bytes
+
+    Parameters
+    ----------
+    encoding: string, default : None
+        encoding of the files, the locale encoding if None
+
+    Returns
+    -------
+    True if the encoding keeps ASCII as is, False otherwise, such as for
+    UTF-16 or encodings that start with a byte order mark
+    """
+
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    try:
+        return ' \tab\n'.encode(encoding) == b' \tab\n'
+    except (LookupError, UnicodeError):
+        return False
+
+
+def find_shard_offsets(filename, shard_count):
+    """ Splits a file into byte ranges that start and end at whitespace, so
+    no word is split between two shards
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    shard_count: int
+        number of shards to aim for
+
+    Returns
+    -------
+    offsets: list of ints
+        increasing byte offsets starting with 0 and ending with the file
+        size, shard i is offsets[i]:offsets[i + 1]
+    """
+
+    size = os.path.getsize(filename)
+    offsets = [0]
+
+    with open(filename, 'rb') as f:
+        for index in range(1, shard_count):
+            # move each even split point forward to the next whitespace byte
+            position = max(size * index // shard_count, offsets[-1])
+            f.seek(position)
+            while True:
+                block = f.read(4096)
+                if not block:
+                    position = size
+                    break
+                found = WHITESPACE_PATTERN.search(block)
+                if found:
+                    position += found.start()
+                    break
+                position += len(block)
+
+            if position >= size:
+                break
+            if position > offsets[-1]:
+                offsets.append(position)
+
+    offsets.append(size)
+    return offsets
+
+
+def _map_batches(path, workers, chunk_size, count_only, max_reads=None):
+    """ Runs _count_batch over batches of corpus files, in worker processes
+    if more than one worker is used
+
+    Parameters
+    ----------
+    path: string
+        directory or glob pattern of the corpus files
+    workers: int
+        number of worker processes, all CPUs if None
+    chunk_size: int
+        number of characters read from each file at a time
+    count_only: bool
+        only count words instead of building word maps
+    max_reads: int, default : None
+        number of files each batch reads at once, see _count_batch
+
+    Returns
+    -------
+    results: generator of tuples
+        result of _count_batch for each batch, in batch order so merged
+        maps do not depend on worker timing
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    filenames = find_corpus_files(path)
+    if not filenames:
+        print('no files found for corpus: ' + path, file=sys.stderr)
+        return
+
+    batches = _split_batches(filenames, workers * BATCHES_PER_WORKER)
+    if workers == 1 or len(batches) == 1:
+        for batch in batches:
+            yield _count_batch(batch, chunk_size, count_only, max_reads)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_count_batch, batch, chunk_size,
+                                    count_only, max_reads)
+                    for batch in batches]
+        for future in futures:
+            yield future.result()
+
+
+def _map_shards(filename, workers, chunk_size, min_shard_size, count_only,
+                compat=False, encoding=None, errors='strict'):
+    """ Runs _count_shard over the shards of a file, in worker processes if
+    more than one shard is used
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    workers: int
+        number of worker processes and shards, all CPUs if None
+    chunk_size: int
+        number of bytes read from the file at a time
+    min_shard_size: int
+        smallest shard in bytes
+    count_only: bool
+        only count words instead of building word maps
+    compat: bool, default : False
+        decode shards even when only counting UTF-8 text
+    encoding: string, default : None
+        encoding of the file, the locale encoding if None
+    errors: string, default : 'strict'
+        how undecodable bytes are handled, see open
+
+    Returns
+    -------
+    results: generator
+        result of _count_shard for each shard, in file order
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # fewer shards for small files, each needs at least min_shard_size bytes
+    size = os.path.getsize(filename)
+    shard_count = max(min(workers, size // max(min_shard_size, 1)), 1)
+    offsets = find_shard_offsets(filename, shard_count)
+
+    # decode shards the same way open() decodes the whole file
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    shards = [(filename, start, end, encoding, chunk_size, count_only, 
+                compat, errors) for start, end in zip(offsets, offsets[1:])]
+
+    if len(shards) == 1:
+        yield _count_shard(*shards[0])
+        return
+
+    workers = min(workers, len(shards))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_count_shard, *shard) for shard in shards]
+        for future in futures:
+            yield future.result()
+
+
+def _count_shard(filename, start, end, encoding, chunk_size, count_only,
+                    compat=False, errors='strict'):
+    """ Counts the words in one byte range of a file, run inside a worker
+    process
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    start: int
+        offset of the first byte of the shard
+    end: int
+        offset after the last byte of the shard
+    encoding: string
+        text encoding of the file
+    chunk_size: int
+        number of bytes read from the file at a time
+    count_only: bool
+        only count words instead of building word maps
+    compat: bool, default : False
+        decode the shard even when only counting UTF-8 text
+    errors: string, default : 'strict'
+        how undecodable bytes are handled, see open
+
+    Returns
+    -------
+    result: int or tuple
+        number of words if count_only, otherwise the first word, last word,
+        word distribution and word map of the shard (words are None for a
+        shard without words)
+    """
+
+    # UTF-8 text is counted over its raw bytes without decoding it
+    if count_only and not compat and byte_tokenizer.is_utf8(encoding):
+        return byte_tokenizer.count_words(filename, start, end)
+
+    word_count = 0
+    word_distribution = Counter()
+    word_map = {}
+    first_word = None
+    prev_word = None
+
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+
+        # decode the shard block by block, only up to its end offset
+        def chunks():
+            remaining = end - start
+            while remaining > 0:
+                block = f.read(min(chunk_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield decoder.decode(block)
+            yield decoder.decode(b'', final=True)
+
+        for tokens in tokenizer.iter_token_chunks(chunks()):
+            if count_only:
+                word_count += len(tokens)
+            elif tokens:
+                if first_word is None:
+                    first_word = tokens[0]
+                prev_word = tokenizer.count_tokens(tokens, word_distribution,
+                                                    word_map, prev_word)
+
+    if count_only:
+        return word_count
+    return first_word, prev_word, word_distribution, word_map
+
+
+def _split_batches(filenames, batch_count):
+    """ Splits files into batches with about the same number of bytes, so
+    workers get even amounts of work and return few partial maps
+
+    Parameters
+    ----------
+    filenames: list of strings
+        paths of the files to split
+    batch_count: int
+        number of batches to aim for
+
+    Returns
+    -------
+    batches: list of lists of strings
+        non-empty batches of paths
+    """
+
+    sizes = []
+    for filename in filenames:
+        try:
+            sizes.append(os.path.getsize(filename))
+        except OSError:
+            sizes.append(0)
+
+    # start a new batch each time the target number of bytes is reached
+    target = max(sum(sizes) // batch_count, 1)
+    batches = [[]]
+    batch_bytes = 0
+    for filename, size in zip(filenames, sizes):
+        if batch_bytes >= target:
+            batches.append([])
+            batch_bytes = 0
+        batches[-1].append(filename)
+        batch_bytes += size
+
+    return batches
+
+
+def _count_batch(filenames, chunk_size, count_only, max_reads=None):
+    """ Counts the words of a batch of files, run inside a worker process
+
+    Parameters
+    ----------
+    filenames: list of strings
+        paths of the files to count
+    chunk_size: int
+        number of characters read from each file at a time
+    count_only: bool
+        only count words instead of building word maps
+    max_reads: int, default : None
+        number of files read at once in threads while the ones already
+        read are counted, one after another if None or 1
+
+    Returns
+    -------
+    partial: int or tuple
+        number of words if count_only, otherwise the word distribution and
+        word map of the batch
+    errors: list of tuples (string, string)
+        path and error message of each file that could not be read
+    """
+
+    # overlap reading files with counting them, for slow storage
+    if max_reads is not None and max_reads > 1:
+        import async_ingest
+
+        if count_only:
+            return async_ingest.count_files_words(filenames, max_reads,
+                                                    chunk_size=chunk_size)
+        maps, errors = async_ingest.gen_maps_from_files(filenames, max_reads,
+                                                    chunk_size=chunk_size)
+        if maps[0] is None:
+            maps = {}, {}
+        return maps, errors
+
+    word_count = 0
+    word_distribution = Counter()
+    word_map = {}
+    errors = []
+
+    for filename in filenames:
+        # count each file into its own maps first so a file that fails
+        # halfway does not leave partial counts behind
+        file_count = 0
+        file_distribution = Counter()
+        file_map = {}
+        prev_word = None
+        try:
+            with open(filename, 'r') as f:
+                chunks = iter(lambda: f.read(chunk_size), '')
+                for tokens in tokenizer.iter_token_chunks(chunks):
+                    if count_only:
+                        file_count += len(tokens)
+                    else:
+                        prev_word = tokenizer.count_tokens(tokens,
+                                    file_distribution, file_map, prev_word)
+        except (OSError, UnicodeDecodeError) as err:
+            errors.append((filename, str(err)))
+            continue
+
+        word_count += file_count
+        merge_maps(word_distribution, word_map, file_distribution, file_map)
+
+    if count_only:
+        return word_count, errors
+    return (word_distribution, word_map), errors
+
+
+def _report(errors):
+    # bad files are reported and skipped instead of stopping the run
+    for filename, message in errors:
+        print('skipping ' + filename + ': ' + message, file=sys.stderr)
@@ -0,0 +1,199 @@
+import os
+import profiling
+import tempfile
+import tokenizer
+
+# global constants
+WRITE_BUFFER_SIZE = 1024 * 1024  # bytes buffered before writing to disk
+
+
+class Pipeline:
+    """ Streaming text processing pipeline
+
+    Text is read in chunks, split into batches of words and the whitespace
+    around them, passed through each stage in order and joined back into
+    text as it is written, so only a chunk of the text is in memory at a
+    time. A stage is a function that takes an iterable of batches and
+    returns a generator of batches, where a batch is a tuple of separators,
+    words and keep flags (None until a stage drops words) as produced by
+    tokenizer.iter_word_batches.
+    """
+
+    def __init__(self, *stages):
+        """ Creates a pipeline from stages applied in order
+
+        Parameters
+        ----------
+        *stages: functions (iterable of batches: generator of batches)
+            stages, such as those made by stopword_stage and stem_stage
+        """
+
+        self.stages = list(stages)
+
+    def process(self, chunks):
+        """ Passes consecutive chunks of a text through all stages
+
+        Parameters
+        ----------
+        chunks: iterable of strings
+            consecutive pieces of a text
+
+        Returns
+        -------
+        chunks: generator of strings
+            consecutive pieces of the processed text
+        """
+
+        batches = ((separators, words, None) for separators, words in
+                    profiling.iter_stage('tokenize',
+                                        tokenizer.iter_word_batches(chunks),
+                                        tokens=lambda batch: len(batch[1])))
+        for stage in self.stages:
+            batches = stage(batches)
+        return profiling.iter_stage('join',
+                                    tokenizer.iter_joined_batches(batches))
+
+    def run(self, chunks, outfile):
+        """ Processes consecutive chunks of a text and writes the result to a
+        file, which is only replaced once all text was processed
+
+        Parameters
+        ----------
+        chunks: iterable of strings
+            consecutive pieces of a text
+        outfile: string
+            path to output file
+
+        Returns
+        -------
+        None
+        """
+
+        with AtomicWriter(outfile) as f:
+            for text in self.process(chunks):
+                with profiling.stage('write') as run:
+                    f.write(text)
+                    run.bytes += len(text)
+
+
+def stopword_stage(stopword_filter):
+    """ Makes a stage that drops stopwords
+
+    Parameters
+    ----------
+    stopword_filter: StopwordFilter
+        filter with the stopwords to drop
+
+    Returns
+    -------
+    stage: function (iterable of batches: generator of batches)
+        pipeline stage
+    """
+
+    keeps = stopword_filter.keeps
+
+    def stage(batches):
+        for separators, words, keep in batches:
+            with profiling.stage('stopwords') as run:
+                if keep is None:
+                    keep = list(map(keeps, words))
+                else:
+                    keep = [kept and keeps(word)
+                            for word, kept in zip(words, keep)]
+                run.tokens += len(words)
+            yield separators, words, keep
+
+    return stage
+
+
+def stem_stage(stemmer):
+    """ Makes a stage that stems words
+
+    Parameters
+    ----------
+    stemmer: CachedStemmer
+        stemmer to apply
+
+    Returns
+    -------
+    stage: function (iterable of batches: generator of batches)
+        pipeline stage
+    """
+
+    def stage(batches):
+        for separators, words, keep in batches:
+            # words that are dropped anyway are not stemmed
+            with profiling.stage('stem') as run:
+                if keep is None:
+                    words = stemmer.stem_all(words)
+                else:
+                    words = [stemmer.stem(word) if kept else word
+                                for word, kept in zip(words, keep)]
+                run.tokens += len(words)
+            yield separators, words, keep
+
+    return stage
+
+
+class AtomicWriter:
+    """ Buffered text file writer that writes to a temporary file next to
+    the target and renames it over the target when closed without error, so
+    the target never holds partial output
+    """
+
+    def __init__(self, outfile, buffer_size=WRITE_BUFFER_SIZE):
+        """ Creates a writer for the specified file
+
+        Parameters
+        ----------
+        outfile: string
+            path to output file
+        buffer_size: int, default : WRITE_BUFFER_SIZE
+            bytes buffered before each write to disk
+        """
+
+        self.outfile = outfile
+        self.buffer_size = buffer_size
+        self.temp_path = None
+        self.file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.outfile))
+        fd, self.temp_path = _create_temp_file(directory)
+
+        # a replaced file keeps its permissions, a new one gets those a
+        # plainly created file would have
+        try:
+            mode = os.stat(self.outfile).st_mode & 0o777
+        except OSError:
+            mode = None
+        if mode is not None:
+            os.chmod(self.temp_path, mode)
+        self.file = os.fdopen(fd, 'w', buffering=self.buffer_size)
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.temp_path, self.outfile)
+        else:
+            # leave the target untouched, also when the run was cut short
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+        return False
+
+
+def _create_temp_file(directory):
+    # creates a new file with a random name in directory, with the default
+    # mode so the kernel applies the umask (mkstemp makes it private, and
+    # reading the umask means changing it for every thread)
+    while True:
+        path = os.path.join(directory, tempfile.gettempprefix() +
+                            os.urandom(6).hex() + '.tmp')
+        try:
+            return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                            0o666), path
+        except FileExistsError:
+            continue
@@ -0,0 +1,396 @@
+import contextlib
+import json
+import sys
+import threading
+import time
+
+# global constants
+FORMATS = ('table', 'json')  # formats a profile report can be written in
+MB = 1024 * 1024             # bytes in a megabyte
+
+
+class StageRun:
+    """ One run of a profiled stage, such as reading a chunk of a file or
+    counting the words of a chunk
+
+    The code of the stage adds the bytes and tokens it processed, counting
+    characters as bytes where the text is already decoded. The time
+    spent in stages run inside it, such as reading the chunks a tokenizer
+    consumes, is not counted in its seconds, so the seconds of all stages
+    add up to the time spent in any of them.
+    """
+
+    def __init__(self, name):
+        """ Creates a run of the named stage with nothing processed yet
+
+        Parameters
+        ----------
+        name: string
+            name of the stage, such as 'read' or 'tokenize'
+        """
+
+        self.name = name
+        self.bytes = 0
+        self.tokens = 0
+        self.seconds = 0.0
+        self.child_seconds = 0.0
+
+
+class Profiler:
+    """ Collects the wall time, bytes and tokens of every stage run while
+    it is enabled, together with the hit rate of map caches
+
+    Stages are timed where text_utilities and the modules it uses call
+    stage or iter_stage, which do nothing unless a profiler is enabled.
+    Work done in worker processes is timed as a whole by the stage that
+    waits for it. Hooks are called with each StageRun as it ends, for
+    callers that want the measurements as they are made.
+    """
+
+    def __init__(self, hooks=None):
+        """ Creates a profiler with no stages recorded
+
+        Parameters
+        ----------
+        hooks: list of functions (StageRun: None), default : None
+            functions called with every stage run as it ends
+        """
+
+        self.hooks = list(hooks or [])
+        self.stages = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __enter__(self):
+        enable(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        disable()
+        return False
+
+    def add_hook(self, hook):
+        """ Adds a function called with every stage run as it ends
+
+        Parameters
+        ----------
+        hook: function (StageRun: None)
+            function to call
+
+        Returns
+        -------
+        None
+        """
+
+        self.hooks.append(hook)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """ Times a run of a stage, excluding the stages run inside it
+
+        Parameters
+        ----------
+        name: string
+            name of the stage
+
+        Returns
+        -------
+        run: StageRun
+            run of the stage, to add the bytes and tokens processed to
+        """
+
+        # each thread nests its own stages
+        stack = self._local.__dict__.setdefault('stack', [])
+        run = StageRun(name)
+        stack.append(run)
+        start = time.perf_counter()
+        try:
+            yield run
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1].child_seconds += elapsed
+            run.seconds = elapsed - run.child_seconds
+            self._record(run)
+
+    def record_cache(self, hit):
+        """ Counts a map cache lookup
+
+        Parameters
+        ----------
+        hit: bool
+            whether the value was found in the cache
+
+        Returns
+        -------
+        None
+        """
+
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def report(self):
+        """ Summarizes the stages recorded so far
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        report: dictionary
+            wall_seconds since the profiler was created, seconds spent
+            outside all stages, peak_rss_mb of the process (None where it
+            is unknown), the stages in the order they first ran with their
+            calls, seconds, bytes, tokens, mb_per_s and tokens_per_s, and
+            the cache hits, misses and hit_rate (None without lookups)
+        """
+
+        wall_seconds = time.perf_counter() - self.start
+        with self._lock:
+            stages = [dict(stats) for stats in self.stages.values()]
+            hits, misses = self.cache_hits, self.cache_misses
+
+        for stats in stages:
+            seconds = stats['seconds']
+            stats['mb_per_s'] = stats['bytes'] / MB / seconds \
+                                    if seconds and stats['bytes'] else None
+            stats['tokens_per_s'] = stats['tokens'] / seconds \
+                                    if seconds and stats['tokens'] else None
+
+        lookups = hits + misses
+        return {'wall_seconds': wall_seconds,
+                'unprofiled_seconds': wall_seconds -
+                                        sum(s['seconds'] for s in stages),
+                'peak_rss_mb': peak_rss_mb(),
+                'stages': stages,
+                'cache': {'hits': hits, 'misses': misses,
+                            'hit_rate': hits / lookups if lookups else None}}
+
+    def _record(self, run):
+        with self._lock:
+            stats = self.stages.get(run.name)
+            if stats is None:
+                stats = {'stage': run.name, 'calls': 0, 'seconds': 0.0,
+                            'bytes': 0, 'tokens': 0}
+                self.stages[run.name] = stats
+            stats['calls'] += 1
+            stats['seconds'] += run.seconds
+            stats['bytes'] += run.bytes
+            stats['tokens'] += run.tokens
+        for hook in self.hooks:
+            hook(run)
+
+
+# profiler stages are recorded in, None while profiling is off
+_profiler = None
+# stage context used while profiling is off, its run is discarded
+_NO_STAGE = contextlib.nullcontext(StageRun(None))
+
+
+def enable(profiler=None):
+    """ Starts recording stages in a profiler
+
+    Parameters
+    ----------
+    profiler: Profiler, default : None
+        profiler to record in, a new one if None
+
+    Returns
+    -------
+    profiler: Profiler
+        the enabled profiler
+    """
+
+    global _profiler
+    if profiler is None:
+        profiler = Profiler()
+    _profiler = profiler
+    return profiler
+
+
+def disable():
+    """ Stops recording stages
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    profiler: Profiler
+        the profiler that was enabled, None if profiling was off
+    """
+
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def active_profiler():
+    """ Gets the enabled profiler, None if profiling is off """
+
+    return _profiler
+
+
+def stage(name):
+    """ Times a run of a stage in the enabled profiler
+
+    Parameters
+    ----------
+    name: string
+        name of the stage
+
+    Returns
+    -------
+    context: context manager
+        gives the StageRun to add the bytes and tokens processed to, and
+        records nothing while profiling is off
+    """
+
+    if _profiler is None:
+        return _NO_STAGE
+    return _profiler.stage(name)
+
+
+def iter_stage(name, iterable, size=None, tokens=None):
+    """ Times getting each item of an iterable as a run of a stage, such as
+    reading the next chunk of a file
+
+    Parameters
+    ----------
+    name: string
+        name of the stage
+    iterable: iterable
+        items to time, the work is done as each one is taken
+    size: function (item: int), default : None
+        bytes processed for an item, none are counted if None
+    tokens: function (item: int), default : None
+        tokens processed for an item, none are counted if None
+
+    Returns
+    -------
+    items: iterable
+        the same items, the iterable itself while profiling is off
+    """
+
+    if _profiler is None:
+        return iterable
+    return _iter_stage(_profiler, name, iter(iterable), size, tokens)
+
+
+def record_cache(hit):
+    """ Counts a map cache lookup in the enabled profiler, if any
+
+    Parameters
+    ----------
+    hit: bool
+        whether the value was found in the cache
+
+    Returns
+    -------
+    None
+    """
+
+    if _profiler is not None:
+        _profiler.record_cache(hit)
+
+
+def peak_rss_mb():
+    """ Gets the peak resident memory of this process
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    peak_rss_mb: float
+        peak resident memory in MB, None where it cannot be read
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / MB
+    return peak / 1024
+
+
+def format_report(report, fmt='table'):
+    """ Writes a profile report as text
+
+    Parameters
+    ----------
+    report: dictionary
+        report as made by Profiler.report
+    fmt: string, default : 'table'
+        'table' for a table to read, 'json' for a JSON object
+
+    Returns
+    -------
+    text: string
+        the formatted report
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError('format must be one of ' + ', '.join(FORMATS))
+    if fmt == 'json':
+        return json.dumps(report, indent=2)
+
+    row = '{:<14} {:>7} {:>9} {:>7} {:>11} {:>10} {:>12}'
+    lines = [row.format('stage', 'calls', 'seconds', 'share', 'MB',
+                        'MB/s', 'tokens/s')]
+    wall_seconds = report['wall_seconds'] or 1.0
+    for stats in report['stages'] + [{'stage': '(other)', 'calls': '',
+                    'seconds': report['unprofiled_seconds'], 'bytes': 0,
+                    'mb_per_s': None, 'tokens_per_s': None}]:
+        lines.append(row.format(stats['stage'], stats['calls'],
+                        '{:.3f}'.format(stats['seconds']),
+                        '{:.1%}'.format(stats['seconds'] / wall_seconds),
+                        _format_number(stats['bytes'] / MB, '{:.1f}'),
+                        _format_number(stats['mb_per_s'], '{:.1f}'),
+                        _format_number(stats['tokens_per_s'], '{:,.0f}')))
+
+    lines.append('wall time: {:.3f} s'.format(report['wall_seconds']))
+    if report['peak_rss_mb'] is not None:
+        lines.append('peak memory: {:.1f} MB'.format(report['peak_rss_mb']))
+    cache = report['cache']
+    if cache['hit_rate'] is not None:
+        lines.append('cache: {} hits, {} misses ({:.0%} hit rate)'.format(
+                        cache['hits'], cache['misses'], cache['hit_rate']))
+    return '\n'.join(lines)
+
+
+def _iter_stage(profiler, name, items, size, tokens):
+    # the stage is left before each item is handed on, so the caller's
+    # work on it is not counted in the stage
+    while True:
+        with profiler.stage(name) as run:
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            if size is not None:
+                run.bytes += size(item)
+            if tokens is not None:
+                run.tokens += tokens(item)
+        yield item
+
+
+def _format_number(value, fmt):
+    # blank for values that were not measured
+    if not value:
+        return ''
+    return fmt.format(value)
@@ -0,0 +1,293 @@
+import http.client
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sentence_generator import SentenceGenerator
+from top_k import TOP_K, TIE_BREAKS, top_k_items
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# global constants
+DEFAULT_HOST = '127.0.0.1'  # only local clients can connect
+DEFAULT_PORT = 8765         # port the server listens on by default
+
+
+class Corpus:
+    """ Word maps of a file kept in memory with everything queries need
+    precomputed: the word count, the sentence generator's successor table
+    and the top words of every (k, tie_break) asked for so far
+    """
+
+    def __init__(self, word_distribution, word_map):
+        """ Creates a corpus from word maps
+
+        Parameters
+        ----------
+        word_distribution: dictionary (string: int)
+            hashmap of each word and their frequency
+        word_map: dictionary (string: dict(string: int))
+            hashmap of next word frequencies for each word
+        """
+
+        self.word_distribution = word_distribution or {}
+        self.word_map = word_map or {}
+        self.word_count = sum(self.word_distribution.values())
+        self.generator = None
+        if self.word_distribution:
+            self.generator = SentenceGenerator(self.word_distribution,
+                                                self.word_map)
+        self._top_words = {}
+
+    def top_words(self, k=TOP_K, tie_break='last'):
+        """ Gets the most frequent words, computed once per k and tie_break
+
+        Parameters
+        ----------
+        k: int, default : TOP_K
+            number of words
+        tie_break: string, default : 'last'
+            which words win among equal frequencies, see top_k_items
+
+        Returns
+        -------
+        items: list of tuples (string, int)
+            words and their frequencies, most frequent first
+        """
+
+        key = (k, tie_break)
+        items = self._top_words.get(key)
+        if items is None:
+            items = top_k_items(self.word_distribution, k, tie_break)
+            self._top_words[key] = items
+        return items
+
+
+class QueryServer:
+    """ Localhost HTTP server answering queries against corpora held in
+    memory, so repeated queries skip reading and parsing the files
+
+    Every query is a GET request answered with JSON:
+    /corpora, /count?corpus=, /top?corpus=&k=&tie_break=,
+    /next?corpus=&word=&k=&tie_break= and
+    /sentence?corpus=&length=&sample=&seed=
+    """
+
+    def __init__(self, corpora, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """ Creates a server for the specified corpora and starts listening
+
+        Parameters
+        ----------
+        corpora: dictionary (string: tuple)
+            word distribution and word map of each corpus by name, as
+            returned by gen_maps_from_file
+        host: string, default : DEFAULT_HOST
+            address to listen on
+        port: int, default : DEFAULT_PORT
+            port to listen on, 0 picks a free port
+        """
+
+        self.corpora = {name: Corpus(*maps) for name, maps in corpora.items()}
+        self.httpd = ThreadingHTTPServer((host, port), _QueryHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.query_server = self
+
+    @property
+    def address(self):
+        """ Host and port the server listens on """
+        return self.httpd.server_address[:2]
+
+    def serve_forever(self):
+        """ Answers queries until shutdown is called
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def start(self):
+        """ Answers queries from a background thread
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        thread: threading.Thread
+            thread running the server
+        """
+
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        """ Stops answering queries
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        self.httpd.shutdown()
+
+    def answer(self, path, params):
+        """ Answers a query
+
+        Parameters
+        ----------
+        path: string
+            query name, such as '/count'
+        params: dictionary (string: string)
+            query parameters
+
+        Returns
+        -------
+        status: int
+            HTTP status code
+        response: dictionary
+            JSON response, with an 'error' message if the status is not 200
+        """
+
+        if path == '/corpora':
+            return 200, {'corpora': sorted(self.corpora)}
+
+        corpus = self.corpora.get(params.get('corpus'))
+        if corpus is None:
+            return 404, {'error': 'corpus is not loaded: ' +
+                                    str(params.get('corpus'))}
+
+        try:
+            k = int(params.get('k', TOP_K))
+            tie_break = params.get('tie_break', 'last')
+            if tie_break not in TIE_BREAKS:
+                raise ValueError('tie_break must be one of ' +
+                                    ', '.join(TIE_BREAKS))
+
+            if path == '/count':
+                return 200, {'count': corpus.word_count}
+
+            if path == '/top':
+                return 200, {'top': corpus.top_words(k, tie_break)}
+
+            if path == '/next':
+                word = params.get('word', '').lower()
+                next_words = corpus.word_map.get(word)
+                if not next_words:
+                    return 404, {'error': word + ' does not exist in the ' +
+                                            'corpus: ' + params['corpus']}
+                return 200, {'next': top_k_items(next_words, k, tie_break)}
+
+            if path == '/sentence':
+                if corpus.generator is None:
+                    return 404, {'error': 'cannot generate sentence from ' +
+                                            'empty corpus'}
+                length = int(params.get('length', 10))
+                sample = params.get('sample', '0') not in ('', '0', 'false')
+                seed = params.get('seed')
+                rng = random.Random(int(seed)) if seed is not None else None
+                return 200, {'sentence': corpus.generator.generate(length,
+                                                            sample, rng)}
+        except ValueError as err:
+            return 400, {'error': str(err)}
+
+        return 404, {'error': 'unknown query: ' + path}
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    # keep connections open and send small responses without delay
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        status, response = self.server.query_server.answer(
+                                    url.path, dict(parse_qsl(url.query)))
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # queries are too frequent to log
+        pass
+
+
+class QueryClient:
+    """ Client for a QueryServer that keeps its connection open between
+    queries
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """ Creates a client for the server at host and port
+
+        Parameters
+        ----------
+        host: string, default : DEFAULT_HOST
+            address of the server
+        port: int, default : DEFAULT_PORT
+            port of the server
+        """
+
+        self.connection = http.client.HTTPConnection(host, port)
+
+    def query(self, path, **params):
+        """ Sends a query to the server
+
+        Parameters
+        ----------
+        path: string
+            query name, such as '/count'
+        **params: dictionary
+            query parameters, None values are left out
+
+        Returns
+        -------
+        response: dictionary
+            JSON response of the server
+
+        Raises
+        ------
+        LookupError
+            if the server answers with an error
+        """
+
+        params = {name: value for name, value in params.items()
+                    if value is not None}
+        if params:
+            path += '?' + urlencode(params)
+        self.connection.request('GET', path)
+        response = self.connection.getresponse()
+        result = json.loads(response.read())
+        if response.status != 200:
+            raise LookupError(result.get('error', 'query failed'))
+        return result
+
+    def close(self):
+        """ Closes the connection
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        self.connection.close()
@@ -0,0 +1,181 @@
+import re
+
+
+class Replacer:
+    """ Replaces many words in one pass over a text
+
+    All words to replace are compiled into a single regular expression,
+    shaped like a trie of the words so each position of the text is only
+    compared against words sharing its first characters, and a longer word
+    wins over a word it starts with. With whole_word set a word only
+    matches where it is not part of a longer word, so replacing 'the'
+    leaves 'other' alone. The number of replacements made for each word is
+    kept in hits.
+    """
+
+    def __init__(self, replacements, whole_word=False):
+        """ Creates a replacer for the specified words
+
+        Parameters
+        ----------
+        replacements: dictionary (string: string)
+            new word for each word to replace, words must not be empty
+        whole_word: bool, default : False
+            only replace words that are not part of a longer word
+        """
+
+        if not replacements or '' in replacements:
+            raise ValueError('words to replace must not be empty')
+
+        self.replacements = dict(replacements)
+        self.whole_word = whole_word
+        self.hits = dict.fromkeys(self.replacements, 0)
+
+        pattern = trie_pattern(self.replacements)
+        if whole_word:
+            pattern = r'(?<!\w)' + pattern + r'(?!\w)'
+        self.pattern = re.compile(pattern)
+        self.max_length = max(map(len, self.replacements))
+
+    def replace(self, text):
+        """ Replaces all words in a text
+
+        Parameters
+        ----------
+        text: string
+            string to modify
+
+        Returns
+        -------
+        replaced_text: string
+            text with all words replaced
+        """
+
+        return self.pattern.sub(self._replacement, text)
+
+    def replace_chunks(self, chunks):
+        """ Replaces all words in consecutive chunks of a text, including
+        words that are split across chunk boundaries
+
+        Parameters
+        ----------
+        chunks: iterable of strings
+            consecutive pieces of a text
+
+        Returns
+        -------
+        replaced_chunks: generator of strings
+            pieces of the text with all words replaced, joined they equal
+            replace applied to the whole text
+        """
+
+        context = ''  # character before carry, for whole word matching
+        carry = ''    # text that could still be the start of a match
+        for chunk in chunks:
+            text = context + carry + chunk
+
+            # a match starting before the last max_length characters is
+            # complete, and so is the character after it
+            replaced, end = self._replace_from(text, len(context), 
+                                                len(text) - self.max_length)
+            yield replaced
+
+            context = text[end - 1:end] if end else ''
+            carry = text[end:]
+
+        # the held back text ends the text
+        yield self._replace_from(context + carry, len(context))[0]
+
+    def _replace_from(self, text, start, stop=None):
+        # replaces matches in text that start at or after start and before
+        # stop, text before start is only context for whole word matching;
+        # returns the replaced text and where it ends
+        pieces = []
+        position = start
+        for match in self.pattern.finditer(text, start):
+            if stop is not None and match.start() >= stop:
+                break
+            pieces.append(text[position:match.start()])
+            pieces.append(self._replacement(match))
+            position = match.end()
+
+        end = len(text) if stop is None else max(position, stop)
+        pieces.append(text[position:end])
+        return ''.join(pieces), end
+
+    def _replacement(self, match):
+        # new word for a match, counting the hit
+        word = match.group()
+        self.hits[word] += 1
+        return self.replacements[word]
+
+
+def trie_pattern(words):
+    """ Builds a regular expression matching any of the words, with common
+    prefixes factored out. Where words start with one another the longer
+    word is tried first
+
+    Parameters
+    ----------
+    words: iterable of strings
+        non-empty words to match literally
+
+    Returns
+    -------
+    pattern: string
+        regular expression for the words
+    """
+
+    # nested dictionaries of characters, '' marks the end of a word
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    return '(?:' + _node_pattern(trie) + ')'
+
+
+def _node_pattern(node):
+    # pattern for the rest of the words below a trie node, greedy optional
+    # groups make longer words win
+    branches = [re.escape(char) + _node_pattern(child)
+                for char, child in node.items() if char]
+    if not branches:
+        return ''
+
+    pattern = branches[0] if len(branches) == 1 else \
+        '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        pattern = '(?:' + pattern + ')?'
+    return pattern
+
+
+def read_replacements(filename):
+    """ Reads words to replace from a mapping file with one word per line,
+    followed by a tab and the new word
+
+    Parameters
+    ----------
+    filename: string
+        path to mapping file
+
+    Returns
+    -------
+    replacements: dictionary (string: string)
+        new word for each word to replace
+    """
+
+    replacements = {}
+    with open(filename, 'r') as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            if '\t' not in line:
+                raise ValueError('line {} of {} has no tab between the words'
+                                    .format(number, filename))
+            word, new_word = line.split('\t', 1)
+            replacements[word] = new_word
+    return replacements
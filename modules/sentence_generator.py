@@ -0,0 +1,183 @@
+import random
+from operator import itemgetter
+
+
+class SentenceGenerator:
+    """ Generates sentences from word maps by following next words
+
+    The most frequent next word of every word is found once when the
+    generator is created, so each generated word is a dictionary lookup.
+    In sampling mode next words are drawn at random, weighted by how often
+    they follow the current word, using alias tables (Vose's method) that
+    are built the first time a word is visited and give O(1) draws.
+    Generation stops early at a word that is never followed by another.
+    """
+
+    def __init__(self, word_distribution, word_map, seed=None):
+        """ Creates a generator for the specified word maps
+
+        Parameters
+        ----------
+        word_distribution: dictionary (string: int)
+            hashmap of each word and their frequency
+        word_map: dictionary (string: dict(string: int))
+            hashmap of next word frequencies for each word
+        seed: int, default : None
+            seed for the random draws of sampling mode
+        """
+
+        self.word_distribution = word_distribution
+        self.word_map = word_map
+        self.random = random.Random(seed)
+
+        # most frequent word and most frequent next word of each word, ties
+        # go to the word added last like the stable sorts used before
+        self.first_word = _most_frequent(word_distribution)
+        self.next_word = {word: _most_frequent(next_words)
+                            for word, next_words in word_map.items()}
+
+        # alias tables for sampling, built on first use
+        self._first_table = None
+        self._next_tables = {}
+
+    def generate(self, sentence_length=10, sample=False, rng=None):
+        """ Generates a sentence
+
+        Parameters
+        ----------
+        sentence_length: int, default : 10
+            maximum number of words in the sentence
+        sample: bool, default : False
+            draw words at random weighted by frequency instead of always
+            taking the most frequent one
+        rng: random.Random, default : None
+            source of random numbers for sampling, the generator's own if
+            None
+
+        Returns
+        -------
+        sentence: string
+            generated words separated by spaces and ending with a period
+        """
+
+        if sentence_length < 1:
+            return '.'
+        if rng is None:
+            rng = self.random
+
+        if sample:
+            if self._first_table is None:
+                self._first_table = build_alias_table(self.word_distribution)
+            word = draw(self._first_table, rng)
+        else:
+            word = self.first_word
+
+        words = [word]
+        while len(words) < sentence_length:
+            if sample:
+                word = self._sample_next(word, rng)
+            else:
+                word = self.next_word.get(word)
+
+            # stop at a word that nothing ever follows
+            if word is None:
+                break
+            words.append(word)
+
+        return ' '.join(words) + '.'
+
+    def _sample_next(self, word, rng):
+        """ Draws a next word for word, building its alias table if needed
+
+        Parameters
+        ----------
+        word: string
+            current word
+        rng: random.Random
+            source of random numbers
+
+        Returns
+        -------
+        next_word: string
+            randomly drawn next word, None if word has no next words
+        """
+
+        table = self._next_tables.get(word)
+        if table is None:
+            next_words = self.word_map.get(word)
+            if not next_words:
+                return None
+            table = build_alias_table(next_words)
+            self._next_tables[word] = table
+
+        return draw(table, rng)
+
+
+def build_alias_table(frequencies):
+    """ Builds an alias table for drawing words in proportion to their
+    frequencies in constant time
+
+    Parameters
+    ----------
+    frequencies: dictionary (string: int)
+        weight of each word, all positive
+
+    Returns
+    -------
+    table: tuple (list of strings, list of floats, list of ints)
+        words, the probability of keeping each slot's own word, and the
+        slot whose word is taken otherwise
+    """
+
+    words = list(frequencies)
+    count = len(words)
+    total = sum(frequencies.values())
+
+    # scale weights so the average slot holds exactly 1
+    scaled = [value * count / total for value in frequencies.values()]
+    keep = [1.0] * count
+    alias = list(range(count))
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+
+    # pair each under-full slot with an over-full one that tops it up
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        keep[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        if scaled[more] < 1.0:
+            small.append(more)
+        else:
+            large.append(more)
+
+    return words, keep, alias
+
+
+def draw(table, rng):
+    """ Draws a word from an alias table
+
+    Parameters
+    ----------
+    table: tuple
+        alias table from build_alias_table
+    rng: random.Random
+        source of random numbers
+
+    Returns
+    -------
+    word: string
+        drawn word
+    """
+
+    words, keep, alias = table
+    slot = rng.randrange(len(words))
+    if rng.random() < keep[slot]:
+        return words[slot]
+    return words[alias[slot]]
+
+
+def _most_frequent(frequencies):
+    # scanning in reverse makes max return the last added of equal counts
+    return max(reversed(list(frequencies.items())), key=itemgetter(1))[0]
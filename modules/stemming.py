@@ -0,0 +1,107 @@
+from functools import lru_cache
+
+# global constants
+STEM_CACHE_SIZE = 1 << 16   # distinct words remembered by a CachedStemmer
+
+
+class CachedStemmer:
+    """ Porter stemmer that remembers the stem of recently seen words
+
+    Natural text repeats a small vocabulary heavily, so most words are
+    stemmed once and then found in a bounded least recently used cache.
+    One stemmer is meant to be shared by every caller so they all benefit
+    from the same cache.
+    """
+
+    def __init__(self, max_size=STEM_CACHE_SIZE):
+        """ Creates a stemmer with an empty cache
+
+        Parameters
+        ----------
+        max_size: int, default : STEM_CACHE_SIZE
+            number of distinct words to remember, None for no limit
+        """
+
+        self.max_size = max_size
+        self.stemmer = None
+        self._stem = lru_cache(maxsize=max_size)(self._stem_word)
+
+    def stem(self, word):
+        """ Gets the stem of a word
+
+        Parameters
+        ----------
+        word: string
+            word to stem
+
+        Returns
+        -------
+        stem: string
+            stemmed word
+        """
+
+        return self._stem(word)
+
+    def stem_all(self, words):
+        """ Gets the stem of every word in a list
+
+        Parameters
+        ----------
+        words: list of strings
+            words to stem
+
+        Returns
+        -------
+        stems: list of strings
+            stemmed words in the same order
+        """
+
+        return list(map(self._stem, words))
+
+    @property
+    def hits(self):
+        """ Number of words found in the cache """
+        return self._stem.cache_info().hits
+
+    @property
+    def misses(self):
+        """ Number of words that had to be stemmed """
+        return self._stem.cache_info().misses
+
+    def hit_rate(self):
+        """ Gets the share of words found in the cache
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        rate: float
+            hits divided by all lookups, 0.0 before any lookup
+        """
+
+        info = self._stem.cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """ Empties the cache and resets the statistics
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+
+        self._stem.cache_clear()
+
+    def _stem_word(self, word):
+        # NLTK is slow to import, so the stemmer is created on first use
+        if self.stemmer is None:
+            from nltk.stem import PorterStemmer
+            self.stemmer = PorterStemmer()
+        return self.stemmer.stem(word)
@@ -0,0 +1,137 @@
+import string
+import tokenizer
+from functools import lru_cache
+
+# global constants
+DEFAULT_LANGUAGES = ('english',)  # NLTK stopword lists used by default
+EDGE_PUNCTUATION = string.punctuation  # stripped from words before lookup
+
+
+class StopwordFilter:
+    """ Removes stopwords from text, text chunks or token streams
+
+    The stopword set is loaded once and kept as a frozenset, and words are
+    compared after lowercasing and stripping punctuation from their ends, so
+    'The' and 'the,' both match 'the'. Text is filtered in one linear pass
+    that keeps the whitespace around the remaining words.
+    """
+
+    def __init__(self, stop_words=None, languages=DEFAULT_LANGUAGES):
+        """ Creates a filter for the specified stopwords
+
+        Parameters
+        ----------
+        stop_words: iterable of strings, default : None
+            custom stopwords, the NLTK lists of languages are used if None
+        languages: tuple of strings, default : DEFAULT_LANGUAGES
+            NLTK stopword lists to combine when stop_words is None
+        """
+
+        if stop_words is None:
+            self.stop_words = load_stopwords(tuple(languages))
+        else:
+            self.stop_words = frozenset(word.lower() for word in stop_words)
+
+    def is_stopword(self, word):
+        """ Checks whether a word is a stopword
+
+        Parameters
+        ----------
+        word: string
+            word as it appears in the text
+
+        Returns
+        -------
+        stopword: bool
+            True if the word is a stopword
+        """
+
+        return word.strip(EDGE_PUNCTUATION).lower() in self.stop_words
+
+    def keeps(self, word):
+        """ Checks whether a word is kept by the filter
+
+        Parameters
+        ----------
+        word: string
+            word as it appears in the text
+
+        Returns
+        -------
+        kept: bool
+            True if the word is not a stopword
+        """
+
+        return word.strip(EDGE_PUNCTUATION).lower() not in self.stop_words
+
+    def filter_text(self, text):
+        """ Removes stopwords from text, keeping the layout of the rest
+
+        Parameters
+        ----------
+        text: string
+            string to remove stopwords from
+
+        Returns
+        -------
+        filtered_text: string
+            text with all stopwords removed
+        """
+
+        separators, words = tokenizer.split_words(text)
+        keep = list(map(self.keeps, words))
+        return tokenizer.join_words(separators, words, keep)
+
+    def filter_chunks(self, chunks):
+        """ Removes stopwords from consecutive chunks of a text
+
+        Parameters
+        ----------
+        chunks: iterable of strings
+            consecutive pieces of a text
+
+        Returns
+        -------
+        filtered_chunks: generator of strings
+            pieces of the text with all stopwords removed, joined they equal
+            filter_text applied to the whole text
+        """
+
+        return tokenizer.iter_filtered_chunks(chunks, self.keeps)
+
+    def filter_tokens(self, tokens):
+        """ Removes stopwords from a stream of tokens
+
+        Parameters
+        ----------
+        tokens: iterable of strings
+            words, such as the output of tokenizer.tokenize
+
+        Returns
+        -------
+        kept_tokens: generator of strings
+            tokens that are not stopwords, in order
+        """
+
+        return filter(self.keeps, tokens)
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(languages=DEFAULT_LANGUAGES):
+    """ Loads and combines NLTK stopword lists, once per set of languages
+
+    Parameters
+    ----------
+    languages: tuple of strings, default : DEFAULT_LANGUAGES
+        names of the NLTK stopword lists
+
+    Returns
+    -------
+    stop_words: frozenset of strings
+        lowercased stopwords of all languages
+    """
+
+    from nltk.corpus import stopwords
+
+    return frozenset(word.lower() for language in languages
+                        for word in stopwords.words(language))
@@ -0,0 +1,66 @@
+import json
+import text_utilities
+import tokenizer
+from approximate import ApproximateCounts, HeavyHitters
+from top_k import top_k_items
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_heavy_hitters():
+    """
+    Unit test function for HeavyHitters
+    """
+
+    summary = HeavyHitters(2)
+    summary.update({'a': 5, 'b': 1, 'c': 2})
+    summary.update({'b': 1, 'a': 1, 'd': 1})
+
+    # the third largest count is taken from all counts each time there are
+    # more than two items
+    assert summary.counts == {'a': 4}
+    assert summary.decrement == 2
+    assert summary.total == 11
+
+
+def test_approximate_counts(tmp_path):
+    """
+    Unit test function for ApproximateCounts and the approximate functions
+    """
+
+    text = text_utilities.read_file('EpIV.txt')
+    word_distribution, word_map = text_utilities.gen_word_maps(text)
+    tokens = tokenizer.tokenize(text)
+
+    # far fewer counters than words, estimates stay within their bounds
+    counts = ApproximateCounts.from_token_chunks([tokens[:5000],
+                                                    tokens[5000:]], 200000)
+    bounds = counts.error_bounds()['words']
+    assert counts.total == 13391
+    assert len(counts.words.counts) < len(word_distribution)
+    estimates = counts.word_estimates(list(word_distribution))
+    assert all(estimates[word] >= count for word, count in
+                word_distribution.items())
+    kept = bounds['min_kept_count']
+    assert all(word in counts.words.counts for word, count in
+                word_distribution.items() if count >= kept)
+    assert top_k_items(counts.word_distribution, 10) == \
+        top_k_items(word_distribution, 10)
+    assert top_k_items(counts.word_map['luke'], 4) == \
+        top_k_items(word_map['luke'], 4)
+
+    # next words only come from pairs the summary holds, so none of them is
+    # a word that never follows
+    for word in ['luke', 'the', 'you']:
+        assert set(counts.word_map[word]) <= set(word_map[word])
+
+    # the chart and next word functions take a memory budget
+    stats = text_utilities.get_word_estimates(test_file, ['Hello'], 100000)
+    assert stats['word_count'] == 23 and stats['estimates'] == {'hello': 6}
+    outfile = str(tmp_path / 'next.json')
+    text_utilities.show_next_word_distribution(test_file, 'my',
+                                                outfile=outfile, memory=100000)
+    with open(outfile) as f:
+        assert json.load(f)['bars'] == [['ethan', 1], ['name', 4]]
@@ -0,0 +1,113 @@
+import async_ingest
+import asyncio
+import parallel
+import pytest
+import threading
+import pipeline
+import text_utilities
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_gen_maps_from_files(tmp_path):
+    """
+    Unit test function for gen_maps_from_files and count_files_words
+    """
+
+    # files of a corpus, one of them unreadable
+    text = text_utilities.read_file('EpIV.txt')
+    for index in range(6):
+        (tmp_path / 'f{}.txt'.format(index)).write_text(
+                                    text[index * 9000:(index + 1) * 9000])
+    (tmp_path / 'bad.txt').write_bytes(b'bad \xff bytes')
+    filenames = parallel.find_corpus_files(str(tmp_path))
+
+    # reads overlap and chunks interleave, the maps are the same as when the
+    # files are counted one after another
+    maps, errors = async_ingest.gen_maps_from_files(filenames, 3, 2, 100,
+                                                    'utf-8')
+    expected = parallel.gen_maps_from_corpus(str(tmp_path), 1)
+    assert maps == expected
+    assert list(maps[0]) == list(expected[0])
+    assert [filename for filename, _ in errors] == [str(tmp_path / 'bad.txt')]
+
+    word_count, errors = async_ingest.count_files_words(filenames, 2,
+                                                        encoding='utf-8')
+    assert word_count == sum(expected[0].values())
+
+    # a word much longer than a chunk is read whole
+    (tmp_path / 'long.txt').write_text('my ' + 'name' * 1000 + ' is')
+    maps, errors = async_ingest.gen_maps_from_files(
+                                    [str(tmp_path / 'long.txt')], 2, 2, 10)
+    assert maps[0] == {'my': 1, 'name' * 1000: 1, 'is': 1}
+
+
+def test_read_ahead(tmp_path, monkeypatch):
+    """
+    Unit test function for the files read ahead by gen_maps_from_files
+    """
+
+    filenames = []
+    for index in range(6):
+        filenames.append(str(tmp_path / 'f{}.txt'.format(index)))
+        with open(filenames[-1], 'w') as f:
+            f.write('file number {}'.format(index))
+
+    # while the first file is read, later files only start while fewer than
+    # max_reads files wait to be merged
+    read_file = async_ingest._read_file
+    started = []
+    started_during_first = []
+
+    async def slow_read_file(index, *args):
+        started.append(index)
+        if index == 0:
+            await asyncio.sleep(0.1)
+            started_during_first.extend(started)
+        await read_file(index, *args)
+
+    monkeypatch.setattr(async_ingest, '_read_file', slow_read_file)
+    maps, errors = async_ingest.gen_maps_from_files(filenames, 2)
+    assert started_during_first == [0, 1]
+    assert maps[0]['number'] == 6 and sorted(started) == list(range(6))
+
+    # a reader failing with an unexpected error stops counting with that 
+    # error instead of waiting for the file forever
+    async def failed_read_file(index, *args):
+        raise MemoryError('failed')
+
+    monkeypatch.setattr(async_ingest, '_read_file', failed_read_file)
+    raised = []
+
+    def count():
+        with pytest.raises(MemoryError):
+            async_ingest.gen_maps_from_files(filenames, 2)
+        raised.append(True)
+
+    thread = threading.Thread(target=count, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert raised
+
+
+def test_transform_files(tmp_path):
+    """
+    Unit test function for transform_files and corpus_outfiles
+    """
+
+    (tmp_path / 'in' / 'sub').mkdir(parents=True)
+    (tmp_path / 'in' / 'a.txt').write_text('Hello my name is Ethan.')
+    (tmp_path / 'in' / 'sub' / 'b.txt').write_text('running runs')
+
+    # outputs keep their path relative to the corpus directory
+    filenames = parallel.find_corpus_files(str(tmp_path / 'in'))
+    pairs = async_ingest.corpus_outfiles(filenames, str(tmp_path / 'in'),
+                                            str(tmp_path / 'out'))
+    stem_pipeline = pipeline.Pipeline(
+                                pipeline.stem_stage(text_utilities.STEMMER))
+    assert async_ingest.transform_files(pairs, stem_pipeline, 2, 1) == (2, [])
+    assert (tmp_path / 'out' / 'sub' / 'b.txt').read_text() == 'run run'
+    assert (tmp_path / 'out' / 'a.txt').read_text() == \
+        text_utilities.stem_words('Hello my name is Ethan.')
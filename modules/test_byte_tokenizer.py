@@ -0,0 +1,54 @@
+import byte_tokenizer
+import tokenizer
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_count_words(tmp_path):
+    """
+    Unit test function for count_words
+    """
+
+    text = 'Héllo, wörld -- it\'s　a "test"  ... end.\n x'
+    path = tmp_path / 'unicode.txt'
+    path.write_text(text * 50, encoding='utf-8')
+    expected = len(tokenizer.tokenize(text * 50))
+
+    # tiny blocks cut the text everywhere, without splitting characters
+    for block_size in [1, 2, 3, 7, 1024]:
+        assert byte_tokenizer.count_words(str(path),
+                                            block_size=block_size) == expected
+
+
+def test_count_words_files():
+    """
+    Unit test function for count_words on the test files
+    """
+
+    for filename in [test_file, 'EpIV.txt']:
+        with open(filename, 'r', encoding='utf-8') as f:
+            expected = len(tokenizer.tokenize(f.read()))
+        assert byte_tokenizer.count_words(filename) == expected
+
+
+def test_iter_token_chunks(tmp_path):
+    """
+    Unit test function for iter_token_chunks and DecodedWords
+    """
+
+    text = 'ÉCOLE école, Σ\x1cB "a"b.\nLast'
+    path = tmp_path / 'unicode.txt'
+    path.write_text(text, encoding='utf-8')
+    words = byte_tokenizer.DecodedWords()
+
+    # tokens split across blocks are joined again
+    for block_size in [1, 4, 1024]:
+        tokens = [words[token] for token_chunk in
+                    byte_tokenizer.iter_token_chunks(str(path), block_size)
+                    for token in token_chunk]
+        assert tokens == tokenizer.tokenize(text)
+
+    # each distinct raw token is decoded once
+    assert len(words) == 6
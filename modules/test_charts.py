@@ -0,0 +1,48 @@
+import charts
+import json
+import text_utilities
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_write_chart_data(tmp_path):
+    """
+    Unit test function for write_chart_data
+    """
+
+    chart = charts.Chart(['b', 'a'], [1, 2], 'Words', 'Frequency', 'Title')
+    charts.write_chart_data(chart, str(tmp_path / 'chart.json'))
+    charts.write_chart_data(chart, str(tmp_path / 'chart.csv'))
+
+    with open(tmp_path / 'chart.json') as f:
+        assert json.load(f)['bars'] == [['b', 1], ['a', 2]]
+    with open(tmp_path / 'chart.csv') as f:
+        assert f.read().split() == ['Words,Frequency', 'b,1', 'a,2']
+
+
+def test_render_charts(tmp_path):
+    """
+    Unit test function for ChartRenderer and render_charts
+    """
+
+    # one figure is reused for every chart a renderer saves
+    renderer = charts.ChartRenderer()
+    text_utilities.show_word_frequencies(test_file, outfile=str(
+                            tmp_path / 'words.png'), renderer=renderer)
+    figure = renderer.figure
+    text_utilities.show_next_word_distribution(test_file, 'my', outfile=str(
+                            tmp_path / 'next.svg'), renderer=renderer)
+    assert renderer.figure is figure
+    assert (tmp_path / 'words.png').read_bytes()[:4] == b'\x89PNG'
+    assert b'<svg' in (tmp_path / 'next.svg').read_bytes()
+
+    # charts are saved in worker processes, failures are returned
+    chart = charts.Chart(['a'], [1], 'Words', 'Frequency', 'Title')
+    errors = charts.render_charts([(chart, str(tmp_path / 'a.png')),
+                                    (chart, str(tmp_path / 'b.csv')),
+                                    (chart, str(tmp_path / 'x' / 'c.png'))],
+                                    workers=2)
+    assert (tmp_path / 'a.png').exists() and (tmp_path / 'b.csv').exists()
+    assert list(errors) == [str(tmp_path / 'x' / 'c.png')]
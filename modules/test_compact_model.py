@@ -0,0 +1,104 @@
+import compact_model
+import text_utilities
+import tokenizer
+from compact_model import CompactWordModel
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_from_token_chunks(monkeypatch):
+    """
+    Unit test function for CompactWordModel.from_token_chunks
+    """
+
+    # count the test file into a compact model in small chunks
+    chunks = text_utilities.read_file_chunks(test_file, 5)
+    model = CompactWordModel.from_token_chunks(
+                                        tokenizer.iter_token_chunks(chunks))
+
+    # converting back must give the same maps as the dictionary path
+    assert model.to_maps() == text_utilities.gen_maps_from_file(test_file)
+
+    # next words are kept in the order of the dictionary path, also when
+    # the counts of the chunks are merged on the way
+    monkeypatch.setattr(compact_model, 'MERGE_THRESHOLD', 100)
+    word_distribution, word_map = text_utilities.gen_maps_from_file(
+                                                                'EpIV.txt')
+    chunks = text_utilities.read_file_chunks('EpIV.txt', 1000)
+    model = CompactWordModel.from_token_chunks(
+                                        tokenizer.iter_token_chunks(chunks))
+    assert list(model.word_distribution.items()) == \
+        list(word_distribution.items())
+    assert [(word, list(next_words.items())) for word, next_words in
+            model.word_map.items()] == \
+        [(word, list(next_words.items())) for word, next_words in
+            word_map.items()]
+
+
+def test_dictionary_views():
+    """
+    Unit test function for the word_distribution and word_map views
+    """
+
+    # build the model from existing maps
+    word_distribution, word_map = text_utilities.gen_word_maps(
+                                    'Hello my name is my name is Patrick.')
+    model = CompactWordModel.from_maps(word_distribution, word_map)
+
+    # views behave like the dictionaries they were built from
+    assert model.word_distribution['my'] == 2
+    assert dict(model.word_distribution) == word_distribution
+    assert model.word_map['name'] == {'is': 2}
+    assert list(model.word_map) == list(word_map)
+    assert 'patrick' not in model.word_map
+    assert 'patrick' in model.word_distribution
+    assert 'ethan' not in model.word_distribution
+
+    # items and values are read from the arrays, in the order of the keys
+    views = [model.word_distribution, model.word_map]
+    for view, maps in zip(views, [word_distribution, word_map]):
+        assert list(view.items()) == [(key, view[key]) for key in view]
+        assert list(view.values()) == [view[key] for key in view]
+        assert dict(view.items()) == maps
+    assert ('my', 2) in model.word_distribution.items()
+    assert len(model.word_map.values()) == len(word_map)
+
+    # next words keep the order of the maps, not the order of their IDs
+    model = CompactWordModel.from_maps(*text_utilities.gen_word_maps(
+                                                            'y x z x y'))
+    assert list(model.word_map['x']) == ['z', 'y']
+
+
+def test_vocabulary_find():
+    """
+    Unit test function for Vocabulary.find
+    """
+
+    # look up words, including ones with non ascii characters
+    model = CompactWordModel.from_maps({'zoo': 1, 'café': 2, 'a': 1}, {})
+    assert model.words.find('café') == 1
+    assert model.words.find('a') == 2
+    assert model.words.find('cafe') == -1
+    assert list(model.words) == ['zoo', 'café', 'a']
+
+
+def test_save_load(tmp_path):
+    """
+    Unit test function for CompactWordModel.save and load
+    """
+
+    # saved maps load back memory-mapped with the same counts
+    maps = text_utilities.gen_maps_from_file('EpIV.txt')
+    text_utilities.save_word_maps(maps, str(tmp_path / 'maps.bin'))
+    word_distribution, word_map = text_utilities.load_word_maps(
+                                        str(tmp_path / 'maps.bin'))
+    model = word_distribution.model
+    assert model.to_maps() == maps
+    assert word_map['luke'] == maps[1]['luke']
+    assert not model.word_counts.flags.writeable
+
+    # the file can also be read into memory
+    model = CompactWordModel.load(str(tmp_path / 'maps.bin'), False)
+    assert model.to_maps() == maps
@@ -0,0 +1,70 @@
+import async_ingest
+import text_utilities
+import tokenizer
+from file_reader import FileReader
+from incremental import IncrementalMaps
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_mmap_backend(tmp_path):
+    """
+    Unit test function for gen_maps_from_file with the mmap backend
+    """
+
+    # undecodable bytes are replaced the same way by both backends
+    bad_file = tmp_path / 'bad.txt'
+    bad_file.write_bytes(b'Caf\xc3\xa9 caf\xff caf\xc3\xa9. CAF\xc3\x89!')
+
+    for filename in [test_file, 'EpIV.txt', str(bad_file)]:
+        text_maps = text_utilities.gen_maps_from_file(filename, 
+                        reader=FileReader('text', 'utf-8', 'replace'))
+        mmap_maps = text_utilities.gen_maps_from_file(filename, 
+                        reader=FileReader('mmap', 'utf-8', 'replace'))
+
+        # same counts, with words inserted in the same order for tie breaks
+        assert mmap_maps == text_maps
+        assert list(mmap_maps[0]) == list(text_maps[0])
+
+
+def test_long_words(tmp_path, monkeypatch):
+    """
+    Unit test function for words longer than tokenizer.MAX_WORD_LENGTH read
+    by every backend
+    """
+
+    # a word longer than the limit and than a chunk or block, with non
+    # ascii characters and punctuation in it
+    monkeypatch.setattr(tokenizer, 'MAX_WORD_LENGTH', 50)
+    infile = str(tmp_path / 'long.txt')
+    word = ''.join('Ä.bc' if index % 7 else 'dé' for index in range(60))
+    with open(infile, 'w', encoding='utf-8') as f:
+        f.write('my ' + word + ' is ' + word[:101] + '\n' + word)
+
+    # the word is split at the same places wherever the chunks end
+    expected = text_utilities.gen_maps_from_file(infile, 
+                    reader=FileReader('text', 'utf-8', chunk_size=10000))
+    assert max(len(word) for word in expected[0]) == 50
+    for reader in [FileReader('text', 'utf-8', chunk_size=7), 
+                    FileReader('mmap', 'utf-8', block_size=13)]:
+        maps = text_utilities.gen_maps_from_file(infile, reader=reader)
+        assert maps == expected
+        assert list(maps[0]) == list(expected[0])
+    maps, errors = async_ingest.gen_maps_from_files([infile], 1, 1, 11, 
+                                                    'utf-8')
+    assert maps == expected
+
+    # appended pieces of the word are counted the same way
+    with open(infile, encoding='utf-8') as f:
+        text = f.read()
+    open(infile, 'w').close()
+    maps = IncrementalMaps(infile, 'utf-8')
+    monkeypatch.setattr('incremental.READ_SIZE', 9)
+    for start in range(0, len(text), 40):
+        with open(infile, 'a', encoding='utf-8') as f:
+            f.write(text[start:start + 40])
+        maps.update()
+        assert maps.maps == text_utilities.gen_maps_from_file(infile)
+    assert maps.maps == expected
@@ -0,0 +1,107 @@
+import text_utilities
+import threading
+import time
+from incremental import IncrementalMaps
+from map_cache import MapCache
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_update(tmp_path):
+    """
+    Unit test function for IncrementalMaps.update
+    """
+
+    with open(test_file, 'rb') as f:
+        text = f.read()
+    path = tmp_path / 'growing.txt'
+    path.write_bytes(b'')
+    maps = IncrementalMaps(str(path))
+
+    # append in pieces that split words, the maps always match a full read
+    for start in range(0, len(text), 5):
+        with open(path, 'ab') as f:
+            f.write(text[start:start + 5])
+        assert maps.update() == len(text[start:start + 5])
+        assert maps.maps == text_utilities.gen_maps_from_file(str(path))
+    assert maps.update() == 0
+
+    # a rewritten file is read again from the start
+    path.write_text('one two three four five six seven eight nine ten ' * 9)
+    maps.update()
+    assert maps.maps == text_utilities.gen_maps_from_file(str(path))
+
+
+def test_follow_file(tmp_path, monkeypatch):
+    """
+    Unit test function for follow_file
+    """
+
+    path = tmp_path / 'growing.txt'
+    path.write_text('hello my name')
+    cache = MapCache(str(tmp_path / 'cache'))
+    stores = []
+    store = cache.store
+    monkeypatch.setattr(cache, 'store', lambda key, maps: 
+                        stores.append(maps.size) or store(key, maps))
+    counts = []
+    stop = threading.Event()
+
+    def callback(maps):
+        counts.append(text_utilities.get_word_count(str(path), maps=maps))
+        if len(counts) == 2:
+            stop.set()
+
+    thread = threading.Thread(target=text_utilities.follow_file, 
+                                args=(str(path), callback, 0.01, cache), 
+                                kwargs={'stop': stop})
+    thread.start()
+
+    # wait for the first update, failing instead of hanging if the 
+    # follower stopped
+    deadline = time.monotonic() + 10
+    while not counts and thread.is_alive() and time.monotonic() < deadline:
+        stop.wait(0.01)
+    assert counts, 'follow_file gave no first update'
+    with open(path, 'a') as f:
+        f.write(' is Ethan')
+    thread.join(10)
+    assert not thread.is_alive()
+
+    assert counts == [3, 5]
+
+    # the maps are stored once up to date and again when following ends, 
+    # not after every update in between
+    assert stores == [13, 22]
+    maps = cache.load(cache.path_key(str(path), 'appendable'))
+    assert maps.maps == text_utilities.gen_maps_from_file(str(path))
+
+
+def test_update_maps_from_file(tmp_path, monkeypatch):
+    """
+    Unit test function for update_maps_from_file
+    """
+
+    for name, text in [('a', 'alpha beta gamma'), ('b', 'x y')]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'data.txt').write_text(text)
+    cache = MapCache(str(tmp_path / 'cache'))
+
+    # cached maps read the same file when updated from another directory
+    monkeypatch.chdir(tmp_path / 'a')
+    expected = text_utilities.update_maps_from_file('data.txt', cache)
+    monkeypatch.chdir(tmp_path / 'b')
+    with open(tmp_path / 'a' / 'data.txt', 'a') as f:
+        f.write(' delta')
+    word_distribution, word_map = text_utilities.update_maps_from_file(
+                                                    '../a/data.txt', cache)
+    assert word_distribution == dict(expected[0], delta=1)
+    assert word_map['gamma'] == {'delta': 1}
+
+    # changing the maps returned leaves the cached maps as they are
+    word_distribution['alpha'] = 9
+    word_map['alpha']['beta'] = 9
+    assert text_utilities.update_maps_from_file('../a/data.txt', cache) == \
+        text_utilities.gen_maps_from_file('../a/data.txt')
@@ -0,0 +1,83 @@
+import os
+import text_utilities
+from map_cache import MapCache
+
+
+def test_cached_maps(tmp_path):
+    """
+    Unit test function for gen_maps_from_file with a MapCache
+    """
+
+    # file and cache inside the temporary test directory
+    filename = str(tmp_path / 'input.txt')
+    with open(filename, 'w') as f:
+        f.write('Hello my name is my name is Patrick.')
+    cache = MapCache(str(tmp_path / 'cache'))
+
+    # first call builds and stores the maps, second call reads them back
+    built = text_utilities.gen_maps_from_file(filename, cache=cache)
+    cached = text_utilities.gen_maps_from_file(filename, cache=cache)
+    assert built == cached
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # changing the file invalidates the entry and removes the stale one
+    with open(filename, 'w') as f:
+        f.write('Hello Ethan')
+    os.utime(filename, ns=(0, 0))
+    word_distribution, _ = text_utilities.gen_maps_from_file(filename, 
+                                                                cache=cache)
+    assert word_distribution == {'hello': 1, 'ethan': 1}
+    assert len(os.listdir(str(tmp_path / 'cache'))) == 1
+
+
+def test_cached_word_count(tmp_path):
+    """
+    Unit test function for get_word_count with a content hash MapCache
+    """
+
+    # two files with the same content share one cache entry
+    cache = MapCache(str(tmp_path / 'cache'), content_hash=True)
+    for name in ['a.txt', 'b.txt']:
+        with open(str(tmp_path / name), 'w') as f:
+            f.write('one two three')
+        assert text_utilities.get_word_count(str(tmp_path / name), 
+                                                cache) == 3
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_unreadable_entries(tmp_path):
+    """
+    Unit test function for MapCache.load with entries that cannot be loaded
+    """
+
+    # truncated entries and entries naming code that no longer exists are
+    # misses and are removed
+    cache = MapCache(str(tmp_path))
+    entries = [b'\x80\x04', b'cnosuchmodule\nThing\n.', b'cos\nnosuchname\n.',
+                b'not a pickle']
+    for index, data in enumerate(entries):
+        key = 'maps-{}-0.pickle'.format(index)
+        (tmp_path / key).write_bytes(data)
+        assert cache.load(key) is None
+        assert not (tmp_path / key).exists()
+    assert cache.load('maps-missing-0.pickle') is None
+    assert (cache.hits, cache.misses) == (0, 5)
+
+
+def test_evict(tmp_path):
+    """
+    Unit test function for MapCache.evict
+    """
+
+    # store three entries with increasing last use times
+    cache = MapCache(str(tmp_path), max_bytes=10 ** 6)
+    for index in range(3):
+        key = 'maps-{}-0.pickle'.format(index)
+        cache.store(key, 'x' * 1000)
+        os.utime(str(tmp_path / key), (index, index))
+
+    # shrinking the limit removes the least recently used entries first
+    cache.max_bytes = 2500
+    cache.evict()
+    assert sorted(os.listdir(str(tmp_path))) == ['maps-1-0.pickle', 
+                                                    'maps-2-0.pickle']
@@ -0,0 +1,54 @@
+import random
+import text_utilities
+import tokenizer
+from ngram_model import NGramModel
+from sentence_generator import SentenceGenerator
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_order_two():
+    """
+    Unit test function for NGramModel with word pairs
+    """
+
+    text = text_utilities.read_file('EpIV.txt')
+    word_distribution, word_map = text_utilities.gen_word_maps(text)
+    tokens = tokenizer.tokenize(text)
+    model = NGramModel.from_token_chunks([tokens[:7], tokens[7:1000],
+                                            tokens[1000:]], order=2)
+
+    # the same counts and sentences as the word maps, across chunks
+    assert model.word_distribution == word_distribution
+    assert model.word_map == word_map
+    generator = SentenceGenerator(word_distribution, word_map)
+    assert model.generate(20) == generator.generate(20)
+    assert model.generate(20, True, random.Random(3)) == \
+        generator.generate(20, True, random.Random(3))
+
+
+def test_longer_contexts():
+    """
+    Unit test function for NGramModel contexts, pruning and backing off
+    """
+
+    tokens = 'a b c a b d a b c x'.split()
+    model = NGramModel.from_token_chunks([tokens[:2], tokens[2:5],
+                                            tokens[5:]], order=3)
+
+    assert model.next_words(['a', 'b']) == {'c': 2, 'd': 1}
+    assert model.next_words(['b']) == {'c': 2, 'd': 1}
+    assert model.next_words(['c', 'x']) is None
+    assert model.next_words(['y']) is None
+
+    # ties go to the word seen last, and x is never followed
+    assert model.generate(10) == 'b c x.'
+    assert model.prune(min_count=2) == 10
+    assert model.next_words(['a', 'b']) == {'c': 2}
+    assert model.next_words(['c']) is None
+
+    # the file functions use the model for orders above 2
+    assert text_utilities.gen_sentence(test_file, 6, order=3) == \
+        'hello my name is hello my.'
@@ -0,0 +1,134 @@
+import parallel
+import text_utilities
+from file_reader import FileReader
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def write_corpus(directory):
+    """
+    Writes a small corpus with a file that cannot be decoded
+    """
+
+    (directory / 'sub').mkdir()
+    (directory / 'a.txt').write_text('Hello my name is Ethan.')
+    (directory / 'sub' / 'b.txt').write_text('my name is Patrick')
+    (directory / 'bad.txt').write_bytes(b'\xff\xfe not utf-8')
+
+
+def test_gen_maps_from_corpus(tmp_path, capsys):
+    """
+    Unit test function for gen_maps_from_corpus
+    """
+
+    write_corpus(tmp_path)
+
+    # serial and process pool runs give the same merged maps
+    for workers in [1, 2]:
+        word_distribution, word_map = parallel.gen_maps_from_corpus(
+                                                str(tmp_path), workers)
+        assert word_distribution['name'] == 2
+        assert word_map['is'] == {'ethan': 1, 'patrick': 1}
+
+        # the last word of one file is not paired with the next file
+        assert 'ethan' not in word_map
+
+    # the bad file is reported instead of stopping the run
+    assert 'bad.txt' in capsys.readouterr().err
+
+
+def test_count_corpus_words(tmp_path):
+    """
+    Unit test function for get_word_count on a glob pattern
+    """
+
+    write_corpus(tmp_path)
+    pattern = str(tmp_path / '**' / '*.txt')
+    assert text_utilities.get_word_count(pattern, workers=2) == 9
+
+
+def test_merge_maps():
+    """
+    Unit test function for merge_maps
+    """
+
+    # merging maps of two halves gives the maps of the whole without the
+    # pair that crosses between them
+    first = text_utilities.gen_word_maps('hello my name')
+    second = text_utilities.gen_word_maps('my name is')
+    word_distribution = dict(first[0])
+    word_map = {word: dict(next_words) for word, next_words in first[1].items()}
+    parallel.merge_maps(word_distribution, word_map, *second)
+    assert word_distribution == {'hello': 1, 'my': 2, 'name': 2, 'is': 1}
+    assert word_map == {'hello': {'my': 1}, 'my': {'name': 2}, 
+                        'name': {'is': 1}}
+
+
+def test_gen_maps_sharded():
+    """
+    Unit test function for gen_maps_sharded
+    """
+
+    # shards of the script must merge into exactly the serial maps
+    expected = text_utilities.gen_maps_from_file('EpIV.txt')
+    for workers in [2, 5]:
+        sharded = parallel.gen_maps_sharded('EpIV.txt', workers, 
+                                            min_shard_size=1)
+        assert sharded == expected
+
+
+def test_sharded_encoding(tmp_path):
+    """
+    Unit test function for the encoding of sharded files and can_shard
+    """
+
+    # shards are decoded with the encoding and error handler of the reader
+    infile = str(tmp_path / 'latin.txt')
+    with open(infile, 'w', encoding='latin-1') as f:
+        f.write('café au lait ' * 50 + 'naïve café')
+    for encoding, errors in [('latin-1', 'strict'), ('utf-8', 'replace')]:
+        reader = FileReader(encoding=encoding, errors=errors)
+        expected = text_utilities.gen_maps_from_file(infile, reader=reader)
+        assert parallel.gen_maps_sharded(infile, 3, min_shard_size=1,
+                                            encoding=encoding,
+                                            errors=errors) == expected
+        assert text_utilities.gen_maps_from_file(infile, workers=3,
+                                                    reader=reader) == expected
+
+    # files that do not keep ASCII as is are read in one process instead
+    assert parallel.can_shard('latin-1') and parallel.can_shard('utf-8')
+    assert not parallel.can_shard('utf-16')
+    assert not parallel.can_shard('utf-8-sig')
+    with open(infile, 'w', encoding='utf-16') as f:
+        f.write('my name is my name')
+    reader = FileReader(encoding='utf-16')
+    assert text_utilities.gen_maps_from_file(infile, workers=3,
+                                                reader=reader)[0] == \
+        {'my': 2, 'name': 2, 'is': 1}
+
+
+def test_count_words_sharded():
+    """
+    Unit test function for count_words_sharded
+    """
+
+    # sharded counts match the serial count of the same file
+    assert parallel.count_words_sharded(test_file, 3, min_shard_size=1) == \
+        text_utilities.get_word_count(test_file)
+
+
+def test_find_shard_offsets():
+    """
+    Unit test function for find_shard_offsets
+    """
+
+    # every inner offset must point at whitespace so no word is split
+    with open(test_file, 'rb') as f:
+        data = f.read()
+    offsets = parallel.find_shard_offsets(test_file, 4)
+    assert offsets[0] == 0 and offsets[-1] == len(data)
+    assert offsets == sorted(set(offsets))
+    for offset in offsets[1:-1]:
+        assert data[offset:offset + 1].isspace()
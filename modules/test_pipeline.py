@@ -0,0 +1,80 @@
+import os
+from pipeline import Pipeline, AtomicWriter, stem_stage, stopword_stage
+from stemming import CachedStemmer
+from stopword_filter import StopwordFilter
+import text_utilities
+from concurrent.futures import ThreadPoolExecutor
+
+stop_words = frozenset(['the', 'a', 'is', 'of', 'to', 'and', 'you'])
+
+
+def write_text(path):
+    """
+    Writes a short text to a file with an AtomicWriter
+    """
+
+    with AtomicWriter(path) as f:
+        f.write('text')
+
+
+def test_pipeline_matches_string_functions(tmp_path):
+    """
+    Unit test function for Pipeline.run
+    """
+
+    stopword_filter = StopwordFilter(stop_words)
+    stemmer = CachedStemmer()
+    text = text_utilities.read_file('EpIV.txt')
+    expected = text_utilities.stem_words(
+        text_utilities.remove_stopwords(text, stopword_filter), stemmer)
+
+    # Test streamed preprocessing matches the string functions
+    outfile = str(tmp_path / 'out.txt')
+    preprocess = Pipeline(stopword_stage(stopword_filter),
+                            stem_stage(stemmer))
+    preprocess.run(text_utilities.read_file_chunks('EpIV.txt', 1000), outfile)
+    assert text_utilities.read_file(outfile) == expected
+
+    # Test a pipeline without stages copies the text
+    chunks = [text[i:i + 333] for i in range(0, len(text), 333)]
+    assert ''.join(Pipeline().process(chunks)) == text
+
+
+def test_atomic_writer(tmp_path):
+    """
+    Unit test function for AtomicWriter
+    """
+
+    outfile = tmp_path / 'out.txt'
+    outfile.write_text('old')
+
+    # Test a failed run leaves the target and no temporary file behind
+    try:
+        with AtomicWriter(str(outfile)) as f:
+            f.write('partial')
+            raise ValueError('failed')
+    except ValueError:
+        pass
+    assert outfile.read_text() == 'old'
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # Test a finished run replaces the target
+    with AtomicWriter(str(outfile)) as f:
+        f.write('new')
+    assert outfile.read_text() == 'new'
+
+    # Test a replaced file keeps its mode and a new file gets the default
+    # mode under the umask, also when written from many threads at once
+    outfile.chmod(0o640)
+    with AtomicWriter(str(outfile)) as f:
+        f.write('newer')
+    assert outfile.stat().st_mode & 0o777 == 0o640
+    umask = os.umask(0o022)
+    try:
+        paths = [str(tmp_path / 'new{}.txt'.format(index)) for
+                    index in range(32)]
+        with ThreadPoolExecutor(16) as executor:
+            list(executor.map(write_text, paths))
+    finally:
+        os.umask(umask)
+    assert all(os.stat(path).st_mode & 0o777 == 0o644 for path in paths)
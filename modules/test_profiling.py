@@ -0,0 +1,54 @@
+import profiling
+import text_utilities
+
+# Note: To run from modules/ use test file name as test.txt
+#       To run from base project directory, use modules/test.txt
+test_file = 'modules/test.txt'
+
+
+def test_profiler():
+    """
+    Unit test function for Profiler, stage and iter_stage
+    """
+
+    runs = []
+    with profiling.Profiler(hooks=[runs.append]) as profiler:
+        with profiling.stage('outer') as outer:
+            outer.tokens += 3
+            with profiling.stage('inner') as inner:
+                inner.bytes += 10
+        items = list(profiling.iter_stage('items', [1, 2], tokens=int))
+    report = profiler.report()
+
+    # hooks see every run, and inner time is not counted in the outer stage
+    assert [run.name for run in runs] == ['inner', 'outer', 'items',
+                                            'items', 'items']
+    assert runs[1].child_seconds >= runs[0].seconds
+    assert items == [1, 2]
+    stages = {stats['stage']: stats for stats in report['stages']}
+    assert stages['outer']['tokens'] == 3
+    assert stages['inner']['bytes'] == 10
+    assert stages['items']['tokens'] == 3
+    assert 'peak memory' in profiling.format_report(report)
+
+    # nothing is recorded once profiling is off
+    assert profiling.active_profiler() is None
+    with profiling.stage('outer'):
+        pass
+    assert profiler.stages['outer']['calls'] == 1
+
+
+def test_profile_gen_maps():
+    """
+    Unit test function for profiling gen_maps_from_file
+    """
+
+    with profiling.Profiler() as profiler:
+        word_distribution, _ = text_utilities.gen_maps_from_file(test_file)
+    report = profiler.report()
+
+    # every word is tokenized and counted once
+    stages = {stats['stage']: stats for stats in report['stages']}
+    assert stages['tokenize']['tokens'] == sum(word_distribution.values())
+    assert stages['count']['tokens'] == sum(word_distribution.values())
+    assert stages['read']['bytes'] > 0
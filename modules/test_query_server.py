@@ -0,0 +1,40 @@
+from query_server import QueryClient, QueryServer
+import pytest
+import text_utilities
+
+test_file = 'modules/test.txt'
+
+
+def test_query_server():
+    """
+    Unit test function for QueryServer and QueryClient
+    """
+
+    maps = text_utilities.gen_maps_from_file(test_file)
+    server = QueryServer({test_file: maps}, port=0)
+    server.start()
+    client = QueryClient(*server.address)
+    try:
+        # Test answers match the functions that read the file
+        assert client.query('/corpora')['corpora'] == [test_file]
+        assert client.query('/count', corpus=test_file)['count'] == 23
+        assert client.query('/sentence', corpus=test_file, length=5) \
+            ['sentence'] == text_utilities.gen_sentence(test_file, 5)
+        top = client.query('/top', corpus=test_file, k=2)['top']
+        assert top == [['hello', 6], ['my', 5]]
+        next_words = client.query('/next', corpus=test_file, word='Ethan')
+        assert next_words['next'] == [['hello', 2]]
+
+        # Test seeded sampling repeats
+        first = client.query('/sentence', corpus=test_file, sample=1, seed=4)
+        second = client.query('/sentence', corpus=test_file, sample=1, seed=4)
+        assert first == second
+
+        # Test errors for unknown corpora and words
+        with pytest.raises(LookupError):
+            client.query('/count', corpus='missing.txt')
+        with pytest.raises(LookupError):
+            client.query('/next', corpus=test_file, word='missing')
+    finally:
+        client.close()
+        server.shutdown()
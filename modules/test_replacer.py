@@ -0,0 +1,54 @@
+from replacer import Replacer, read_replacements
+import text_utilities
+
+
+def test_replace_whole_word():
+    """
+    Unit test function for Replacer.replace
+    """
+
+    # Test substrings are replaced by default, longer words first
+    replacer = Replacer({'the': 'a', 'there': 'here'})
+    assert replacer.replace('the other there') == 'a oar here'
+    assert replacer.hits == {'the': 2, 'there': 1}
+
+    # Test whole word matching leaves longer words alone
+    replacer = Replacer({'the': 'a', 'Luke': 'Leia'}, whole_word=True)
+    assert replacer.replace('the other, Luke. theLuke') == \
+        'a other, Leia. theLuke'
+    assert replacer.hits == {'the': 1, 'Luke': 1}
+
+
+def test_replace_chunks():
+    """
+    Unit test function for Replacer.replace_chunks
+    """
+
+    text = text_utilities.read_file('EpIV.txt')
+    replacements = {'the': 'THE', 'th': 'X', 'Luke': 'Leia', 'e': 'E'}
+    for whole_word in [False, True]:
+        replacer = Replacer(replacements, whole_word)
+        expected = replacer.replace(text)
+
+        # Test chunked replacement matches replacing the whole text
+        for size in [1, 3, 1000]:
+            chunked = Replacer(replacements, whole_word)
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            assert ''.join(chunked.replace_chunks(chunks)) == expected
+            assert chunked.hits == replacer.hits
+
+
+def test_replace_words(tmp_path):
+    """
+    Unit test function for replace_words
+    """
+
+    # Test a mapping file is applied in one pass with hit counts
+    map_file = tmp_path / 'map.txt'
+    map_file.write_text('Hello\tHi\nname\tNAME\n\n')
+    assert read_replacements(str(map_file)) == {'Hello': 'Hi', 'name': 'NAME'}
+    outfile = str(tmp_path / 'out.txt')
+    hits = text_utilities.replace_words('modules/test.txt', outfile, 
+                                        str(map_file), whole_word=True)
+    assert hits == {'Hello': 6, 'name': 4}
+    assert 'Hello' not in text_utilities.read_file(outfile)
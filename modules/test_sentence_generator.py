@@ -0,0 +1,77 @@
+from collections import Counter
+from compact_model import CompactWordModel
+from sentence_generator import SentenceGenerator, build_alias_table, draw
+import random
+import text_utilities
+
+test_file = 'modules/test.txt'
+
+
+def sort_path_sentence(word_distribution, word_map, sentence_length):
+    """
+    Sentence generation the way gen_sentence used to do it, by sorting
+    """
+
+    word = sorted(word_distribution, key=word_distribution.get)[-1]
+    words = [word]
+    while len(words) < sentence_length:
+        word = sorted(word_map[word], key=word_map[word].get)[-1]
+        words.append(word)
+    return ' '.join(words) + '.'
+
+
+def test_generate_matches_sort_path():
+    """
+    Unit test function for SentenceGenerator.generate
+    """
+
+    word_distribution, word_map = text_utilities.gen_maps_from_file(
+                                                    'EpIV.txt')
+    expected = sort_path_sentence(word_distribution, word_map, 50)
+
+    # Test the precomputed table picks the same words, ties included
+    generator = SentenceGenerator(word_distribution, word_map)
+    assert generator.generate(50) == expected
+
+    # Test the compact model views give the same sentence
+    model = CompactWordModel.from_maps(word_distribution, word_map)
+    generator = SentenceGenerator(model.word_distribution, model.word_map)
+    assert generator.generate(50) == expected
+
+
+def test_generate_sample():
+    """
+    Unit test function for SentenceGenerator.generate with sampling
+    """
+
+    word_distribution, word_map = text_utilities.gen_maps_from_file(test_file)
+
+    # Test the same seed gives the same sentence
+    first = SentenceGenerator(word_distribution, word_map, seed=7)
+    second = SentenceGenerator(word_distribution, word_map, seed=7)
+    assert first.generate(20, True) == second.generate(20, True)
+
+    # Test every sampled word follows the previous one in the text
+    words = first.generate(200, True)[:-1].split(' ')
+    for word, next_word in zip(words, words[1:]):
+        assert next_word in word_map[word]
+
+    # Test generation stops at a word with no next word
+    word_distribution, word_map = text_utilities.gen_word_maps('one one two')
+    generator = SentenceGenerator(word_distribution, word_map)
+    assert generator.generate(1000) == 'one two.'
+    assert generator.generate(1000, True).endswith('two.')
+
+
+def test_alias_table():
+    """
+    Unit test function for build_alias_table
+    """
+
+    # Test draws follow the weights
+    frequencies = {'a': 1, 'b': 2, 'c': 7}
+    table = build_alias_table(frequencies)
+    rng = random.Random(0)
+    drawn = Counter(draw(table, rng) for _ in range(20000))
+    for word, value in frequencies.items():
+        assert abs(drawn[word] / 20000 - value / 10) < 0.02
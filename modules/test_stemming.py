@@ -0,0 +1,39 @@
+from nltk.stem import PorterStemmer
+from stemming import CachedStemmer
+import text_utilities
+
+
+def test_cached_stemmer():
+    """
+    Unit test function for CachedStemmer
+    """
+
+    # Test stems match the uncached stemmer
+    words = text_utilities.read_file('EpIV.txt').split()
+    stemmer = CachedStemmer()
+    porter = PorterStemmer()
+    assert stemmer.stem_all(words) == [porter.stem(word) for word in words]
+
+    # Test repeated words are served from the cache
+    assert stemmer.hits + stemmer.misses == len(words)
+    assert stemmer.hit_rate() > 0.6
+
+    # Test the cache stays bounded and still stems correctly
+    small = CachedStemmer(max_size=2)
+    assert small.stem_all(['running', 'dogs', 'running', 'cats']) == \
+        ['run', 'dog', 'run', 'cat']
+    assert small.hits == 1
+    small.clear()
+    assert small.hit_rate() == 0.0
+
+
+def test_stem_words_first_word():
+    """
+    Unit test function for stem_words on the first word
+    """
+
+    # Test the first word is stemmed like the rest
+    stemmer = CachedStemmer()
+    text = text_utilities.stem_words('Running dogs\nRunning', stemmer)
+    assert text == 'run dog\nrun'
+    assert stemmer.hits == 1
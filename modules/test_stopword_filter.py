@@ -0,0 +1,47 @@
+from stopword_filter import StopwordFilter
+import text_utilities
+import tokenizer
+
+stop_words = frozenset(['the', 'a', 'is', 'of', 'my', "it's"])
+
+
+def test_filter_text():
+    """
+    Unit test function for StopwordFilter.filter_text
+    """
+
+    stopword_filter = StopwordFilter(stop_words)
+
+    # Test case and punctuation around words, including the first word
+    text = 'The cat is a friend of mine. It\'s the... best\nof all, THE.'
+    assert stopword_filter.filter_text(text) == 'cat friend mine. best\nall,'
+
+    # Test remove_stopwords uses the filter it is given
+    assert text_utilities.remove_stopwords('My name is', stopword_filter) \
+        == 'name'
+
+
+def test_filter_chunks():
+    """
+    Unit test function for StopwordFilter.filter_chunks
+    """
+
+    stopword_filter = StopwordFilter(stop_words)
+    text = text_utilities.read_file('EpIV.txt')
+    expected = stopword_filter.filter_text(text)
+
+    # Test chunked filtering matches filtering the whole text
+    for size in [1, 7, 1000, len(text)]:
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert ''.join(stopword_filter.filter_chunks(chunks)) == expected
+
+
+def test_filter_tokens():
+    """
+    Unit test function for StopwordFilter.filter_tokens
+    """
+
+    # Test stopwords are dropped from a token stream
+    stopword_filter = StopwordFilter(stop_words)
+    tokens = tokenizer.tokenize('The name of the game')
+    assert list(stopword_filter.filter_tokens(tokens)) == ['name', 'game']
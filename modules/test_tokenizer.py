@@ -0,0 +1,102 @@
+import tokenizer
+from collections import Counter
+
+
+def test_tokenize():
+    """
+    Unit test function for tokenize
+    """
+
+    # punctuation is removed, words are lowercased and repeated whitespace
+    # does not create empty words
+    tokens = tokenizer.tokenize("Hello,  my NAME is\n\tPatrick.")
+    assert tokens == ['hello', 'my', 'name', 'is', 'patrick']
+
+
+def test_iter_token_chunks():
+    """
+    Unit test function for iter_token_chunks
+    """
+
+    # words split across chunks should be joined back together
+    text = 'Hello my name is Hello my name is Ethan.\nHello you'
+    for size in [1, 4, 9]:
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        tokens = [token for token_chunk in tokenizer.iter_token_chunks(chunks)
+                    for token in token_chunk]
+        assert tokens == tokenizer.tokenize(text)
+
+
+def test_last_word_start(monkeypatch):
+    """
+    Unit test function for last_word_start and words longer than
+    MAX_WORD_LENGTH
+    """
+
+    assert tokenizer.last_word_start('my name') == 3
+    assert tokenizer.last_word_start('name') == 0
+    assert tokenizer.last_word_start('my name\n') == 8
+    assert tokenizer.last_word_start('') == 0
+
+    # a word without whitespace is held back whole across many chunks, and
+    # split every MAX_WORD_LENGTH characters once it is longer
+    chunks = ['my ', 'na'] + ['me'] * 1000 + [' is']
+    tokens = [token for token_chunk in tokenizer.iter_token_chunks(chunks)
+                for token in token_chunk]
+    word = 'na' + 'me' * 1000
+    assert tokens == ['my', word, 'is']
+    monkeypatch.setattr(tokenizer, 'MAX_WORD_LENGTH', 1000)
+    tokens = [token for token_chunk in tokenizer.iter_token_chunks(chunks)
+                for token in token_chunk]
+    assert tokens == ['my', word[:1000], word[1000:2000], word[2000:], 'is']
+
+
+def test_count_tokens(monkeypatch):
+    """
+    Unit test function for count_tokens
+    """
+
+    # count two token lists with the pair that crosses between them
+    word_distribution = Counter()
+    word_map = {}
+    last = tokenizer.count_tokens(['my', 'name', 'is'], word_distribution,
+                                    word_map)
+    last = tokenizer.count_tokens(['my', 'name'], word_distribution,
+                                    word_map, last)
+    assert last == 'name'
+    assert word_distribution == {'my': 2, 'name': 2, 'is': 1}
+    assert word_map == {'my': {'name': 2}, 'name': {'is': 1}, 'is': {'my': 1}}
+
+    # long token lists are counted as integer ids into the same maps, in
+    # the same order
+    with open('EpIV.txt') as f:
+        tokens = tokenizer.tokenize(f.read())
+    maps = []
+    for min_tokens in [len(tokens) + 1, 1]:
+        monkeypatch.setattr(tokenizer, 'ID_COUNT_MIN_TOKENS', min_tokens)
+        word_distribution = Counter()
+        word_map = {}
+        last = tokenizer.count_tokens(tokens[:5000], word_distribution,
+                                        word_map)
+        tokenizer.count_tokens(tokens[5000:], word_distribution, word_map,
+                                last)
+        maps.append((list(word_distribution.items()),
+                        [(word, list(next_words.items())) for
+                            word, next_words in word_map.items()]))
+    assert maps[0] == maps[1]
+
+
+def test_split_and_join_words():
+    """
+    Unit test function for split_words and join_words
+    """
+
+    # splitting and joining without changes gives back the original text
+    text = 'Shall I compare thee\nto a  summer\'s day?\n'
+    separators, words = tokenizer.split_words(text)
+    assert tokenizer.join_words(separators, words) == text
+
+    # dropped words take their whitespace with them but keep line breaks
+    keep = [word not in ['to', 'a'] for word in words]
+    assert tokenizer.join_words(separators, words, keep) == \
+        'Shall I compare thee\nsummer\'s day?\n'
@@ -0,0 +1,62 @@
+import random
+import top_k
+from compact_model import CompactWordModel
+from top_k import top_k_items
+
+
+def sort_path_top(counts, k):
+    """
+    Top k selection the way the charts used to do it, by sorting all words
+    """
+
+    keys_sorted = sorted(counts, key=counts.get)
+    return [(key, counts[key]) for key in reversed(keys_sorted[-k:])]
+
+
+def large_vocabulary(size):
+    """
+    Builds word counts with many ties
+    """
+
+    rng = random.Random(18)
+    return {'w' + str(index): rng.randint(1, 500) for index in range(size)}
+
+
+def test_top_k_items_matches_sort():
+    """
+    Unit test function for top_k_items against the sort path
+    """
+
+    counts = large_vocabulary(200000)
+    model = CompactWordModel.from_maps(counts, {})
+
+    # same words in the same order as a stable sort, for dicts and arrays
+    for k in [1, 100, 5000]:
+        expected = sort_path_top(counts, k)
+        assert top_k_items(counts, k) == expected
+        assert top_k_items(model.word_distribution, k) == expected
+
+    # fewer words than k returns all of them
+    assert top_k_items({'a': 1, 'b': 2}, 100) == [('b', 2), ('a', 1)]
+
+
+def test_top_k_tie_break(monkeypatch):
+    """
+    Unit test function for the tie_break option of top_k_items
+    """
+
+    counts = {'c': 1, 'a': 1, 'b': 1, 'd': 2}
+    model = CompactWordModel.from_maps(counts, {})
+    for frequencies in [counts, model.word_distribution]:
+        assert top_k_items(frequencies, 2, 'last') == [('d', 2), ('b', 1)]
+        assert top_k_items(frequencies, 2, 'first') == [('d', 2), ('c', 1)]
+        assert top_k_items(frequencies, 2, 'alphabetical') == [('d', 2), 
+                                                                ('a', 1)]
+
+    # counts sorted whole give the same words as the heap
+    counts = large_vocabulary(5000)
+    for tie_break in ['last', 'first', 'alphabetical']:
+        sorted_top = top_k_items(counts, 100, tie_break)
+        monkeypatch.setattr(top_k, 'HEAP_MIN_COUNTS', 0)
+        assert top_k_items(counts, 100, tie_break) == sorted_top
+        monkeypatch.undo()
@@ -1,8 +1,13 @@
+import subprocess
+import sys
 import text_utilities
 
 # Note: To run from modules/ use test file name as test.txt
 #       To run from base project directory, use modules/test.txt
 test_file = 'modules/test.txt'
+# modules only the commands that need them may import
+LAZY_MODULES = ['matplotlib', 'numpy', 'nltk', 'asyncio', 'http.server', 
+                'http.client', 'concurrent.futures']
 
 
 def test_gen_word_maps():
@@ -37,6 +42,20 @@ def test_gen_maps_from_file():
     assert {'is': 3, 'my': 1} == wordMap['name']
 
 
+def test_gen_maps_from_file_streaming():
+    """
+    Unit test function for streaming gen_maps_from_file in small chunks
+    """
+
+    # maps built from the whole string to compare the streamed maps against
+    expected = text_utilities.gen_word_maps(text_utilities.read_file(test_file))
+
+    # chunk sizes that split words and bigrams across chunk boundaries
+    for chunk_size in [1, 3, 7, 64]:
+        streamed = text_utilities.gen_maps_from_file(test_file, chunk_size)
+        assert streamed == expected
+
+
 def test_update_distribution():
     """
     Unit test function for update_distribution
@@ -152,3 +171,34 @@ def test_gen_sentence():
     assert len(small_length) == 3
      
 
+
+def test_lazy_imports():
+    """
+    Unit test function for the import of text_utilities and the interface
+    """
+
+    # import each module in a fresh interpreter and report heavy modules,
+    # how long the imports take is measured by scripts/benchmark.py
+    for module in ['text_utilities', 'scripts.interface']:
+        code = ('import sys; sys.path.append("modules"); import {}; '
+                'print(" ".join(name for name in {!r} '
+                'if name in sys.modules))').format(module, LAZY_MODULES)
+        result = subprocess.run([sys.executable, '-c', code], 
+                                capture_output=True, text=True, check=True)
+
+        # Test plotting, language, event loop, HTTP and process pool 
+        # libraries are not loaded on import
+        assert result.stdout.strip() == ''
+
+
+def test_shared_maps():
+    """
+    Unit test function for actions given word maps built once
+    """
+
+    # Test actions give the same results from maps passed in
+    maps = text_utilities.gen_maps_from_file(test_file)
+    assert text_utilities.get_word_count(test_file, maps=maps) == \
+        text_utilities.get_word_count(test_file)
+    assert text_utilities.gen_sentence(test_file, 5, maps=maps) == \
+        text_utilities.gen_sentence(test_file, 5)
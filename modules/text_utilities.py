@@ -1,8 +1,27 @@
-import matplotlib.pyplot as plt
-import numpy as np
-import string
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
+import byte_tokenizer
+import charts
+import os
+import parallel
+import pipeline
+import profiling
+import random
+import time
+import tokenizer
+from collections import Counter
+from file_reader import FileReader
+from incremental import FOLLOW_INTERVAL, STORE_INTERVAL, IncrementalMaps
+from map_cache import MapCache
+from ngram_model import DEFAULT_ORDER, NGramModel
+from replacer import Replacer, read_replacements
+from sentence_generator import SentenceGenerator
+from stemming import CachedStemmer
+from stopword_filter import StopwordFilter
+from top_k import TOP_K, top_k_items
+
+# global constants
+CHUNK_SIZE = 1024 * 1024  # number of characters read per chunk when streaming
+STEMMER = CachedStemmer() # stemmer shared by all stemming functions
+BYTE_COUNT_MIN_SIZE = 8 * 1024 * 1024  # smallest file counted over raw bytes
 
 
 def gen_word_maps(text):
@@ -23,34 +42,74 @@ def gen_word_maps(text):
         occurs after each word in the hashmap
     """
 
-    # if the text is an empty string, return None for both maps 
-    if is_empty_text(text):
-        return None, None
+    # the whole string is treated as a single chunk of the stream
+    return gen_maps_from_chunks([text])
 
-    # dictonary to hold frequency of each word
-    word_map = {}  
-    # dictionary to hold dictionaries of next word frequencies for each word
-    word_distribution = {}  
 
-    # preprocessing text to remove punctuation and newline characters
-    # creates empty map table and uses third argument for removal chars
-    text = text.translate(text.maketrans("", "", string.punctuation))
-    text = text.replace('\n', ' ')
+def gen_maps_from_chunks(chunks):
+    """ Generates word distribution and individual word hashmaps from an 
+    iterable of text chunks without joining them into one string
 
-    words = text.split(' ')  # text split into words
-    curr_word_index = 0      # counter to check if there is a next word
+    Parameters
+    ----------
+    chunks: iterable of strings
+        consecutive pieces of a text, words may be split across chunks
+
+    Returns
+    -------
+    wordDistribution: dictionary (string: int)
+        hashmap of each word and their frequency, None if the text has no 
+        words
+    wordDistributions: dictionary (string: dict(string: int))
+        hashmap of hashmaps that contains the number of times each next word 
+        occurs after each word in the hashmap, None if the text has no words
+    """
+
+    return gen_maps_from_tokens(tokenizer.iter_token_chunks(chunks))
 
-    # create word maps and frequencies
-    for word in words:
-        word_distribution = update_distribution(word_distribution, 
-                                                word.lower())
-        # only run if their is a next word remaining
-        if (curr_word_index + 1 < len(words)):
-            word_map = update_word_mapping(word_map, word.lower(), 
-                                            words[curr_word_index + 1].lower())
-        curr_word_index += 1
 
-    return word_distribution, word_map
+def gen_maps_from_tokens(token_chunks, words=None):
+    """ Generates word distribution and individual word hashmaps from 
+    consecutive lists of tokens
+
+    Parameters
+    ----------
+    token_chunks: iterable of lists
+        consecutive tokens of a text, as produced by 
+        tokenizer.iter_token_chunks or FileReader.token_chunks
+    words: dictionary, default : None
+        word of each token if the tokens are raw tokens, such as 
+        FileReader.words, tokens are words if None
+
+    Returns
+    -------
+    wordDistribution: dictionary (string: int)
+        hashmap of each word and their frequency, None if the text has no 
+        words
+    wordDistributions: dictionary (string: dict(string: int))
+        hashmap of hashmaps that contains the number of times each next word 
+        occurs after each word in the hashmap, None if the text has no words
+    """
+
+    # counter to hold frequency of each word
+    word_distribution = Counter()
+    # dictionary to hold dictionaries of next word frequencies for each word
+    word_map = {}
+
+    # add the words and word pairs of each chunk in bulk, carrying the last 
+    # word over for the pair that crosses chunk boundaries
+    prev_word = None
+    for tokens in token_chunks:
+        with profiling.stage('count') as run:
+            prev_word = tokenizer.count_tokens(tokens, word_distribution, 
+                                                word_map, prev_word, words)
+            run.tokens += len(tokens)
+
+    # if the text has no words, return None for both maps 
+    if not word_distribution:
+        return None, None
+
+    return dict(word_distribution), word_map
 
 
 def read_file(filename):
@@ -70,7 +129,9 @@ def read_file(filename):
     # read in text from file if it exists and return it as a string
     try:
         f = open(filename, 'r')
-        text = f.read()
+        with profiling.stage('read') as run:
+            text = f.read()
+            run.bytes += len(text)
         f.close()
         return text
     except FileNotFoundError as err:
@@ -78,18 +139,74 @@ def read_file(filename):
         exit()
 
 
-def gen_maps_from_file(filename):
+def read_file_chunks(filename, chunk_size=CHUNK_SIZE):
+    """ Reads from file and yields its text in fixed-size chunks
+
+    Parameters
+    ----------
+    filename: string
+        path to file to read from
+    chunk_size: int, default : CHUNK_SIZE
+        maximum number of characters in each chunk
+
+    Returns
+    -------
+    chunks: generator of strings
+        consecutive pieces of text from entered file
+    """
+
+    # open file if it exists, only one chunk is held in memory at a time
+    try:
+        f = open(filename, 'r')
+    except FileNotFoundError as err:
+        print(err)
+        exit()
+
+    with f:
+        while True:
+            with profiling.stage('read') as run:
+                chunk = f.read(chunk_size)
+                run.bytes += len(chunk)
+            if not chunk:
+                break
+            yield chunk
+
+
+def gen_maps_from_file(filename, chunk_size=CHUNK_SIZE, compact=False, 
+                        cache=None, workers=None, reader=None, 
+                        max_reads=None):
     """ generates word distribution and individual word hashmaps from an 
-    entered file
+    entered file, streaming it in chunks so memory use depends on the 
+    vocabulary size rather than the file size
 
     Parameters
     ----------
     filename: string
-        file to generate hashmaps from
+        file to generate hashmaps from, or a directory or glob pattern of 
+        files whose maps are built in parallel and merged
+    chunk_size: int, default : CHUNK_SIZE
+        number of characters read from the file at a time
+    compact: bool, default : False
+        count into a CompactWordModel and return its read-only dictionary 
+        views, which use several times less memory for large vocabularies
+    cache: MapCache, default : None
+        on-disk cache to reuse the maps from while the file is unchanged, 
+        not used for directories and glob patterns
+    workers: int, default : None
+        number of worker processes, for directories and glob patterns all 
+        CPUs are used if None, a single file is split into this many shards 
+        counted in parallel if greater than 1
+    reader: FileReader, default : None
+        backend, encoding and error handling to read a single file with in 
+        one process, read as text in chunks of chunk_size if None
+    max_reads: int, default : None
+        number of files of a directory or glob pattern each process reads 
+        at once while counting the ones already read, which hides the 
+        latency of slow storage, one after another if None
     
     Returns
     -------
-    From gen_word_maps():
+    From gen_maps_from_chunks():
     wordDistribution: dictionary (string: int)
         hashmap of each word and their frequency 
     wordDistributions: dictionary (string: dict(string: int))
@@ -97,9 +214,415 @@ def gen_maps_from_file(filename):
         occurs after each word in the hashmap
     """
 
-    # read in text from file specified and generate and return the word maps
-    text = read_file(filename)
-    return gen_word_maps(text)
+    # build maps of several files with the parallel corpus reader
+    if parallel.is_corpus_path(filename):
+        with profiling.stage('parallel'):
+            maps = parallel.gen_maps_from_corpus(filename, workers, 
+                                                    chunk_size, max_reads)
+        return to_compact_maps(maps) if compact else maps
+
+    # return cached maps if they were built from the file in its current state
+    if cache is not None:
+        kind = 'compact' if compact else 'maps'
+        if reader is not None:
+            kind = reader.cache_kind(kind)
+        key = cache.key(filename, kind)
+        maps = cache.load(key)
+        if maps is not None:
+            return maps
+
+    # count shards of the file in parallel if more than one worker is used 
+    # and the file can be split at whitespace bytes, decoding them the way 
+    # the reader would, otherwise stream text from file specified and 
+    # generate the word maps
+    encoding = reader.encoding if reader is not None else None
+    errors = reader.errors if reader is not None else 'strict'
+    if workers is not None and workers > 1 and parallel.can_shard(encoding):
+        try:
+            with profiling.stage('parallel'):
+                maps = parallel.gen_maps_sharded(filename, workers, 
+                                                    chunk_size, 
+                                                    encoding=encoding, 
+                                                    errors=errors)
+        except FileNotFoundError as err:
+            print(err)
+            exit()
+        if compact:
+            maps = to_compact_maps(maps)
+    else:
+        if reader is None:
+            reader = FileReader(chunk_size=chunk_size)
+        token_chunks = reader.token_chunks(filename)
+
+        if not compact:
+            maps = gen_maps_from_tokens(token_chunks, reader.words)
+        else:
+            from compact_model import CompactWordModel
+
+            with profiling.stage('count'):
+                model = CompactWordModel.from_token_chunks(token_chunks, 
+                                                            reader.words)
+            maps = model.word_distribution, model.word_map
+
+            # if the text has no words, return None for both maps 
+            if not model.word_distribution:
+                maps = None, None
+
+    if cache is not None:
+        cache.store(key, maps)
+
+    return maps
+
+
+def gen_ngram_model(filename, order=DEFAULT_ORDER, min_count=1, top_n=None, 
+                    prune_every=None, cache=None, reader=None):
+    """ Counts the next words after every context of up to order - 1 words 
+    of a file, streaming it in chunks
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    order: int, default : DEFAULT_ORDER
+        number of words in the longest n-grams, 2 for word pairs
+    min_count: int, default : 1
+        fewest times a next word must follow a context to be kept
+    top_n: int, default : None
+        most next words kept per context, all if None
+    prune_every: int, default : None
+        number of tokens counted between pruning passes, which bounds 
+        memory on large files, only pruned once counting ends if None
+    cache: MapCache, default : None
+        on-disk cache to reuse the model from while the file is unchanged
+    reader: FileReader, default : None
+        backend, encoding and error handling to read the file with
+
+    Returns
+    -------
+    model: NGramModel
+        next word counts of the file, None if the file has no words
+    """
+
+    if reader is None:
+        reader = FileReader()
+
+    # use the cached model if it was counted the same way from the file in 
+    # its current state
+    model = None
+    if cache is not None:
+        kind = reader.cache_kind('ngram-{}-{}-{}-{}'.format(order, min_count, 
+                                                    top_n, prune_every))
+        key = cache.key(filename, kind)
+        model = cache.load(key)
+
+    if model is None:
+        with profiling.stage('count'):
+            model = NGramModel.from_token_chunks(
+                                reader.token_chunks(filename), order, 
+                                min_count, top_n, prune_every, reader.words)
+        if cache is not None:
+            cache.store(key, model)
+
+    # if the file has no words, return None
+    if not model.word_counts:
+        return None
+    return model
+
+
+def gen_approximate_counts(filename, memory=None, cache=None, reader=None):
+    """ Counts the words and word pairs of a file approximately in a fixed 
+    amount of memory, however large the file is
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    memory: int, default : None
+        bytes of counters and sketches, approximate.DEFAULT_MEMORY if None
+    cache: MapCache, default : None
+        on-disk cache to reuse the counts from while the file is unchanged
+    reader: FileReader, default : None
+        backend, encoding and error handling to read the file with
+
+    Returns
+    -------
+    counts: ApproximateCounts
+        estimated word and next word frequencies of the file with their 
+        error bounds, None if the file has no words
+    """
+
+    # numpy is only needed for approximate counts
+    from approximate import DEFAULT_MEMORY, ApproximateCounts
+
+    if reader is None:
+        reader = FileReader()
+    if memory is None:
+        memory = DEFAULT_MEMORY
+
+    # use the cached counts if they were made with the same memory from the 
+    # file in its current state
+    counts = None
+    if cache is not None:
+        key = cache.key(filename, reader.cache_kind( 
+                                    'approximate-{}'.format(memory)))
+        counts = cache.load(key)
+
+    if counts is None:
+        with profiling.stage('count'):
+            counts = ApproximateCounts.from_token_chunks( 
+                                reader.token_chunks(filename), memory, 
+                                words=reader.words)
+        if cache is not None:
+            cache.store(key, counts)
+
+    # if the file has no words, return None
+    if not counts.total:
+        return None
+    return counts
+
+
+def get_word_estimates(filename, words=(), memory=None, cache=None, 
+                        reader=None, counts=None):
+    """ Gets the word count of a file with estimated word frequencies and 
+    how far they can be off, in a fixed amount of memory
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    words: iterable of strings, default : ()
+        words to estimate the frequency of
+    memory: int, default : None
+        bytes of counters and sketches, see gen_approximate_counts
+    cache: MapCache, default : None
+        on-disk cache to reuse the counts from
+    reader: FileReader, default : None
+        how the file is read, see gen_approximate_counts
+    counts: ApproximateCounts, default : None
+        counts already made from the file, used instead of counting again
+
+    Returns
+    -------
+    stats: dictionary
+        exact word count, memory used, error bounds and the estimated 
+        frequency of each word, see ApproximateCounts.stats
+    """
+
+    # words are counted in lower case
+    words = [word.lower() for word in words]
+    if counts is None:
+        counts = gen_approximate_counts(filename, memory, cache, reader)
+        if counts is None:
+            return {'word_count': 0, 'estimates': dict.fromkeys(words, 0)}
+    return counts.stats(words)
+
+
+def update_maps_from_file(filename, cache=None, reader=None):
+    """ Gets word distribution and individual word hashmaps of a file that 
+    only grows by appending, reading just the text appended since its maps 
+    were last cached
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    cache: MapCache, default : None
+        on-disk cache to keep the maps and how far the file was read in, 
+        the whole file is read if None
+    reader: FileReader, default : None
+        encoding and error handling to read the file with
+
+    Returns
+    -------
+    wordDistribution: dictionary (string: int)
+        hashmap of each word and their frequency, None if the file has no 
+        words
+    wordDistributions: dictionary (string: dict(string: int))
+        hashmap of hashmaps that contains the number of times each next word 
+        occurs after each word in the hashmap, None if the file has no words
+    """
+
+    maps, key = _load_incremental_maps(filename, cache, reader)
+    with profiling.stage('update') as run:
+        run.bytes += maps.update()
+    if cache is not None:
+        cache.store(key, maps)
+    return maps.maps
+
+
+def follow_file(filename, callback, interval=FOLLOW_INTERVAL, cache=None, 
+                reader=None, stop=None, store_interval=STORE_INTERVAL):
+    """ Keeps the word maps of a growing file up to date, reading the text 
+    appended to it at a fixed interval
+
+    Parameters
+    ----------
+    filename: string
+        path to input file
+    callback: function (tuple: None)
+        called with the word distribution and word map once they are up to 
+        date with the file, then after every update that read text
+    interval: float, default : FOLLOW_INTERVAL
+        seconds between checks for appended text
+    cache: MapCache, default : None
+        on-disk cache to keep the maps in once they are up to date, then at 
+        most every store_interval seconds and when following ends, so 
+        following again starts about where it stopped
+    reader: FileReader, default : None
+        encoding and error handling to read the file with
+    stop: threading.Event, default : None
+        ends following once set, follows until interrupted if None
+    store_interval: float, default : STORE_INTERVAL
+        least seconds between stores of the maps in the cache, since each 
+        store writes the whole maps
+
+    Returns
+    -------
+    None
+    """
+
+    maps, key = _load_incremental_maps(filename, cache, reader)
+    stored = None   # time of the last store
+    unstored = False  # whether updates were made since then
+
+    def updated(maps):
+        nonlocal stored, unstored
+        unstored = True
+        if cache is not None and (stored is None or 
+                                    time.monotonic() - stored >= 
+                                    store_interval):
+            cache.store(key, maps)
+            stored = time.monotonic()
+            unstored = False
+        callback(maps.maps)
+
+    # the last updates are stored also when following is interrupted
+    try:
+        maps.follow(updated, interval, stop)
+    finally:
+        if cache is not None and unstored:
+            cache.store(key, maps)
+
+
+def to_compact_maps(maps):
+    """ Converts word maps into the dictionary views of a CompactWordModel
+
+    Parameters
+    ----------
+    maps: tuple
+        word distribution and word map as returned by gen_word_maps
+
+    Returns
+    -------
+    maps: tuple
+        word distribution and word map views of a CompactWordModel holding 
+        the same counts, or None for both if the maps are empty
+    """
+
+    word_distribution, word_map = maps
+    if not word_distribution:
+        return None, None
+
+    # compact models need numpy, imported only when one is built
+    from compact_model import CompactWordModel
+
+    model = CompactWordModel.from_maps(word_distribution, word_map)
+    return model.word_distribution, model.word_map
+
+
+def save_word_maps(maps, filename):
+    """ Writes word maps to a compact binary file, see 
+    CompactWordModel.save
+
+    Parameters
+    ----------
+    maps: tuple
+        word distribution and word map as returned by gen_word_maps, or the 
+        views of a CompactWordModel
+    filename: string
+        path of the file to write
+
+    Returns
+    -------
+    None
+    """
+
+    word_distribution, word_map = maps
+    if not word_distribution:
+        raise ValueError('cannot save word maps of a text with no words')
+
+    # compact models need numpy, imported only when one is built
+    from compact_model import CompactWordModel, WordCountsView
+
+    # maps that are already compact are written as they are
+    if isinstance(word_distribution, WordCountsView):
+        model = word_distribution.model
+    else:
+        model = CompactWordModel.from_maps(word_distribution, word_map)
+    with profiling.stage('write') as run:
+        model.save(filename)
+        run.bytes += model.nbytes()
+
+
+def load_word_maps(filename, memory_map=True):
+    """ Reads word maps written by save_word_maps
+
+    Parameters
+    ----------
+    filename: string
+        path of the saved word maps
+    memory_map: bool, default : True
+        map the file into memory instead of reading it, so the maps load 
+        at once whatever their size and processes loading the same file 
+        share its pages
+
+    Returns
+    -------
+    maps: tuple
+        word distribution and word map views of the saved CompactWordModel
+    """
+
+    # compact models need numpy, imported only when one is loaded
+    from compact_model import CompactWordModel
+
+    try:
+        with profiling.stage('read'):
+            model = CompactWordModel.load(filename, memory_map)
+    except (FileNotFoundError, ValueError) as err:
+        print(err)
+        exit()
+    return model.word_distribution, model.word_map
+
+
+def export_word_maps(filename, outfile, cache=None, workers=None, 
+                        reader=None):
+    """ Counts the word maps of a file as a CompactWordModel and writes 
+    them to a binary file that load_word_maps can read back
+
+    Parameters
+    ----------
+    filename: string
+        path to input file, or a directory or glob pattern of files
+    outfile: string
+        path of the file to write
+    cache: MapCache, default : None
+        on-disk cache to reuse the word maps from
+    workers: int, default : None
+        number of worker processes, see gen_maps_from_file
+    reader: FileReader, default : None
+        how the file is read, see gen_maps_from_file
+
+    Returns
+    -------
+    None
+    """
+
+    maps = gen_maps_from_file(filename, compact=True, cache=cache, 
+                                workers=workers, reader=reader)
+    if not maps[0]:
+        print('Could not export word maps of empty file: ' + filename)
+        exit()
+    save_word_maps(maps, outfile)
 
 
 def update_distribution(word_distribution, word):
@@ -150,7 +673,7 @@ def update_word_mapping(word_map, word, next_word):
     if word in word_map:
         # check if the next word is in the mapping for the current word
         # if it is, increment for the next word, or add it
-        if next_word in word_map[word].keys():
+        if next_word in word_map[word]:
             word_map[word][next_word] = word_map[word][next_word] + 1
         else:
             word_map[word][next_word] = 1
@@ -160,7 +683,8 @@ def update_word_mapping(word_map, word, next_word):
     return word_map
 
 
-def replace_word(filename, output_name, word_to_replace, new_word):
+def replace_word(filename, output_name, word_to_replace, new_word, 
+                    whole_word=False):
     """ Looks for all instances of word_to_replace in specified file and 
     replaces it with new word.
     Writes modified text to specified output file
@@ -172,31 +696,74 @@ def replace_word(filename, output_name, word_to_replace, new_word):
     output_name: string
         path of file to write output to
     word_to_replace: string
+        string to look for in the file
+    new_word: string
         string that will replace all found instances of the word to replace
+    whole_word: bool, default : False
+        only replace instances that are not part of a longer word
 
     Returns
     -------
-    None
+    hits: int
+        number of instances replaced
     """
 
-    # read text from file and then replace all instances of old word with the
-    # specified new word
-    text = read_file(filename)
-    mod_text = text.replace(word_to_replace, new_word)
+    hits = replace_words(filename, output_name, {word_to_replace: new_word}, 
+                            whole_word)
+    return hits[word_to_replace]
+
+
+def replace_words(filename, output_name, replacements, whole_word=False):
+    """ Replaces all words of a mapping in specified file in a single 
+    streaming pass and writes modified text to specified output file
+
+    Parameters
+    ----------
+    filename: string
+        path to input file to modify
+    output_name: string
+        path of file to write output to
+    replacements: dictionary (string: string) or string
+        new word for each word to replace, or path to a mapping file with
+        one word, a tab and its new word per line
+    whole_word: bool, default : False
+        only replace instances that are not part of a longer word
+
+    Returns
+    -------
+    hits: dictionary (string: int)
+        number of instances replaced for each word
+    """
+
+    # read the mapping file, exit with message if it is missing or invalid
+    if isinstance(replacements, str):
+        try:
+            replacements = read_replacements(replacements)
+        except (OSError, ValueError) as err:
+            print(err)
+            exit()
+
+    # stream the file through the replacer into the output file
+    replacer = Replacer(replacements, whole_word)
+    with pipeline.AtomicWriter(output_name) as f:
+        for text in profiling.iter_stage('replace', 
+                        replacer.replace_chunks(read_file_chunks(filename))):
+            with profiling.stage('write') as run:
+                f.write(text)
+                run.bytes += len(text)
 
-    # write text to file with specified name
-    with open(output_name, 'w') as f:
-        f.write(mod_text)
-    f.close()
+    return replacer.hits
 
 
-def remove_stopwords(text):
+def remove_stopwords(text, stopword_filter=None):
     """ Removes all found stopwords from the input text
 
     Parameters
     ----------
     text: string
         string to remove stopwords from
+    stopword_filter: StopwordFilter, default : None
+        filter with the stopwords to remove, English stopwords if None
 
     Returns
     -------
@@ -204,53 +771,57 @@ def remove_stopwords(text):
         text with all stopwords removed
     """
 
-    words = text.split(' ')
+    # the English stopword list is only loaded by the first default filter
+    if stopword_filter is None:
+        stopword_filter = StopwordFilter()
 
-    # grab all english stopwords and put it into a set
-    stop_words = set(stopwords.words('english')) 
+    with profiling.stage('stopwords'):
+        return stopword_filter.filter_text(text)
 
-    modified_text = words[0]
 
-    # Append only words not in stopwords set
-    for i in range(1, len(words)):
-        if not words[i] in stop_words:
-            modified_text += ' ' + words[i]
-
-    return modified_text
-
-
-def remove_stopwords_from_file(filename, outfile):
+def remove_stopwords_from_file(filename, outfile, stopword_filter=None, 
+                                max_reads=None):
     """ Removes all stopwords from input file and writes it to output file
 
     Parameters
     ----------
     filename: string
-        path to input file
+        path to input file, or a directory or glob pattern of files
     outfile: string
-        path to output file to write modified text to
+        path to output file to write modified text to, or the directory to 
+        write each file of a directory or glob pattern to
+    stopword_filter: StopwordFilter, default : None
+        filter with the stopwords to remove, English stopwords if None
+    max_reads: int, default : None
+        number of files of a directory or glob pattern read and written at 
+        once, see transform_corpus
 
     Returns
     -------
     None
     """
 
-    # read text from file and them remove all stopwords from it
-    text = read_file(filename)
-    text = remove_stopwords(text)
+    if stopword_filter is None:
+        stopword_filter = StopwordFilter()
 
-    # write modified text to specified file
-    with open(outfile, 'w') as f:
-        f.write(text)
-    f.close()
+    # stream the file through stopword removal into the output file
+    stopwords_pipeline = pipeline.Pipeline(
+                                pipeline.stopword_stage(stopword_filter))
+    if parallel.is_corpus_path(filename):
+        transform_corpus(filename, outfile, stopwords_pipeline, max_reads)
+        return
+    stopwords_pipeline.run(read_file_chunks(filename), outfile)
 
 
-def stem_words(text):
+def stem_words(text, stemmer=None):
     """ Applies stemming to group of text passed in
 
     Parameters
     ----------
     text: string
         string to modify
+    stemmer: CachedStemmer, default : None
+        stemmer to use, the shared STEMMER if None
 
     Returns
     -------
@@ -258,130 +829,259 @@ def stem_words(text):
         string after applying word stemming
     """
 
-    # initialize stemmer object and setup words
-    ps = PorterStemmer()
-    words = text.split(' ')
-    stemmed_text = words[0]
+    if stemmer is None:
+        stemmer = STEMMER
+    with profiling.stage('tokenize') as run:
+        separators, words = tokenizer.split_words(text)
+        run.tokens += len(words)
 
-    # append stemmed words to output string
-    for i in range(1, len(words)):
-        stemmed_text += ' ' + ps.stem(words[i])
+    # stem every word, keeping the original whitespace
+    with profiling.stage('stem') as run:
+        words = stemmer.stem_all(words)
+        run.tokens += len(words)
+    with profiling.stage('join'):
+        return tokenizer.join_words(separators, words)
 
-    return stemmed_text
 
-
-def stem_file(filename, outfile):
+def stem_file(filename, outfile, max_reads=None):
     """ Stems input from file and writes it to specified outfile
 
     Parameters
     ----------
     filename: string
-        path to input file
+        path to input file, or a directory or glob pattern of files
     outfile: string
-        path to output file to write stemmed text to
+        path to output file to write stemmed text to, or the directory to 
+        write each file of a directory or glob pattern to
+    max_reads: int, default : None
+        number of files of a directory or glob pattern read and written at 
+        once, see transform_corpus
 
     Returns
     -------
     None
     """
 
-    # read text in from file and stem each word in the text
-    text = read_file(filename)
-    text = stem_words(text)
+    # stream the file through stemming into the output file
+    stem_pipeline = pipeline.Pipeline(pipeline.stem_stage(STEMMER))
+    if parallel.is_corpus_path(filename):
+        transform_corpus(filename, outfile, stem_pipeline, max_reads)
+        return
+    stem_pipeline.run(read_file_chunks(filename), outfile)
 
-    # write text to specified output file
-    with open(outfile, 'w') as f:
-        f.write(text)
-    f.close()
 
-
-def preprocess_file(filename, outfile):
+def preprocess_file(filename, outfile, max_reads=None):
     """ Applies stopword removal and stemming to input file and writes 
     modified text to output file
 
     Parameters
     ----------
     filename: string
-        path to input file
+        path to input file, or a directory or glob pattern of files
     outfile: string
-        path to output file to write modified text to
+        path to output file to write modified text to, or the directory to 
+        write each file of a directory or glob pattern to
+    max_reads: int, default : None
+        number of files of a directory or glob pattern read and written at 
+        once, see transform_corpus
 
     Returns
     -------
     None
     """
 
-    # read text from file and remove stopwords and stem words in it
-    text = read_file(filename)
-    text = remove_stopwords(text)
-    text = stem_words(text)
+    # stream the file through stopword removal and stemming into the output
+    # file, words are stemmed only if they are kept
+    preprocess_pipeline = pipeline.Pipeline(
+                                pipeline.stopword_stage(StopwordFilter()),
+                                pipeline.stem_stage(STEMMER))
+    if parallel.is_corpus_path(filename):
+        transform_corpus(filename, outfile, preprocess_pipeline, max_reads)
+        return
+    preprocess_pipeline.run(read_file_chunks(filename), outfile)
+
 
-    # write preprocessed text to specified output file
-    with open(outfile, 'w') as f:
-        f.write(text)
-    f.close()
+def transform_corpus(path, outdir, text_pipeline, max_reads=None):
+    """ Passes every file of a directory or glob pattern through a 
+    pipeline, writing each to the same path relative to the corpus in an 
+    output directory; files are read, processed and written at the same 
+    time, see async_ingest.transform_files
+
+    Parameters
+    ----------
+    path: string
+        directory or glob pattern of the input files
+    outdir: string
+        directory to write the processed files to
+    text_pipeline: Pipeline
+        stages to pass the text of every file through
+    max_reads: int, default : None
+        number of files read at once, and written at once, 
+        async_ingest.MAX_READS if None
+
+    Returns
+    -------
+    written: int
+        number of files written
+    """
+
+    # asyncio is only imported when a corpus is transformed
+    import async_ingest
+
+    filenames = parallel.find_corpus_files(path)
+    if not filenames:
+        print('no files found for corpus: ' + path)
+        exit()
+    if max_reads is None:
+        max_reads = async_ingest.MAX_READS
+
+    pairs = async_ingest.corpus_outfiles(filenames, path, outdir)
+    written, errors = async_ingest.transform_files(pairs, text_pipeline, 
+                                                    max_reads, max_reads)
+
+    # bad files are reported and skipped instead of stopping the run
+    for failed_file, message in errors:
+        print('skipping ' + failed_file + ': ' + message)
+    return written
 
 
-def show_word_frequencies(filename):
-    """ Creates bar chart with top 100 word frequencies from input file
+def show_word_frequencies(filename, compact=False, cache=None, 
+                            workers=None, top=TOP_K, tie_break='last', 
+                            maps=None, reader=None, outfile=None, 
+                            renderer=None, memory=None):
+    """ Creates bar chart with the top word frequencies from input file
 
     Parameters:
     filename: string
         path to input file
+    compact: bool, default : False
+        build the word maps as a CompactWordModel
+    cache: MapCache, default : None
+        on-disk cache to reuse the word maps from
+    workers: int, default : None
+        number of worker processes, see gen_maps_from_file
+    top: int, default : TOP_K
+        number of most frequent words to show
+    tie_break: string, default : 'last'
+        which words win among equal frequencies, see top_k_items
+    maps: tuple, default : None
+        word distribution and word map already built from the file, used 
+        instead of building them again
+    reader: FileReader, default : None
+        how the file is read, see gen_maps_from_file
+    outfile: string, default : None
+        file to save the chart to instead of showing it, see draw_distribution
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save the chart with, see draw_distribution
+    memory: int, default : None
+        bytes to count the words approximately in, keeping only the most 
+        frequent ones, see gen_approximate_counts, exact word maps if None
     
     Returns
     None (shows bar chart figure of word frequencies)
     """
 
+    # estimate the frequencies of the most frequent words in bounded memory
+    if maps is None and memory is not None:
+        maps = _approximate_maps(filename, memory, cache, reader)
+
     # get word map and word distribution for file
-    word_distribution, word_map = gen_maps_from_file(filename)
+    if maps is None:
+        maps = gen_maps_from_file(filename, compact=compact, cache=cache, 
+                                    workers=workers, reader=reader)
+    word_distribution, word_map = maps
 
     # check if any of the word maps are empty
     if not word_distribution or not word_map:
         print('Could not generate frequency chart for empty file: ' + filename)
         exit()
 
-    # sort by dictionary value using get as a callback function
-    keys_sorted = sorted(word_distribution, key=word_distribution.get)
-
-    # add keys in sorted order to the sorted dictionary
-    sorted_dict = {} 
-    for key in keys_sorted:
-        sorted_dict[key] = word_distribution[key]
-
-    # convert dictionary objects into lists for array slicing
-    top_hundred_words = list(sorted_dict.keys())
-    top_hundred_values = list(sorted_dict.values())
-
-    # only take the top 100 words if there are more than 100
-    if len(top_hundred_words) > 100:
-        # getting the last 100 indices 
-        start_slice = len(top_hundred_words) - 101
-        end_slice = len(top_hundred_words) - 1
-        top_hundred_words = top_hundred_words[start_slice:end_slice]
-        top_hundred_values = top_hundred_values[start_slice:end_slice]
+    # create the bar chart for the most frequent words
+    draw_top_frequencies(word_distribution, 'Words', 'Frequency', 
+                            'Word Frequency Distribution', top, tie_break, 
+                            outfile, renderer)
 
-    # create the bar chart for the word frequencies 
-    draw_distribution(top_hundred_words, top_hundred_values, 
-                        'Words', 'Frequency', 'Word Frequency Distribution')
 
-
-def show_next_word_distribution(filename, word):
+def show_next_word_distribution(filename, word, compact=False, cache=None, 
+                                workers=None, top=TOP_K, tie_break='last', 
+                                maps=None, reader=None, outfile=None, 
+                                renderer=None, order=2, model=None, 
+                                memory=None):
     """ Creates bar chart with frequencies of words that come after entered 
-    word
+    word, or after a context of several words
 
     Parameters:
     filename: string
         path to input file
     word: string
-        string used to create next word frequencies map
+        string used to create next word frequencies map, up to order - 1 
+        words separated by spaces when an n-gram model is used
+    compact: bool, default : False
+        build the word maps as a CompactWordModel
+    cache: MapCache, default : None
+        on-disk cache to reuse the word maps from
+    workers: int, default : None
+        number of worker processes, see gen_maps_from_file
+    top: int, default : TOP_K
+        number of most frequent words to show
+    tie_break: string, default : 'last'
+        which words win among equal frequencies, see top_k_items
+    maps: tuple, default : None
+        word distribution and word map already built from the file, used 
+        instead of building them again
+    reader: FileReader, default : None
+        how the file is read, see gen_maps_from_file
+    outfile: string, default : None
+        file to save the chart to instead of showing it, see draw_distribution
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save the chart with, see draw_distribution
+    order: int, default : 2
+        number of words in the longest n-grams counted, word maps are used 
+        for 2 and an n-gram model for more
+    model: NGramModel, default : None
+        n-gram model already counted from the file, used instead of the 
+        word maps
+    memory: int, default : None
+        bytes to count the words and word pairs approximately in, see 
+        gen_approximate_counts, exact word maps if None
     
     Returns
     None (shows bar chart figure of word frequencies)
     """
 
+    # next words of a context of several words come from an n-gram model
+    if model is None and order > 2:
+        model = gen_ngram_model(filename, order, cache=cache, reader=reader)
+        if model is None:
+            print('Could not generate frequency chart for empty file: ' + 
+                    filename)
+            exit()
+    if model is not None:
+        context = word.lower().split()
+        if not 0 < len(context) < model.order:
+            print('context must have 1 to {} words'.format(model.order - 1))
+            exit()
+        next_word_frequencies = model.next_words(context)
+        if next_word_frequencies is None:
+            print(word + ' does not exist in the file: ' + filename)
+            exit()
+
+        draw_top_frequencies(next_word_frequencies, 'Next Words', 
+                                'Frequency', 
+                                'Next Word Frequency Distribution for: ' + 
+                                ' '.join(context), top, tie_break, outfile, 
+                                renderer)
+        return
+
+    # estimate the next word frequencies in bounded memory
+    if maps is None and memory is not None:
+        maps = _approximate_maps(filename, memory, cache, reader)
+
     # get word map and distribution for file
-    word_distribution, word_map = gen_maps_from_file(filename)
+    if maps is None:
+        maps = gen_maps_from_file(filename, compact=compact, cache=cache, 
+                                    workers=workers, reader=reader)
+    word_distribution, word_map = maps
 
     # check if any of the word maps are empty
     if not word_distribution or not word_map:
@@ -402,39 +1102,28 @@ def show_next_word_distribution(filename, word):
     # preprocess word
     word = word.lower()
 
-    # sort word dictionary by dictionary value using get as a callback function
-    keys_sorted = sorted(next_word_frequencies, key=next_word_frequencies.get)
-
-    # add keys in sorted order to the sorted dictionary
-    sorted_dict = {} 
-    for key in keys_sorted:
-        sorted_dict[key] = next_word_frequencies[key]
+    # create the bar chart for the most frequent words
+    draw_top_frequencies(next_word_frequencies, 'Next Words', 'Frequency', 
+                            'Next Word Frequency Distribution for: ' + word, 
+                            top, tie_break, outfile, renderer)
 
-    # convert dictionary objects into lists for array slicing
-    top_hundred_words = list(sorted_dict.keys())
-    top_hundred_values = list(sorted_dict.values())
 
-    # only take the top 100 words if there are more than 100
-    if len(top_hundred_words) > 100:
-        # getting the last 100 indices 
-        start_slice = len(top_hundred_words) - 101
-        end_slice = len(top_hundred_words) - 1
-        top_hundred_words = top_hundred_words[start_slice:end_slice]
-        top_hundred_values = top_hundred_values[start_slice:end_slice]
-
-    # create the bar chart for the word frequencies 
-    draw_distribution(top_hundred_words, top_hundred_values, 'Next Words', 
-                        'Frequency', 'Next Word Frequency Distribution for: ' + 
-                        word)
-
-
-def show_preprocessed_distribution(filename):
-    """ Creates bar chart with top 100 word frequencies from input file after 
+def show_preprocessed_distribution(filename, top=TOP_K, tie_break='last', 
+                                    outfile=None, renderer=None):
+    """ Creates bar chart with the top word frequencies from input file after 
     performing stopword removal and stemming
 
     Parameters:
     filename: string
         path to input file
+    top: int, default : TOP_K
+        number of most frequent words to show
+    tie_break: string, default : 'last'
+        which words win among equal frequencies, see top_k_items
+    outfile: string, default : None
+        file to save the chart to instead of showing it, see draw_distribution
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save the chart with, see draw_distribution
     
     Returns
     None (shows bar chart figure of word frequencies after preprocessing)
@@ -453,32 +1142,58 @@ def show_preprocessed_distribution(filename):
     text = stem_words(text)
     word_distribution, word_map = gen_word_maps(text)
 
-    # sort by dictionary value using get as a callback function
-    keys_sorted = sorted(word_distribution, key=word_distribution.get)
+    # preprocessing may remove every word of the file
+    if not word_distribution:
+        print('Could not generate frequency chart for empty file: ' + filename)
+        exit()
+
+    # create the bar chart for the most frequent words
+    draw_top_frequencies(word_distribution, 'Words', 'Frequency', 
+                            'Word Frequency Distribution (Preprocessed)', 
+                            top, tie_break, outfile, renderer)
+
+
+def draw_top_frequencies(frequencies, x_axis, y_axis, title, top=TOP_K, 
+                            tie_break='last', outfile=None, renderer=None):
+    """ Creates bar chart of the most frequent words, least frequent first
 
-    # add keys in sorted order to the sorted dictionary
-    sorted_dict = {} 
-    for key in keys_sorted:
-        sorted_dict[key] = word_distribution[key]
+    Parameters
+    ----------
+    frequencies: dictionary (string: int)
+        frequency of each word
+    x_axis: string
+        label of the x axis
+    y_axis: string
+        label of the y axis
+    title: string
+        title of the chart
+    top: int, default : TOP_K
+        number of most frequent words to show
+    tie_break: string, default : 'last'
+        which words win among equal frequencies, see top_k_items
+    outfile: string, default : None
+        file to save the chart to instead of showing it, see draw_distribution
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save the chart with, see draw_distribution
 
-    # convert dictionary objects into lists for array slicing
-    top_hundred_words = list(sorted_dict.keys())
-    top_hundred_values = list(sorted_dict.values())
+    Returns
+    -------
+    None (draws bar chart figure)
+    """
 
-    # only take the top 100 words if there are more than 100
-    if len(top_hundred_words) > 100:
-        # getting the last 100 indices 
-        start_slice = len(top_hundred_words) - 101
-        end_slice = len(top_hundred_words) - 1
-        top_hundred_words = top_hundred_words[start_slice:end_slice]
-        top_hundred_values = top_hundred_values[start_slice:end_slice]
+    # select the top words with a bounded heap instead of a full sort
+    with profiling.stage('top_k') as run:
+        top_items = top_k_items(frequencies, top, tie_break)
+        run.tokens += len(frequencies)
+    top_items.reverse()
 
-    # create the bar chart for the word frequencies 
-    draw_distribution(top_hundred_words, top_hundred_values, 'Words', 
-                    'Frequency', 'Word Frequency Distribution (Preprocessed)')
+    words = [word for word, _ in top_items]
+    values = [value for _, value in top_items]
+    draw_distribution(words, values, x_axis, y_axis, title, outfile, renderer)
 
 
-def draw_distribution(keys, values, x_axis, y_axis, title):
+def draw_distribution(keys, values, x_axis, y_axis, title, outfile=None, 
+                        renderer=None):
     """ Creates bar chart diagram for word frequencies
 
     Parameters
@@ -487,33 +1202,73 @@ def draw_distribution(keys, values, x_axis, y_axis, title):
         list of words 
     values: lsit of ints
         list of integers that specify the frequency for each word in keys
+    outfile: string, default : None
+        file to save the chart to without a display, as a PNG, SVG or PDF 
+        image or as JSON or CSV data (without importing matplotlib), chosen 
+        by its extension; the chart is shown on screen if None
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save the chart with, such as a ParallelRenderer to save 
+        many charts at once, the renderer of this process if None
 
     Returns
     -------
     None (draws bar chart figure)
     """
 
-    # specifications for bar chart figure
-    # link to relevant documentation
-    # https://matplotlib.org/3.3.3/api/_as_gen/matplotlib.pyplot.bar.html
-    y_position = np.arange(len(keys))
-    plt.bar(y_position, values, align='center', alpha=0.5)
-    plt.xticks(y_position, keys, rotation=90)
-    plt.ylabel(y_axis)
-    plt.xlabel(x_axis)
-    plt.title(title)
-    plt.tick_params(axis='x', which='major', labelsize=7)
-    plt.tight_layout()
+    # save the chart to a file with a reused figure, off the pyplot state
+    if outfile is not None:
+        chart = charts.Chart(keys, values, x_axis, y_axis, title)
+        with profiling.stage('draw'):
+            if renderer is None:
+                charts.render_chart(chart, outfile)
+            else:
+                renderer.render(chart, outfile)
+        return
+
+    with profiling.stage('draw'):
+        # matplotlib is slow to import and only needed for charts
+        import matplotlib.pyplot as plt
+
+        # specifications for bar chart figure
+        # link to relevant documentation
+        # https://matplotlib.org/3.3.3/api/_as_gen/matplotlib.pyplot.bar.html
+        y_position = range(len(keys))
+        plt.bar(y_position, values, align='center', alpha=0.5)
+        plt.xticks(y_position, keys, rotation=90)
+        plt.ylabel(y_axis)
+        plt.xlabel(x_axis)
+        plt.title(title)
+        plt.tick_params(axis='x', which='major', labelsize=7)
+        plt.tight_layout()
+
+    # time spent looking at the chart is not drawing time
     plt.show()
 
 
-def get_word_count(filename):
+def get_word_count(filename, cache=None, workers=None, maps=None, 
+                    compat=False, max_reads=None):
     """ Gets number of words contained in input file
 
     Parameters
     ----------
     filename: string
-        path to input file
+        path to input file, or a directory or glob pattern of files that are 
+        counted in parallel
+    cache: MapCache, default : None
+        on-disk cache to reuse the count from while the file is unchanged
+    workers: int, default : None
+        number of worker processes, for directories and glob patterns all 
+        CPUs are used if None, a single file is split into this many shards 
+        counted in parallel if greater than 1
+    maps: tuple, default : None
+        word distribution and word map already built from the file, used 
+        instead of building them again
+    compat: bool, default : False
+        count words of the decoded text even when a large UTF-8 file could 
+        be counted over its raw bytes
+    max_reads: int, default : None
+        number of files of a directory or glob pattern each process reads 
+        at once, see gen_maps_from_file
 
     Returns
     -------
@@ -521,24 +1276,59 @@ def get_word_count(filename):
         number of words contained in input file
     """
 
-    # read text from file and remove punctuation and newline characters
-    text = read_file(filename)
-
-    # check if text from file is consider empty, then count is 0
-    if (is_empty_text(text)):
-        return 0
-
-    text = text.translate(text.maketrans("", "", string.punctuation))
-    text = text.replace('\n', ' ')
+    # every word of the file is counted once in the word distribution
+    if maps is not None:
+        word_distribution = maps[0]
+        return sum(word_distribution.values()) if word_distribution else 0
+
+    if parallel.is_corpus_path(filename):
+        with profiling.stage('parallel'):
+            return parallel.count_corpus_words(filename, workers, 
+                                                max_reads=max_reads)
+
+    # return the cached count if the file has not changed since it was stored
+    if cache is not None:
+        key = cache.key(filename, 'count')
+        word_count = cache.load(key)
+        if word_count is not None:
+            return word_count
+
+    # count shards of the file in parallel, or stream it and add up the 
+    # number of words in each chunk
+    if workers is not None and workers > 1:
+        try:
+            with profiling.stage('parallel'):
+                word_count = parallel.count_words_sharded(filename, workers, 
+                                                            compat=compat)
+        except FileNotFoundError as err:
+            print(err)
+            exit()
+        if cache is not None:
+            cache.store(key, word_count)
+        return word_count
+
+    # large UTF-8 files are counted over their memory-mapped bytes without 
+    # decoding them, small files are not worth importing NumPy for
+    if not compat and byte_tokenizer.is_utf8() and os.path.isfile(filename) \
+            and os.path.getsize(filename) >= BYTE_COUNT_MIN_SIZE:
+        with profiling.stage('count') as run:
+            word_count = byte_tokenizer.count_words(filename)
+            run.bytes += os.path.getsize(filename)
+            run.tokens += word_count
+    else:
+        word_count = 0
+        for tokens in tokenizer.iter_token_chunks(read_file_chunks(filename)):
+            word_count += len(tokens)
 
-    # get number of words in text string
-    words = text.split(' ')
-    word_count = len(words)
+    if cache is not None:
+        cache.store(key, word_count)
 
     return word_count
 
 
-def gen_sentence(filename, sentence_length=10):
+def gen_sentence(filename, sentence_length=10, compact=False, cache=None, 
+                    workers=None, sample=False, seed=None, maps=None, 
+                    reader=None, order=2, model=None):
     """ Generates sentence using word frequency and word map hashmaps with 
     sentence length
 
@@ -547,7 +1337,31 @@ def gen_sentence(filename, sentence_length=10):
     filename: string
         path to input file
     sentence_length: int, default : 10
-        number of words to put in the generated sentence
+        maximum number of words to put in the generated sentence, fewer when
+        a word is reached that no other word follows
+    compact: bool, default : False
+        build the word maps as a CompactWordModel
+    cache: MapCache, default : None
+        on-disk cache to reuse the word maps from
+    workers: int, default : None
+        number of worker processes, see gen_maps_from_file
+    sample: bool, default : False
+        draw each word at random weighted by frequency instead of always
+        taking the most common one
+    seed: int, default : None
+        seed for the random draws when sampling
+    maps: tuple, default : None
+        word distribution and word map already built from the file, used 
+        instead of building them again
+    reader: FileReader, default : None
+        how the file is read, see gen_maps_from_file
+    order: int, default : 2
+        number of words in the longest n-grams counted, each word follows 
+        from up to order - 1 words before it; word maps are used for 2 and 
+        an n-gram model for more
+    model: NGramModel, default : None
+        n-gram model already counted from the file, used instead of the 
+        word maps
 
     Returns
     -------
@@ -555,38 +1369,33 @@ def gen_sentence(filename, sentence_length=10):
         generated sentence using word maps
     """
 
-    word_distribution, word_map = gen_maps_from_file(filename)
+    # follow longer contexts with an n-gram model, backing off to shorter 
+    # ones that were seen
+    if model is None and order > 2:
+        model = gen_ngram_model(filename, order, cache=cache, reader=reader)
+        if model is None:
+            print('cannot generate sentence from empty file: ' + filename)
+            exit()
+    if model is not None:
+        with profiling.stage('generate'):
+            return model.generate(sentence_length, sample, 
+                                    random.Random(seed))
+
+    if maps is None:
+        maps = gen_maps_from_file(filename, compact=compact, cache=cache, 
+                                    workers=workers, reader=reader)
+    word_distribution, word_map = maps
 
     # check if any of the word maps are empty, exit with message
     if not word_distribution or not word_map:
         print('cannot generate sentence from empty file: ' + filename)
         exit()
 
-    # get most common word from word frequencies and use tha as the first word
-    # in the generated sentence
-    last_index = len(word_distribution) - 1
-    most_common_word = sorted(word_distribution, key=word_distribution.get)
-    most_common_word = most_common_word[last_index]
-
-    # using the next word frequencies for words in the word map, get the most
-    # common next word for each word and append it to the sentence while the
-    # length has not been met 
-    sentence = most_common_word
-    word_count = 1
-    while word_count < sentence_length:
-        last_index = len(word_map[most_common_word]) - 1
-
-        # sort the next words dictionary for the current most common word
-        most_common_word = sorted(word_map[most_common_word], 
-                                    key = word_map[most_common_word].get)
-
-        # add new most common word to the sentence                     
-        most_common_word = most_common_word[last_index]
-        sentence += ' ' + most_common_word
-        word_count += 1
-
-    sentence += '.'
-    return sentence
+    # start from the most common word and follow the most common next word of
+    # each word, looked up in a table built once
+    with profiling.stage('generate'):
+        generator = SentenceGenerator(word_distribution, word_map, seed)
+        return generator.generate(sentence_length, sample)
 
 
 def is_empty_text(text):
@@ -609,4 +1418,37 @@ def is_empty_text(text):
     if text == '':
         return True
 
-    return False
\ No newline at end of file
+    return False
+
+
+def _load_incremental_maps(filename, cache, reader):
+    # incremental maps of a file from the cache, or new ones, with their 
+    # cache key
+    encoding, errors = None, 'strict'
+    if reader is not None:
+        encoding, errors = reader.encoding, reader.errors
+
+    key = None
+    maps = None
+    if cache is not None:
+        kind = 'appendable'
+        if reader is not None:
+            kind = reader.cache_kind(kind)
+        key = cache.path_key(filename, kind)
+        maps = cache.load(key)
+    if maps is None:
+        maps = IncrementalMaps(filename, encoding, errors)
+    else:
+        # the key is built from the absolute path, which the cached maps may
+        # not hold if they were made from another working directory
+        maps.filename = os.path.abspath(filename)
+    return maps, key
+
+
+def _approximate_maps(filename, memory, cache, reader):
+    # estimated word distribution and word map of a file in bounded memory, 
+    # None for both if the file has no words
+    counts = gen_approximate_counts(filename, memory, cache, reader)
+    if counts is None:
+        return None, None
+    return counts.word_distribution, counts.word_map
@@ -0,0 +1,432 @@
+import profiling
+import re
+import string
+from collections import Counter
+from itertools import chain
+
+# global constants
+# translation table that deletes all punctuation characters in one pass
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+# splits text into alternating whitespace and word pieces
+SURFACE_PATTERN = re.compile(r'(\S+)')
+# fewest tokens counted through integer word ids with NumPy, fewer are not
+# worth importing it for
+ID_COUNT_MIN_TOKENS = 65536
+# longest word kept whole, longer words are split every MAX_WORD_LENGTH
+# characters so a text without whitespace is never held in memory at once
+# and is split the same way however it is read
+MAX_WORD_LENGTH = 1024 * 1024
+
+
+def tokenize(text):
+    """ Normalizes and splits text into words: punctuation is removed with a
+    precompiled table, then the text is lowercased and split on whitespace,
+    and words longer than MAX_WORD_LENGTH characters are split every
+    MAX_WORD_LENGTH characters
+
+    Parameters
+    ----------
+    text: string
+        string to split into words
+
+    Returns
+    -------
+    tokens: list of strings
+        lowercased words without punctuation, empty words are never included
+    """
+
+    return _split_words(text.translate(PUNCTUATION_TABLE))
+
+
+def iter_token_chunks(chunks):
+    """ Tokenizes consecutive chunks of a text, joining words that are split
+    across chunk boundaries
+
+    Parameters
+    ----------
+    chunks: iterable of strings
+        consecutive pieces of a text
+
+    Returns
+    -------
+    token_chunks: generator of lists of strings
+        tokens of the text, one list per chunk read (lists may be empty)
+    """
+
+    return profiling.iter_stage('tokenize', _iter_token_chunks(chunks),
+                                tokens=len)
+
+
+def last_word_start(text):
+    """ Finds where the last word of a text starts, looking at that word
+    only, so finding it in every chunk of a text takes linear time
+
+    Parameters
+    ----------
+    text: string
+        string to look in
+
+    Returns
+    -------
+    start: int
+        index after the last whitespace of text, 0 if it has none and the
+        length of text if it ends with whitespace
+    """
+
+    if not text or text[-1].isspace():
+        return len(text)
+    return len(text) - len(text.rsplit(None, 1)[-1])
+
+
+def split_long_word(word):
+    """ Splits a word held back between chunks into words of
+    MAX_WORD_LENGTH characters, so a long word is split at the same places
+    wherever the chunks of its text end
+
+    Parameters
+    ----------
+    word: string
+        word without whitespace or punctuation
+
+    Returns
+    -------
+    words: list of strings
+        consecutive MAX_WORD_LENGTH character pieces of word, empty if it is
+        shorter
+    rest: string
+        characters of word after the pieces, still held back
+    """
+
+    end = len(word) - len(word) % MAX_WORD_LENGTH
+    return [word[start:start + MAX_WORD_LENGTH] for start in
+            range(0, end, MAX_WORD_LENGTH)], word[end:]
+
+
+def count_tokens(tokens, word_distribution, word_map, prev_word=None,
+                    words=None):
+    """ Adds a list of tokens to the word frequency and next word maps in
+    bulk
+
+    Parameters
+    ----------
+    tokens: list of strings
+        consecutive normalized words
+    word_distribution: Counter (string: int)
+        word frequencies, updated in place
+    word_map: dictionary (string: dict(string: int))
+        next word frequencies for each word, updated in place
+    prev_word: string, default : None
+        word directly before the first token, if any
+    words: dictionary, default : None
+        word of each token if the tokens are raw tokens, such as
+        byte_tokenizer.DecodedWords, tokens are counted as words if None
+
+    Returns
+    -------
+    last_word: string
+        last word seen, to pass as prev_word for the following tokens (the
+        raw token if words are given)
+    """
+
+    if not tokens:
+        return prev_word
+
+    # long token lists are counted as integer word ids, which avoids hashing
+    # a tuple for every pair
+    if len(tokens) >= ID_COUNT_MIN_TOKENS:
+        _count_token_ids(tokens, word_distribution, word_map, prev_word,
+                            words)
+        return tokens[-1]
+
+    # count words and consecutive word pairs with C level counting, raw 
+    # tokens are counted before they are looked up so each distinct one is 
+    # looked up once
+    if words is None:
+        word_distribution.update(tokens)
+    else:
+        for token, count in Counter(tokens).items():
+            word_distribution[words[token]] += count
+    pairs = zip(tokens, tokens[1:])
+    if prev_word is not None:
+        pairs = chain([(prev_word, tokens[0])], pairs)
+
+    # fold pair counts into the nested next word maps
+    pair_counts = Counter(pairs).items()
+    if words is not None:
+        pair_counts = (((words[word], words[next_word]), count) for
+                        (word, next_word), count in pair_counts)
+    _add_pairs(word_map, pair_counts)
+
+    return tokens[-1]
+
+
+def split_words(text):
+    """ Splits text into words while keeping the whitespace around them so
+    the original layout can be restored
+
+    Parameters
+    ----------
+    text: string
+        string to split
+
+    Returns
+    -------
+    separators: list of strings
+        whitespace before, between and after the words (one more than words)
+    words: list of strings
+        words of the text exactly as they appear in it
+    """
+
+    pieces = SURFACE_PATTERN.split(text)
+    return pieces[0::2], pieces[1::2]
+
+
+def join_words(separators, words, keep=None):
+    """ Rebuilds text from the output of split_words, optionally dropping
+    words. When a word is dropped the whitespace around it is merged, keeping
+    line breaks so the line layout of the text survives
+
+    Parameters
+    ----------
+    separators: list of strings
+        whitespace pieces as returned by split_words
+    words: list of strings
+        words to place between the separators
+    keep: list of bools, default : None
+        whether to keep each word, all words are kept if None
+
+    Returns
+    -------
+    text: string
+        joined text
+    """
+
+    # fast path, interleave separators and words
+    if keep is None:
+        pieces = [None] * (len(separators) + len(words))
+        pieces[0::2] = separators
+        pieces[1::2] = words
+        return ''.join(pieces)
+
+    pieces = []
+    pending = _join_kept(pieces, separators[0], separators[1:], words, keep)
+    pieces.append(pending)
+
+    return ''.join(pieces)
+
+
+def iter_filtered_chunks(chunks, keep_word):
+    """ Drops words from consecutive chunks of a text the way join_words
+    does, without holding the whole text in memory
+
+    Parameters
+    ----------
+    chunks: iterable of strings
+        consecutive pieces of a text
+    keep_word: function (string: bool)
+        whether to keep a word, called with each word as it appears
+
+    Returns
+    -------
+    filtered_chunks: generator of strings
+        pieces of the filtered text, joined they equal join_words applied to
+        the whole text
+    """
+
+    batches = ((separators, words, list(map(keep_word, words)))
+                for separators, words in iter_word_batches(chunks))
+    return iter_joined_batches(batches)
+
+
+def iter_word_batches(chunks):
+    """ Splits consecutive chunks of a text into words and the whitespace
+    around them, like split_words applied to the whole text
+
+    Parameters
+    ----------
+    chunks: iterable of strings
+        consecutive pieces of a text
+
+    Returns
+    -------
+    batches: generator of tuples (list of strings, list of strings)
+        separators and words of consecutive parts of the text, one more
+        separator than words in each batch; only the first batch starts with
+        whitespace (the others start with an empty separator) and the last
+        separator of every batch is complete
+    """
+
+    # last word of the text read so far and what follows it, in pieces so
+    # a long word or whitespace is not copied again for every chunk
+    carry = []
+    carry_word = False  # whether the carry ends in its word
+    for chunk in chunks:
+        # hold back the last word, since it may continue in the next chunk
+        # and the whitespace after it is not complete yet; only the chunk
+        # is searched, the carry holds no other word
+        if not chunk:
+            continue
+        words_end = len(chunk.rstrip())
+        cut = last_word_start(chunk[:words_end])
+        if not words_end or (carry_word and not cut):
+            # whitespace only, or more of the carried word
+            carry.append(chunk)
+        else:
+            if cut or carry:
+                yield split_words(''.join(carry) + chunk[:cut])
+            carry = [chunk[cut:]]
+        carry_word = words_end == len(chunk)
+
+    # the held back piece ends the text
+    yield split_words(''.join(carry))
+
+
+def iter_joined_batches(batches):
+    """ Rebuilds text from batches of iter_word_batches, dropping words the
+    way join_words does
+
+    Parameters
+    ----------
+    batches: iterable of tuples (list of strings, list of strings, list)
+        separators, words and keep flags of consecutive parts of the text,
+        keep may be None to keep all words of a batch
+
+    Returns
+    -------
+    chunks: generator of strings
+        consecutive pieces of the joined text
+    """
+
+    pending = None  # whitespace waiting to be written
+    for separators, words, keep in batches:
+        if pending is None:
+            pending = separators[0]
+        if keep is None:
+            keep = [True] * len(words)
+        pieces = []
+        pending = _join_kept(pieces, pending, separators[1:], words, keep)
+        yield ''.join(pieces)
+
+    if pending:
+        yield pending
+
+
+def _join_kept(pieces, pending, separators, words, keep):
+    # appends kept words and the whitespace before them to pieces, returns
+    # the whitespace still waiting to be written
+    for word, kept, separator in zip(words, keep, separators):
+        if kept:
+            pieces.append(pending)
+            pieces.append(word)
+            pending = separator
+        elif '\n' not in pending and ('\n' in separator or not separator):
+            # prefer a line break, and drop whitespace at the end of the text
+            pending = separator
+    return pending
+
+
+def _count_token_ids(tokens, word_distribution, word_map, prev_word, words):
+    # counts tokens as integer ids numbered in order of first appearance and
+    # pairs as single integers, see count_tokens
+    import numpy as np
+
+    ids = _TokenIds()
+    token_ids = np.fromiter(map(ids.__getitem__, tokens), np.intp,
+                            len(tokens))
+    distinct = list(ids)
+    if words is not None:
+        distinct = [words[token] for token in distinct]
+    for word, count in zip(distinct, np.bincount(token_ids).tolist()):
+        word_distribution[word] += count
+
+    # pairs are folded in order of first appearance, as from a Counter
+    if prev_word is not None:
+        if words is not None:
+            prev_word = words[prev_word]
+        _add_pairs(word_map, [((prev_word, distinct[0]), 1)])
+
+    # each pair is one integer, sorted together with its position when both
+    # fit in 64 bits so the first position of every distinct pair starts its
+    # run, otherwise with a slower stable sort
+    size = len(distinct)
+    length = len(token_ids) - 1
+    keys = token_ids[:-1] * size + token_ids[1:]
+    if size * size * length < 2 ** 63:
+        pairs = np.sort(keys * length + np.arange(length))
+        keys = pairs // length
+        starts = np.flatnonzero(np.diff(keys, prepend=-1))
+        keys, first = keys[starts], pairs[starts] % length
+        counts = np.diff(starts, append=length)
+    else:
+        keys, first, counts = np.unique(keys, return_index=True,
+                                        return_counts=True)
+    order = np.argsort(first)
+    word_ids, next_ids = np.divmod(keys[order], size)
+    _add_pairs(word_map, (((distinct[word], distinct[next_word]), count)
+                            for word, next_word, count in
+                            zip(word_ids.tolist(), next_ids.tolist(),
+                                counts[order].tolist())))
+
+
+def _add_pairs(word_map, pair_counts):
+    # folds counts of (word, next word) pairs into the nested next word maps
+    for (word, next_word), count in pair_counts:
+        next_words = word_map.get(word)
+        if next_words is None:
+            word_map[word] = {next_word: count}
+        else:
+            next_words[next_word] = next_words.get(next_word, 0) + count
+
+
+class _TokenIds(dict):
+    # numbers tokens in order of first appearance as they are looked up
+    def __missing__(self, token):
+        index = self[token] = len(self)
+        return index
+
+
+def _split_words(text):
+    # lowercased words of text without punctuation, see tokenize
+    words = text.lower().split()
+
+    # other words take at least two characters each with their whitespace,
+    # so most texts cannot hold a word longer than MAX_WORD_LENGTH
+    if len(text) - 2 * len(words) + 2 > MAX_WORD_LENGTH:
+        words = []
+        for word in text.split():
+            pieces, rest = split_long_word(word)
+            words.extend(piece.lower() for piece in pieces + [rest] if piece)
+    return words
+
+
+def _iter_token_chunks(chunks):
+    # tokens of consecutive chunks, see iter_token_chunks
+    carry = []       # pieces of the unfinished last word
+    carry_size = 0
+    for chunk in chunks:
+        chunk = chunk.translate(PUNCTUATION_TABLE)
+
+        # hold back everything after the last whitespace since the word may
+        # continue in the next chunk
+        cut = last_word_start(chunk)
+        tokens = []
+        if cut:
+            tokens = _split_words(''.join(carry) + chunk[:cut])
+            carry = []
+            carry_size = 0
+        if cut < len(chunk):
+            carry.append(chunk[cut:])
+            carry_size += len(chunk) - cut
+
+        # a word too long to hold back is counted in pieces
+        if carry_size >= MAX_WORD_LENGTH:
+            words, rest = split_long_word(''.join(carry))
+            tokens.extend(word.lower() for word in words)
+            carry = [rest] if rest else []
+            carry_size = len(rest)
+
+        yield tokens
+
+    # the held back piece is the final word of the text
+    if carry:
+        yield [''.join(carry).lower()]
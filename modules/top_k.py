@@ -0,0 +1,107 @@
+import heapq
+from itertools import count
+from operator import neg
+
+# global constants
+TOP_K = 100                                     # words shown in charts
+TIE_BREAKS = ('last', 'first', 'alphabetical')  # supported tie breaking
+HEAP_MIN_COUNTS = 10000   # fewest counts selected with a heap, not a sort
+
+
+def top_k_items(counts, k=TOP_K, tie_break='last'):
+    """ Selects the k largest counts with a bounded heap in O(n log k)
+    instead of sorting all counts, or with a sort when there are fewer than
+    HEAP_MIN_COUNTS counts since that is faster for them
+
+    Parameters
+    ----------
+    counts: dictionary (string: int)
+        frequency of each word, a mapping with its own top_k_items method
+        (such as a CompactWordModel view) selects with that instead
+    k: int, default : TOP_K
+        number of items to select
+    tie_break: string, default : 'last'
+        which words win among equal counts: 'last' prefers words added to
+        counts later (the order a stable ascending sort gives), 'first'
+        prefers words added earlier, 'alphabetical' prefers words that sort
+        first
+
+    Returns
+    -------
+    items: list of tuples (string, int)
+        up to k words and their counts, most frequent first
+    """
+
+    if tie_break not in TIE_BREAKS:
+        raise ValueError('tie_break must be one of ' + ', '.join(TIE_BREAKS))
+    if k <= 0:
+        return []
+
+    # mappings that store counts in arrays select without a heap
+    select = getattr(counts, 'top_k_items', None)
+    if select is not None:
+        return select(k, tie_break)
+
+    # fewer counts, like most next word counts, are sorted whole by the
+    # stable sort, which ties are broken by
+    if len(counts) < HEAP_MIN_COUNTS:
+        if tie_break == 'last':
+            words = reversed(sorted(counts, key=counts.get)[-k:])
+        elif tie_break == 'first':
+            words = sorted(counts, key=counts.get, reverse=True)[:k]
+        else:
+            words = sorted(sorted(counts), key=counts.get, reverse=True)[:k]
+        return [(word, counts[word]) for word in words]
+
+    # compare plain tuples so the heap never calls back into Python
+    if tie_break == 'alphabetical':
+        top = heapq.nsmallest(k, zip(map(neg, counts.values()), counts))
+        return [(word, -value) for value, word in top]
+
+    words = list(counts)
+    positions = count() if tie_break == 'last' else count(0, -1)
+    top = heapq.nlargest(k, zip(counts.values(), positions))
+    return [(words[abs(position)], value) for value, position in top]
+
+
+def top_k_indices(values, k=TOP_K, tie_break='last'):
+    """ Selects the positions of the k largest values of a NumPy array with
+    np.argpartition in O(n) plus O(k log k) for ordering the result
+
+    Parameters
+    ----------
+    values: numpy array
+        counts indexed by word ID
+    k: int, default : TOP_K
+        number of positions to select
+    tie_break: string, default : 'last'
+        'last' prefers higher positions among equal values, 'first' lower
+        ones ('alphabetical' is handled by the caller, which knows the words)
+
+    Returns
+    -------
+    indices: numpy array of int64
+        up to k positions, largest value first
+    """
+
+    import numpy as np
+
+    if k <= 0 or len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(values):
+        # everything above the k-th largest value is selected, values equal
+        # to it fill the remaining places in tie break order
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        above = np.flatnonzero(values > threshold)
+        equal = np.flatnonzero(values == threshold)
+        remaining = k - len(above)
+        equal = equal[-remaining:] if tie_break == 'last' else \
+            equal[:remaining]
+        candidates = np.concatenate((above, equal))
+    else:
+        candidates = np.arange(len(values))
+
+    # order by value, breaking ties by position
+    positions = candidates if tie_break == 'last' else -candidates
+    order = np.lexsort((positions, values[candidates]))[::-1]
+    return candidates[order]
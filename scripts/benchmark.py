@@ -0,0 +1,446 @@
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from optparse import OptionParser
+# for running from base project directory, change to ../ as needed
+sys.path.append('.')
+sys.path.append('./modules')
+from modules import text_utilities
+import profiling
+from stopword_filter import StopwordFilter
+from top_k import top_k_items
+
+# global constants
+MB = 1024 * 1024                # bytes in a megabyte
+MAX_SIZE = 1024                 # largest corpus size in MB
+SEED = 18                       # seed of the generated corpora
+LINE_WORDS = 12                 # words per generated line
+THRESHOLD = 1.2                 # time ratio to a baseline counted as slower
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), 'text_utilities_benchmark')
+ROW = '{:<28} {:>8} {:>9} {:>9} {:>9} {:>9} {:>10}'  # result table layout
+IMPORTS = ['text_utilities', 'scripts.interface']  # modules timed on import
+
+
+def main():
+    """ Times every text_utilities entry point on generated corpora of
+    growing size and the import of the entry modules, records throughput
+    and peak memory in a JSON file and compares it against a saved baseline
+
+    Each measurement runs in a new process, so caches filled by one
+    benchmark never speed up another and the peak memory is that of the
+    benchmark alone. The time per megabyte relative to the smallest corpus
+    shows how a benchmark scales, near 1.0 when it is linear.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None (exits with status 1 if a benchmark is slower than the baseline)
+    """
+
+    parser = OptionParser()
+    parser.add_option('-i', '--infile', action='store', default='EpIV.txt',
+                        dest='infile', help='text whose words and word ' +
+                            'frequencies seed the corpora')
+    parser.add_option('--sizes', action='store', default='1,10,100',
+                        dest='sizes', help='comma separated corpus sizes ' +
+                            'in MB, from 1 up to ' + str(MAX_SIZE))
+    parser.add_option('--only', action='store', default=None, dest='only',
+                        help='comma separated benchmarks to run, all if ' +
+                            'not given: ' + ', '.join(BENCHMARKS))
+    parser.add_option('--repeat', action='store', type='int', default=1,
+                        dest='repeat', help='runs of each benchmark, the ' +
+                            'fastest is kept')
+    parser.add_option('--stopwords', action='store', default=None,
+                        dest='stopwords', help='file with one stopword per ' +
+                            'line, NLTK English stopwords if not given')
+    parser.add_option('--corpus-dir', action='store', default=CORPUS_DIR,
+                        dest='corpus_dir', help='directory to keep the ' +
+                            'generated corpora in between runs')
+    parser.add_option('-o', '--outfile', action='store',
+                        default='benchmark_results.json', dest='outfile',
+                        help='JSON file to write the results to')
+    parser.add_option('--baseline', action='store', default=None,
+                        dest='baseline', help='JSON results of an earlier ' +
+                            'run to compare against')
+    parser.add_option('--threshold', action='store', type='float',
+                        default=THRESHOLD, dest='threshold', help='time ' +
+                            'ratio to the baseline reported as a regression')
+    (options, args) = parser.parse_args()
+
+    sizes = [int(size) for size in options.sizes.split(',')]
+    if not all(1 <= size <= MAX_SIZE for size in sizes):
+        print('corpus sizes must be from 1 up to {} MB'.format(MAX_SIZE))
+        exit()
+    names = list(BENCHMARKS)
+    if options.only is not None:
+        names = options.only.split(',')
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            print('unknown benchmarks: ' + ', '.join(unknown))
+            exit()
+
+    # corpora are generated once and reused by later runs
+    os.makedirs(options.corpus_dir, exist_ok=True)
+    words, weights = read_vocabulary(options.infile)
+
+    baseline = {}
+    baseline_imports = {}
+    if options.baseline is not None:
+        with open(options.baseline) as f:
+            saved = json.load(f)
+        baseline = {(result['benchmark'], result['size_mb']): result
+                    for result in saved['results']}
+        baseline_imports = saved.get('imports', {})
+
+    print(ROW.format('benchmark', 'MB', 'seconds', 'MB/s', 'peak MB',
+                        'relative', 'baseline'))
+    results = []
+    regressions = []
+
+    # a slow import delays every command, whatever the size of its input
+    imports = {}
+    for module in IMPORTS:
+        imports[module] = time_import(module, options.repeat)
+        ratio = ''
+        if module in baseline_imports:
+            import_ratio = imports[module] / baseline_imports[module]
+            ratio = '{:.2f}'.format(import_ratio)
+            if import_ratio > options.threshold:
+                regressions.append(module)
+                ratio += ' !'
+        print(ROW.format('import ' + module, '',
+                            '{:.3f}'.format(imports[module]), '', '', '',
+                            ratio))
+
+    for size in sizes:
+        corpus = os.path.join(options.corpus_dir,
+                                'corpus-{}mb-{}.txt'.format(size, SEED))
+        if not os.path.exists(corpus) or os.path.getsize(corpus) != size * MB:
+            make_corpus(corpus, size * MB, words, weights, SEED)
+
+        for name in names:
+            result = run_benchmark(name, corpus, size, options)
+            results.append(result)
+            if 'error' in result:
+                print('{:<28} {:>8} {:.40}'.format(name, size,
+                                            ' '.join(word for word in
+                                                result['error'].split()
+                                                if word.strip('*'))))
+                continue
+
+            # time per megabyte relative to the smallest corpus the
+            # benchmark ran on without an error
+            first = next(r for r in results if r['benchmark'] == name and
+                            'error' not in r)
+            result['relative'] = (result['seconds'] / size) / \
+                                    (first['seconds'] / first['size_mb'])
+
+            ratio = ''
+            old = baseline.get((name, size))
+            if old is not None and 'seconds' in old:
+                result['baseline_ratio'] = result['seconds'] / old['seconds']
+                ratio = '{:.2f}'.format(result['baseline_ratio'])
+                if result['baseline_ratio'] > options.threshold:
+                    regressions.append(result)
+                    ratio += ' !'
+
+            peak = ''
+            if result['peak_mb'] is not None:
+                peak = '{:.1f}'.format(result['peak_mb'])
+            print(ROW.format(name, size, '{:.3f}'.format(result['seconds']),
+                                '{:.1f}'.format(result['mb_per_s']), peak,
+                                '{:.2f}'.format(result['relative']), ratio))
+
+    with open(options.outfile, 'w') as f:
+        json.dump({'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'cpu_count': os.cpu_count(),
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'seed': SEED,
+                    'imports': imports,
+                    'results': results}, f, indent=2)
+    print('results written to ' + options.outfile)
+
+    if regressions:
+        print('{} benchmarks slower than the baseline by more than {:.0%}'
+                .format(len(regressions), options.threshold - 1))
+        exit(1)
+
+
+def read_vocabulary(filename):
+    """ Reads the words of a text as they appear in it, with punctuation
+    and capitals, and how often each appears
+
+    Parameters
+    ----------
+    filename: string
+        path to the seed text
+
+    Returns
+    -------
+    words: list of strings
+        distinct words of the text
+    weights: list of ints
+        frequency of each word
+    """
+
+    frequencies = Counter(text_utilities.read_file(filename).split())
+    return list(frequencies), list(frequencies.values())
+
+
+def make_corpus(path, size, words, weights, seed=SEED):
+    """ Writes a corpus of words drawn at random by their frequency in the
+    seed text, in lines of LINE_WORDS words
+
+    Parameters
+    ----------
+    path: string
+        path of the corpus file
+    size: int
+        size of the corpus in bytes
+    words: list of strings
+        words to draw from
+    weights: list of ints
+        frequency of each word
+    seed: int, default : SEED
+        seed of the random draws, the same seed gives the same corpus
+
+    Returns
+    -------
+    None
+    """
+
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        while written < size:
+            drawn = rng.choices(words, weights, k=LINE_WORDS * 1000)
+            lines = '\n'.join(' '.join(drawn[start:start + LINE_WORDS])
+                                for start in range(0, len(drawn),
+                                                    LINE_WORDS)) + '\n'
+            block = lines.encode('utf-8')[:size - written]
+            f.write(block.decode('utf-8', 'ignore'))
+            written += len(block)
+
+
+def time_import(module, repeat=1):
+    """ Times the import of a module in new interpreters, as reported by
+    python -X importtime
+
+    Parameters
+    ----------
+    module: string
+        name of the module, importable from the base project directory
+    repeat: int, default : 1
+        imports timed, the fastest is kept
+
+    Returns
+    -------
+    seconds: float
+        time the import took, including the modules it imported
+    """
+
+    code = 'import sys; sys.path.append("modules"); import ' + module
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                    code], capture_output=True, text=True,
+                                check=True)
+        times += [int(line.split('|')[1]) for line in
+                    result.stderr.splitlines()
+                    if line.rstrip().endswith('| ' + module)]
+    return min(times) / 1e6
+
+
+def run_benchmark(name, corpus, size, options):
+    """ Runs a benchmark on a corpus, each repeat in a new process
+
+    Parameters
+    ----------
+    name: string
+        name of the benchmark, from BENCHMARKS
+    corpus: string
+        path to the corpus
+    size: int
+        size of the corpus in MB
+    options: optparse Values
+        parsed command line options
+
+    Returns
+    -------
+    result: dictionary
+        benchmark, size_mb and either the fastest seconds, mb_per_s and the
+        largest peak_mb (None where it cannot be read), or the error that
+        stopped the benchmark
+    """
+
+    result = {'benchmark': name, 'size_mb': size}
+    seconds = []
+    peaks = []
+    context = multiprocessing.get_context('spawn')
+    for _ in range(options.repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            try:
+                run_seconds, peak = pool.submit(measure, name, corpus,
+                                    options.stopwords).result()
+            except Exception as err:
+                result['error'] = '{}: {}'.format(type(err).__name__, err)
+                return result
+        seconds.append(run_seconds)
+        peaks.append(peak)
+
+    result['seconds'] = min(seconds)
+    result['mb_per_s'] = size / result['seconds']
+    result['peak_mb'] = None if None in peaks else max(peaks)
+    return result
+
+
+def measure(name, corpus, stopwords=None):
+    """ Sets up and times one benchmark, run inside a worker process
+
+    Parameters
+    ----------
+    name: string
+        name of the benchmark, from BENCHMARKS
+    corpus: string
+        path to the corpus
+    stopwords: string, default : None
+        file with one stopword per line, NLTK English stopwords if None
+
+    Returns
+    -------
+    seconds: float
+        time the benchmark took, without its setup
+    peak_mb: float
+        peak resident memory of the process in MB, including the setup,
+        None where it cannot be read
+    """
+
+    stopword_filter = None
+    if stopwords is not None:
+        with open(stopwords) as f:
+            stopword_filter = StopwordFilter(f.read().split())
+
+    with tempfile.TemporaryDirectory() as scratch:
+        run = BENCHMARKS[name](corpus, os.path.join(scratch, 'out.txt'),
+                                stopword_filter)
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+
+    return seconds, profiling.peak_rss_mb()
+
+
+# each benchmark sets up what it needs outside the timed part and returns
+# a function to time, taking the corpus, an output file and an optional
+# stopword filter
+
+def gen_word_maps(corpus, outfile, stopword_filter):
+    text = text_utilities.read_file(corpus)
+    return lambda: text_utilities.gen_word_maps(text)
+
+
+def gen_maps_from_file(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.gen_maps_from_file(corpus)
+
+
+def gen_maps_compact(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.gen_maps_from_file(corpus, compact=True)
+
+
+def gen_maps_mmap(corpus, outfile, stopword_filter):
+    reader = text_utilities.FileReader('mmap', 'utf-8')
+    return lambda: text_utilities.gen_maps_from_file(corpus, reader=reader)
+
+
+def get_word_count(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.get_word_count(corpus)
+
+
+def get_word_count_compat(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.get_word_count(corpus, compat=True)
+
+
+def remove_stopwords(corpus, outfile, stopword_filter):
+    text = text_utilities.read_file(corpus)
+    stopword_filter = stopword_filter or StopwordFilter()
+    return lambda: text_utilities.remove_stopwords(text, stopword_filter)
+
+
+def remove_stopwords_from_file(corpus, outfile, stopword_filter):
+    stopword_filter = stopword_filter or StopwordFilter()
+    return lambda: text_utilities.remove_stopwords_from_file(corpus, outfile,
+                                                            stopword_filter)
+
+
+def stem_words(corpus, outfile, stopword_filter):
+    text = text_utilities.read_file(corpus)
+    return lambda: text_utilities.stem_words(text)
+
+
+def stem_file(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.stem_file(corpus, outfile)
+
+
+def replace_word(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.replace_word(corpus, outfile, 'the', 'a')
+
+
+def gen_sentence(corpus, outfile, stopword_filter):
+    return lambda: text_utilities.gen_sentence(corpus, 20)
+
+
+def top_k(corpus, outfile, stopword_filter):
+    word_distribution, word_map = text_utilities.gen_maps_from_file(corpus)
+
+    def run():
+        top_k_items(word_distribution, text_utilities.TOP_K)
+        top_k_items(word_distribution, text_utilities.TOP_K, 'alphabetical')
+        for next_words in word_map.values():
+            top_k_items(next_words, text_utilities.TOP_K)
+
+    return run
+
+
+def top_k_sort(corpus, outfile, stopword_filter):
+    # the selection top_k_items replaced, sorting every word, to compare
+    # top_k against
+    word_distribution, word_map = text_utilities.gen_maps_from_file(corpus)
+
+    def select(counts):
+        keys_sorted = sorted(counts, key=counts.get)
+        return [(key, counts[key]) for key in
+                reversed(keys_sorted[-text_utilities.TOP_K:])]
+
+    def run():
+        select(word_distribution)
+        sorted(word_distribution.items(), key=lambda item: (-item[1],
+                                                            item[0]))
+        for next_words in word_map.values():
+            select(next_words)
+
+    return run
+
+
+# benchmarks by name, in the order they run
+BENCHMARKS = {benchmark.__name__: benchmark for benchmark in [
+    gen_word_maps, gen_maps_from_file, gen_maps_compact, gen_maps_mmap,
+    get_word_count, get_word_count_compat, remove_stopwords,
+    remove_stopwords_from_file, stem_words, stem_file, replace_word,
+    gen_sentence, top_k, top_k_sort]}
+
+
+# runs main when script called from terminal
+if __name__ == '__main__':
+    main()
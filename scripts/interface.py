@@ -1,11 +1,30 @@
+import contextlib
+import io
+import json
+import os
 import sys
 # for running from base project directory, change to ../ as needed
 sys.path.append('.') 
+sys.path.append('./modules')
 from modules import text_utilities
 from modules.command_line_parser import create_argument_parser
+import charts
+import profiling
 
 # global constants
 TEMPLATE = 'usage: python script.py {commands}' # base for command usage 
+# actions a batch can run, named like their option destinations
+ACTIONS = ['count', 'distribution', 'remove_stopwords', 'stem_file', 
+            'preprocess_file', 'distribution_processed', 'sentence', 
+            'word_map_distri', 'replace']
+# actions that are computed from the word maps of a file
+MAP_ACTIONS = ['count', 'distribution', 'sentence', 'word_map_distri']
+# actions that can follow longer contexts with an n-gram model
+NGRAM_ACTIONS = ['sentence', 'word_map_distri']
+# actions that draw a chart
+CHART_ACTIONS = ['distribution', 'distribution_processed', 'word_map_distri']
+# actions that can use counts estimated in bounded memory
+APPROXIMATE_ACTIONS = ['count', 'distribution', 'word_map_distri']
 
 
 def main():
@@ -26,13 +45,75 @@ def main():
     # pulling arguments from argv and setting up options object
     (options, args) = parser.parse_args()
 
+    if not options.profile:
+        run_command(options, args)
+        return
+
+    # time every stage of the run and report them once it ends, also when 
+    # the run exits early
+    with profiling.Profiler() as profiler:
+        try:
+            run_command(options, args)
+        finally:
+            print(profiling.format_report(profiler.report(), 
+                                            options.profile_format), 
+                    file=sys.stderr)
+
+
+def run_command(options, args):
+    """ Runs the action chosen on the command line
+
+    Parameters
+    ----------
+    options: optparse Values
+        parsed command line options
+    args: list of strings
+        further command line arguments, the files served with --serve
+
+    Returns
+    -------
+    None
+    """
+
     # method arguments initialization
     infile = options.infile
     outfile = options.outfile
     word = options.word
     sentence_length = options.sentence_length
     word_to_replace = options.word_to_replace
+    replace_map = options.replace_map
+    whole_word = options.whole_word
+    compact = options.compact
+    workers = options.workers
+    sample = options.sample
+    seed = options.seed
+    top = options.top
+    tie_break = options.tie_break
+    memory = approximate_memory(vars(options))
+    max_reads = options.max_reads
+
+    # on-disk cache of word maps and counts, unless disabled
+    cache = None
+    if not options.no_cache:
+        cache = text_utilities.MapCache(options.cache_dir, 
+                                        options.cache_size * 1024 * 1024)
     
+    # how input files are read and decoded
+    try:
+        reader = make_reader(vars(options))
+    except (ValueError, LookupError) as err:
+        print(err)
+        return
+
+    # charts are saved in the format of the chart file extension
+    chart_out = options.chart_out
+    if chart_out is not None:
+        try:
+            charts.chart_format(chart_out)
+        except ValueError as err:
+            print(err)
+            return
+
     # function declaration conditional initialization
     count = options.count
     distribution = options.distribution
@@ -44,54 +125,165 @@ def main():
     word_map_distribution = options.word_map_distri
     replace = options.replace
 
+    # keep word maps in memory and answer queries, or ask the server
+    if options.serve:
+        try:
+            check_for_errors(infile)
+        except Exception:
+            print(TEMPLATE.format(commands = '--serve -i <infile> [infiles]'))
+            return
+        serve([infile] + args, options.port, compact, cache, workers, reader)
+        return
+
+    if options.query:
+        try:
+            check_for_errors(infile)
+            query(infile, options)
+        except (OSError, LookupError) as err:
+            print(err)
+        except Exception:
+            print(TEMPLATE.format(commands = '--query -i <infile> ' + 
+                                            '-c | -d | -s | --dn -w <word>'))
+        return
+
+    # keep the word maps of a growing file up to date and print results
+    if options.follow:
+        try:
+            check_for_errors(infile)
+            follow(infile, options, cache, reader)
+        except Exception:
+            print(TEMPLATE.format(commands = '--follow -i <infile> -c | -s'))
+        return
+
+    # write the word maps of the input file to a binary file
+    if options.export is not None:
+        try:
+            check_for_errors(infile)
+            text_utilities.export_word_maps(infile, options.export, cache, 
+                                            workers, reader)
+        except Exception:
+            print(TEMPLATE.format(commands = '--export <mapsfile> -i <infile>'))
+        return
+
+    # run the jobs of a JSON job file, or every chosen action on the input
+    # file, building the word maps of each file only once
+    if options.jobs is not None:
+        try:
+            with open(options.jobs) as f:
+                jobs = json.load(f)
+        except (OSError, ValueError) as err:
+            print(err)
+            return
+        print(json.dumps(run_jobs(jobs, vars(options), cache), indent=2))
+        return
+
+    if options.batch:
+        actions = [action for action in ACTIONS if getattr(options, action)]
+        try:
+            check_for_errors(infile)
+            results = run_actions(infile, actions, vars(options), cache)
+        except Exception:
+            print(TEMPLATE.format(commands = '--batch -i <infile> ' + 
+                                            '<action flags>'))
+            return
+        for result in results:
+            if result['action'] == 'replace':
+                for replaced_word, hit_count in result['result'].items():
+                    print(replaced_word + '\t' + str(hit_count))
+            elif isinstance(result['result'], dict):
+                print(json.dumps(result['result'], indent=2))
+            elif result['result'] is not None:
+                print(result['result'])
+        return
+
+    # use exported word maps instead of the input file, or build the word 
+    # maps of a file that only grew since they were cached from the 
+    # appended text
+    maps = None
+    try:
+        if options.maps is not None:
+            maps = text_utilities.load_word_maps(options.maps)
+            if infile is None:
+                infile = options.maps
+        elif options.incremental and memory is None and infile is not None \
+                and (count or distribution or sentence or 
+                word_map_distribution):
+            maps = text_utilities.update_maps_from_file(infile, cache, reader)
+        elif max_reads is not None and memory is None and infile is not None \
+                and options.order <= 2 and (distribution or sentence or 
+                word_map_distribution):
+            # read the files of a directory or glob pattern several at a time
+            maps = text_utilities.gen_maps_from_file(infile, compact=compact, 
+                                    cache=cache, workers=workers, 
+                                    reader=reader, max_reads=max_reads)
+    except (OSError, ValueError, LookupError) as err:
+        print(err)
+        return
+
     # check for function flags and variable initialization
     # call chosen function based on desired text parsing action
     if count:
         try:
             check_for_errors(infile)
-            print(text_utilities.get_word_count(infile))
+            if memory is not None:
+                # estimated frequency of the word with its error bounds
+                words = [word] if word is not None else []
+                print(json.dumps(text_utilities.get_word_estimates(infile, 
+                                    words, memory, cache, reader), indent=2))
+            else:
+                print(text_utilities.get_word_count(infile, cache, workers, 
+                                                    maps, options.compat, 
+                                                    max_reads))
         except Exception:
             print(TEMPLATE.format(commands = '-c -i <infile>'))
 
     elif distribution:
         try:
             check_for_errors(infile)
-            text_utilities.show_word_frequencies(infile)
+            text_utilities.show_word_frequencies(infile, compact, cache, 
+                                                workers, top, tie_break, 
+                                                maps, reader, chart_out, 
+                                                None, memory)
         except Exception:
             print(TEMPLATE.format(commands = '-d -i <infile>'))
 
     elif remove_stopwords:
         try:
             check_for_errors(infile, outfile)
-            text_utilities.remove_stopwords_from_file(infile, outfile)
+            text_utilities.remove_stopwords_from_file(infile, outfile, 
+                                                        max_reads=max_reads)
         except Exception:
             print(TEMPLATE.format(commands = '--rs -i <infile> -o <outfile>'))
 
     elif stem_file:
         try:
             check_for_errors(infile, outfile)
-            text_utilities.stem_file(infile, outfile)
+            text_utilities.stem_file(infile, outfile, max_reads)
         except Exception:
             print(TEMPLATE.format(commands = '--sf -i <infile> -o <outfile>'))
 
     elif preprocess_file:
         try:
             check_for_errors(infile, outfile)
-            text_utilities.preprocess_file(infile, outfile)
+            text_utilities.preprocess_file(infile, outfile, max_reads)
         except Exception:
             print(TEMPLATE.format(commands = '-p -i <infile> -o <outfile>'))
 
     elif distribution_processed:
         try:
             check_for_errors(infile)
-            text_utilities.show_preprocessed_distribution(infile)
+            text_utilities.show_preprocessed_distribution(infile, top, 
+                                                    tie_break, chart_out)
         except Exception:
             print(TEMPLATE.format(commands = '--dp -i <infile>'))
 
     elif sentence:
         try:
             check_for_errors(infile, sentence_length)
-            print(text_utilities.gen_sentence(infile, sentence_length))
+            model = make_model(infile, vars(options), cache, reader)
+            print(text_utilities.gen_sentence(infile, sentence_length, 
+                                compact, cache, workers, sample, seed, 
+                                maps, reader, options.order, model))
         except Exception:
             print(TEMPLATE.format(commands = '-s -i <infile> -l ' + 
                                             '<sentence_length>'))
@@ -99,22 +291,504 @@ def main():
     elif word_map_distribution:
         try:
             check_for_errors(infile, word)
-            text_utilities.show_next_word_distribution(infile, word)
+            model = make_model(infile, vars(options), cache, reader)
+            text_utilities.show_next_word_distribution(infile, word, 
+                                compact, cache, workers, top, tie_break, 
+                                maps, reader, chart_out, None, 
+                                options.order, model, memory)
         except Exception:
             print(TEMPLATE.format(commands = '--dn -i <infile> -w <word>'))
 
     elif replace:
         try:
-            check_for_errors(infile, outfile, word_to_replace, word)
-            text_utilities.replace_word(infile, outfile, word_to_replace, word)
+            if replace_map is not None:
+                # bulk replacement, report how often each word was replaced
+                check_for_errors(infile, outfile)
+                hits = text_utilities.replace_words(infile, outfile, 
+                                                replace_map, whole_word)
+                for replaced_word, hit_count in hits.items():
+                    print(replaced_word + '\t' + str(hit_count))
+            else:
+                check_for_errors(infile, outfile, word_to_replace, word)
+                text_utilities.replace_word(infile, outfile, word_to_replace, 
+                                            word, whole_word)
         except Exception:
             print(TEMPLATE.format(commands = '-u -i <infile> -o <outfile> ' +
-                                            '-r <word_to_replace> -w <word>'))
+                                            '-r <word_to_replace> -w <word>' +
+                                            ' | --replace-map <mapfile>'))
 
     else:
         print('no valid flag entered for function option')
 
 
+def serve(infiles, port, compact=False, cache=None, workers=None, 
+            reader=None):
+    """ Loads the word maps of files and answers queries about them until 
+    interrupted
+
+    Parameters
+    ----------
+    infiles: list of strings
+        paths to input files, directories or glob patterns, each served as 
+        one corpus named by its path
+    port: int
+        localhost port to listen on
+    compact: bool, default : False
+        keep the word maps as CompactWordModels
+    cache: MapCache, default : None
+        on-disk cache to reuse word maps from
+    workers: int, default : None
+        number of worker processes, see gen_maps_from_file
+    reader: FileReader, default : None
+        how the files are read, see gen_maps_from_file
+
+    Returns
+    -------
+    None
+    """
+
+    corpora = {}
+    for infile in infiles:
+        corpora[infile] = text_utilities.gen_maps_from_file(infile, 
+                            compact=compact, cache=cache, workers=workers, 
+                            reader=reader)
+
+    # the HTTP modules are only needed by the server and the client
+    from query_server import QueryServer
+
+    server = QueryServer(corpora, port=port)
+    print('serving {} on http://{}:{}'.format(', '.join(corpora), 
+                                                *server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def follow(infile, options, cache=None, reader=None):
+    """ Prints the word count or a generated sentence of a file whenever 
+    text is appended to it, until interrupted
+
+    Parameters
+    ----------
+    infile: string
+        path to input file
+    options: optparse Values
+        parsed command line options, with the chosen action
+    cache: MapCache, default : None
+        on-disk cache to keep the word maps of the file in
+    reader: FileReader, default : None
+        how the file is read, see follow_file
+
+    Returns
+    -------
+    None
+    """
+
+    if not options.count and not options.sentence:
+        raise ValueError('only the count and sentence can be followed')
+
+    def show(maps):
+        if options.count:
+            print(text_utilities.get_word_count(infile, maps=maps))
+        if options.sentence and maps[0] is not None:
+            print(text_utilities.gen_sentence(infile, 
+                        options.sentence_length, sample=options.sample, 
+                        seed=options.seed, maps=maps))
+        sys.stdout.flush()
+
+    try:
+        text_utilities.follow_file(infile, show, options.interval, cache, 
+                                    reader)
+    except KeyboardInterrupt:
+        pass
+
+
+def query(infile, options):
+    """ Asks the query server for the result of the chosen action and 
+    prints it
+
+    Parameters
+    ----------
+    infile: string
+        name of the corpus, the path it was served with
+    options: optparse Values
+        command line options with the chosen action
+
+    Returns
+    -------
+    None
+    """
+
+    # the HTTP client is only needed when querying
+    from query_server import QueryClient
+
+    client = QueryClient(port=options.port)
+    if options.count:
+        print(client.query('/count', corpus=infile)['count'])
+    elif options.distribution:
+        top = client.query('/top', corpus=infile, k=options.top, 
+                            tie_break=options.tie_break)['top']
+        for word, frequency in top:
+            print(word + '\t' + str(frequency))
+    elif options.sentence:
+        print(client.query('/sentence', corpus=infile, 
+                            length=options.sentence_length, 
+                            sample=int(options.sample), 
+                            seed=options.seed)['sentence'])
+    elif options.word_map_distri:
+        check_for_errors(options.word)
+        next_words = client.query('/next', corpus=infile, word=options.word, 
+                                    k=options.top, 
+                                    tie_break=options.tie_break)['next']
+        for word, frequency in next_words:
+            print(word + '\t' + str(frequency))
+    else:
+        raise Exception('No action chosen for the query')
+    client.close()
+
+
+def run_jobs(jobs, settings, cache=None):
+    """ Runs the jobs of a job spec, each a set of actions on one or more 
+    files
+
+    Parameters
+    ----------
+    jobs: list of dictionaries, or dictionary with a 'jobs' list
+        jobs with an 'infile' or a list of 'infiles', a list of 'actions' 
+        and optionally any option destination, such as 'outfile', 'word' or 
+        'sentence_length', to use instead of the command line value
+    settings: dictionary (string: object)
+        command line option values used where a job does not set them
+    cache: MapCache, default : None
+        on-disk cache to reuse word maps from
+
+    Returns
+    -------
+    results: list of dictionaries
+        infile, action and result of every action run, or an error if the 
+        action failed
+    """
+
+    if isinstance(jobs, dict):
+        jobs = jobs['jobs']
+
+    # charts saved as images are drawn in worker processes while the next 
+    # files are read
+    renderer = charts.ParallelRenderer(settings['chart_workers'])
+    results = []
+    try:
+        for job in jobs:
+            job_settings = dict(settings)
+            job_settings.update(job)
+            infiles = job.get('infiles', [job.get('infile')])
+            for infile in infiles:
+                results.extend(run_actions(infile, job['actions'], 
+                                            job_settings, cache, 
+                                            keep_going=True, 
+                                            renderer=renderer))
+    finally:
+        errors = renderer.close()
+
+    # charts that could not be drawn fail their action
+    for result in results:
+        if result['action'] in CHART_ACTIONS and \
+                result.get('result') in errors:
+            result['error'] = errors[result.pop('result')]
+    return results
+
+
+def run_actions(infile, actions, settings, cache=None, keep_going=False, 
+                renderer=None):
+    """ Runs several actions on a file, building its word maps at most once 
+    and sharing them between all actions that use them
+
+    Parameters
+    ----------
+    infile: string
+        path to input file, directory or glob pattern of files
+    actions: list of strings
+        names of the actions to run, from ACTIONS
+    settings: dictionary (string: object)
+        option values for the actions, keyed by option destination
+    cache: MapCache, default : None
+        on-disk cache to reuse word maps from
+    keep_going: bool, default : False
+        record failed actions as errors and run the rest, instead of 
+        raising
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save charts with when chart_out is set, see 
+        draw_distribution
+
+    Returns
+    -------
+    results: list of dictionaries
+        infile, action and result of every action, the result is the chart 
+        file for charts saved to a file and None for actions that only show 
+        a chart or write a file
+    """
+
+    # sentences and next words follow longer contexts with an n-gram model 
+    # counted once for both when the order is above 2
+    model_actions = []
+    if settings['order'] > 2:
+        model_actions = [action for action in actions 
+                            if action in NGRAM_ACTIONS]
+
+    # share the word maps only if an action besides counting needs them, 
+    # counting alone streams the file without building maps
+    uses_maps = [action for action in actions if action in MAP_ACTIONS and 
+                    action not in model_actions]
+    share_maps = bool(uses_maps) and uses_maps != ['count']
+
+    # counts, distributions and next words are estimated from counts made 
+    # once in bounded memory when a memory budget is set
+    approximate_actions = []
+    if approximate_memory(settings) is not None:
+        approximate_actions = [action for action in actions 
+                                if action in APPROXIMATE_ACTIONS and 
+                                action not in model_actions]
+        uses_maps = [action for action in uses_maps 
+                        if action not in approximate_actions]
+        share_maps = bool(uses_maps) and uses_maps != ['count']
+
+    maps = None
+    model = None
+    counts = None
+    reader = None
+    results = []
+    for action in actions:
+        # messages printed by a failing action become its error
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output if keep_going 
+                                            else sys.stdout):
+                if reader is None:
+                    reader = make_reader(settings)
+
+                # build the maps for the first action that uses them
+                if share_maps and maps is None and action in MAP_ACTIONS:
+                    maps = text_utilities.gen_maps_from_file(infile, 
+                                compact=settings['compact'], cache=cache, 
+                                workers=settings['workers'], reader=reader, 
+                                max_reads=settings['max_reads'])
+                if model is None and action in model_actions:
+                    model = make_model(infile, settings, cache, reader)
+                if counts is None and action in approximate_actions:
+                    counts = text_utilities.gen_approximate_counts(infile, 
+                                approximate_memory(settings), cache, reader)
+                result = run_action(infile, action, settings, cache, maps, 
+                                    reader, renderer, model, 
+                                    counts if action in approximate_actions 
+                                    else None)
+        except (Exception, SystemExit) as err:
+            if not keep_going:
+                raise
+            message = output.getvalue().strip()
+            if not isinstance(err, SystemExit):
+                message = str(err)
+            results.append({'infile': infile, 'action': action, 
+                            'error': message or 'failed'})
+            continue
+        results.append({'infile': infile, 'action': action, 
+                        'result': result})
+    return results
+
+
+def run_action(infile, action, settings, cache=None, maps=None, reader=None, 
+                renderer=None, model=None, counts=None):
+    """ Runs a single action on a file
+
+    Parameters
+    ----------
+    infile: string
+        path to input file
+    action: string
+        name of the action to run, from ACTIONS
+    settings: dictionary (string: object)
+        option values for the action, keyed by option destination
+    cache: MapCache, default : None
+        on-disk cache to reuse word maps from
+    maps: tuple, default : None
+        word maps already built from the file
+    reader: FileReader, default : None
+        how the file is read, see gen_maps_from_file
+    renderer: ChartRenderer or ParallelRenderer, default : None
+        renderer to save charts with when chart_out is set, see 
+        draw_distribution
+    model: NGramModel, default : None
+        n-gram model already counted from the file
+    counts: ApproximateCounts, default : None
+        counts estimated from the file, used instead of the word maps for 
+        counts, distributions and next words
+
+    Returns
+    -------
+    result: object
+        word count, sentence, replacement hits or the file a chart was saved 
+        to, None for other actions, estimates with their error bounds for 
+        counts with approximate counts
+    """
+
+    outfile = settings['outfile']
+    compact = settings['compact']
+    workers = settings['workers']
+    top = settings['top']
+    tie_break = settings['tie_break']
+    chart_out = chart_outfile(settings, infile, action)
+
+    # estimated frequencies stand in for the word maps
+    if counts is not None:
+        if action == 'count':
+            words = [settings['word']] if settings['word'] is not None else []
+            return text_utilities.get_word_estimates(infile, words, 
+                                                        counts=counts)
+        maps = counts.word_distribution, counts.word_map
+
+    if action == 'count':
+        return text_utilities.get_word_count(infile, cache, workers, maps, 
+                                                settings['compat'], 
+                                                settings['max_reads'])
+    elif action == 'distribution':
+        text_utilities.show_word_frequencies(infile, compact, cache, workers, 
+                                                top, tie_break, maps, reader, 
+                                                chart_out, renderer)
+        return chart_out
+    elif action == 'remove_stopwords':
+        check_for_errors(outfile)
+        text_utilities.remove_stopwords_from_file(infile, outfile, 
+                                        max_reads=settings['max_reads'])
+    elif action == 'stem_file':
+        check_for_errors(outfile)
+        text_utilities.stem_file(infile, outfile, settings['max_reads'])
+    elif action == 'preprocess_file':
+        check_for_errors(outfile)
+        text_utilities.preprocess_file(infile, outfile, settings['max_reads'])
+    elif action == 'distribution_processed':
+        text_utilities.show_preprocessed_distribution(infile, top, tie_break, 
+                                                        chart_out, renderer)
+        return chart_out
+    elif action == 'sentence':
+        return text_utilities.gen_sentence(infile, 
+                    settings['sentence_length'], compact, cache, workers, 
+                    settings['sample'], settings['seed'], maps, reader, 
+                    settings['order'], model)
+    elif action == 'word_map_distri':
+        check_for_errors(settings['word'])
+        text_utilities.show_next_word_distribution(infile, settings['word'], 
+                    compact, cache, workers, top, tie_break, maps, reader, 
+                    chart_out, renderer, settings['order'], model)
+        return chart_out
+    elif action == 'replace':
+        check_for_errors(outfile)
+        if settings['replace_map'] is not None:
+            return text_utilities.replace_words(infile, outfile, 
+                            settings['replace_map'], settings['whole_word'])
+        check_for_errors(settings['word_to_replace'], settings['word'])
+        hits = text_utilities.replace_word(infile, outfile, 
+                            settings['word_to_replace'], settings['word'], 
+                            settings['whole_word'])
+        return {settings['word_to_replace']: hits}
+    else:
+        raise ValueError('unknown action: ' + str(action))
+
+    return None
+
+
+def make_reader(settings):
+    """ Creates the reader for input files from option values
+
+    Parameters
+    ----------
+    settings: dictionary (string: object)
+        option values, keyed by option destination
+
+    Returns
+    -------
+    reader: FileReader
+        reader with the chosen backend, encoding and error handling
+    """
+
+    return text_utilities.FileReader(settings['backend'], 
+                                        settings['encoding'], 
+                                        settings['errors'])
+
+
+def make_model(infile, settings, cache=None, reader=None):
+    """ Counts the n-gram model of a file if the order is above 2
+
+    Parameters
+    ----------
+    infile: string
+        path to input file
+    settings: dictionary (string: object)
+        option values, keyed by option destination
+    cache: MapCache, default : None
+        on-disk cache to reuse the model from
+    reader: FileReader, default : None
+        how the file is read, see gen_ngram_model
+
+    Returns
+    -------
+    model: NGramModel
+        model pruned as chosen, None for order 2 or an empty file
+    """
+
+    if settings['order'] <= 2:
+        return None
+    return text_utilities.gen_ngram_model(infile, settings['order'], 
+                                            settings['min_count'], 
+                                            settings['prune_top'], 
+                                            cache=cache, reader=reader)
+
+
+def approximate_memory(settings):
+    """ Gets the memory to estimate counts in from option values
+
+    Parameters
+    ----------
+    settings: dictionary (string: object)
+        option values, keyed by option destination
+
+    Returns
+    -------
+    memory: int
+        bytes for approximate counts, None if words are counted exactly
+    """
+
+    if settings.get('approximate') is None:
+        return None
+    return settings['approximate'] * 1024 * 1024
+
+
+def chart_outfile(settings, infile, action):
+    """ Gets the file to save the chart of an action on a file to
+
+    Parameters
+    ----------
+    settings: dictionary (string: object)
+        option values, keyed by option destination
+    infile: string
+        path to input file
+    action: string
+        name of the action, from ACTIONS
+
+    Returns
+    -------
+    chart_out: string
+        chart_out setting with {name} replaced by the infile name without 
+        its extension and {action} by the action, None if charts are shown 
+        or the action draws no chart
+    """
+
+    chart_out = settings['chart_out']
+    if chart_out is None or action not in CHART_ACTIONS:
+        return None
+
+    name = os.path.splitext(os.path.basename(infile.rstrip('/\\')))[0]
+    return chart_out.format(name=name, action=action)
+
+
 def check_for_errors(*args):
     """ Check for unitialized variables passed in and throws Exception if True
 